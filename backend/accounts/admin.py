@@ -4,12 +4,14 @@ Django admin customisation
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from core.utils.softdelete import SoftDeleteAdminMixin, soft_delete, soft_delete_queryset
 from .models import UserAddress, Profile
+from .utils.profiles import invalidate_user_payloads
 
 User = get_user_model()
 
 @admin.register(User)
-class CustomUserAdmin(BaseUserAdmin):
+class CustomUserAdmin(SoftDeleteAdminMixin, BaseUserAdmin):
     """Define the admin pages for users"""
     list_display = ('email', 'username', 'is_active', 'is_staff', 'is_superuser')
     list_filter = ('is_active', 'is_staff', 'is_superuser')
@@ -50,6 +52,12 @@ class CustomUserAdmin(BaseUserAdmin):
 
         return super().changelist_view(request, extra_context=extra_context)
 
+    def delete_model(self, request, obj):
+        soft_delete(obj, is_active=False)
+
+    def delete_queryset(self, request, queryset):
+        invalidate_user_payloads(soft_delete_queryset(queryset, is_active=False))
+
 
 @admin.register(UserAddress)
 class ShippingAddressAdmin(admin.ModelAdmin):
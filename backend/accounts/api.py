@@ -1,28 +1,45 @@
 import os
+from django.conf import settings
 from ninja import Router, File, Form
 from ninja.files import UploadedFile
 from ninja.security import django_auth, django_auth_superuser
 from django.views.decorators.csrf import csrf_exempt
-from django.core.files.storage import default_storage
 from django.core.exceptions import ValidationError
 from django.contrib.auth import authenticate, login, logout, get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.sites.shortcuts import get_current_site
 from django.utils.http import urlsafe_base64_decode
 from django.shortcuts import get_object_or_404
 from ninja.errors import HttpError
 from django.http import Http404
 from django.db import IntegrityError
+from django.db.models import Q
+from django.db.models.functions import Upper
+from typing import Optional
 from core.utils.auth import is_admin
+from core.utils.pagination import encode_cursor, decode_cursor, page_size
+from core.utils.ratelimit import ratelimit
+from core.utils.softdelete import soft_delete, soft_delete_queryset
 from core.schemas import MessageSchema
-from .utils.tokens import user_tokenizer_generate
+from .utils.tokens import user_tokenizer_generate, password_reset_token
 from .utils.emails import send_verification_email
+from .utils.profiles import get_user_payload, invalidate_user_payloads, serialize_user
+from .utils.avatars import attach_upload, discard_upload, is_image, stage_upload
+from .jobs import enqueue_password_reset, enqueue_profile_image
 from .models import Profile
 from .schemas import (
     UserRegisterSchema,
     UserLoginSchema,
+    PasswordResetRequestSchema,
+    PasswordResetConfirmSchema,
     UserOutSchema,
     ProfileBaseSchema,
+    ProfileImageUploadSchema,
     AdminCreateUserSchema,
     AdminUserUpdateSchema,
+    UserPageSchema,
+    UserBulkSchema,
+    BulkResultSchema,
 )
 
 import logging
@@ -50,18 +67,20 @@ def set_csrf_token(request):
         201: MessageSchema, 
         400: MessageSchema, 
         422: MessageSchema, 
+        429: MessageSchema,
         500: MessageSchema
     }
 )
+@ratelimit('10/h', key='ip')
 def register(request, payload: UserRegisterSchema):
     """
     Collects new user credentials. Sends verification email after sign up.
     """
     try:
         # Check if username or email already exists (DB-level guard + friendly error)
-        if User.objects.filter(username=payload.username).exists():
+        if User.objects.filter(username__iexact=payload.username).exists():
             return 422, {"detail": "Username already exists."}
-        if User.objects.filter(email=payload.email).exists():
+        if User.objects.filter(email__iexact=payload.email).exists():
             return 422, {"detail": "Email already exists."}
 
         user = User.objects.create_user(
@@ -135,23 +154,24 @@ def verify_email(request, uidb64: str, token: str):
         logger.error(f"Token processing error: {e}")
         return 500, {"detail": "Verification failed due to server error."}
 
-@router.post("/login", response={200: MessageSchema, 401: MessageSchema})
+def login_identity(request, payload):
+    identifier = payload.username or payload.email
+    return identifier.casefold() if identifier else None
+
+
+@router.post(
+    "/login",
+    response={200: MessageSchema, 401: MessageSchema, 429: MessageSchema}
+)
+# Rejected before any password is hashed
+@ratelimit('20/m', key='ip')
+@ratelimit('5/m', key=login_identity)
 def login_view(request, payload: UserLoginSchema):
     identifier = payload.username or payload.email
     password = payload.password
 
-    # Resolve username for authentication
-    if "@" in identifier:
-        try:
-            user_obj = User.objects.get(email__iexact=identifier)
-            username = user_obj.username
-        except User.DoesNotExist:
-            raise HttpError(401, "Invalid credentials.")
-    else:
-        username = identifier
-
-    # Authenticate using the resolved username
-    user = authenticate(request, username=username, password=password)
+    # The backend matches either identifier in a single lookup
+    user = authenticate(request, username=identifier, password=password)
     if user is None:
         raise HttpError(401, "Invalid credentials.")
     if not user.is_active:
@@ -166,6 +186,50 @@ def logout_view(request):
     return 200, {"detail": "Logged out successfully."}
 
 
+def reset_identity(request, payload):
+    return payload.email.casefold()
+
+
+@router.post(
+    "/password-reset",
+    response={200: MessageSchema, 429: MessageSchema}
+)
+@ratelimit('20/h', key='ip')
+@ratelimit('3/h', key=reset_identity)
+def request_password_reset(request, payload: PasswordResetRequestSchema):
+    """
+    Sends a reset link if the email belongs to an active account. The
+    request does the same work either way, so its timing and answer say
+    nothing about which emails are registered.
+    """
+    enqueue_password_reset(payload.email, get_current_site(request).domain)
+    return 200, {"detail": "If an account uses this email, a reset link is on its way."}
+
+@router.post(
+    "/password-reset/confirm",
+    response={200: MessageSchema, 400: MessageSchema, 429: MessageSchema}
+)
+@ratelimit('10/m', key='ip')
+def confirm_password_reset(request, payload: PasswordResetConfirmSchema):
+    try:
+        uid = int(urlsafe_base64_decode(payload.uidb64).decode())
+        user = User.objects.get(pk=uid, is_active=True)
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        user = None
+    if user is None or not password_reset_token.check_token(user, payload.token):
+        return 400, {"detail": "Invalid or expired reset link."}
+
+    try:
+        validate_password(payload.password, user)
+    except ValidationError as e:
+        return 400, {"detail": " ".join(e.messages)}
+
+    # The new hash invalidates this token and any other outstanding ones
+    user.set_password(payload.password)
+    user.save(update_fields=["password"])
+    return 200, {"detail": "Your password has been updated."}
+
+
 # -------------------------------------------------
 # PROFILE MANAGEMENT
 # -------------------------------------------------
@@ -175,16 +239,8 @@ def logout_view(request):
     )
 def get_profile(request):
     try:
-        profile = Profile.objects.filter(user=request.user).first()
-        return {
-            "id": request.user.id,
-            "username": request.user.username,
-            "email": request.user.email,
-            "name": profile.name if profile else "",
-            "surname": profile.surname if profile else "",
-            "is_active": request.user.is_active,
-            "is_staff": request.user.is_staff
-        }
+        # Served from cache; request.user was already loaded by the session
+        return get_user_payload(request.user.pk)
     except Exception:
         return 500, {"detail": "Internal server error"}
 
@@ -218,32 +274,43 @@ def update_profile(
     except Exception:
         return 500, {"detail": "Internal server error"}
 
-@router.post("/upload-profile-image", auth=django_auth)
+@router.post(
+    "/upload-profile-image", auth=django_auth,
+    response={
+        200: ProfileImageUploadSchema,
+        202: ProfileImageUploadSchema,
+        400: MessageSchema
+    }
+)
 def upload_profile_image(request, image: UploadedFile = File(...)):
     """
-    Handles authenticated user profile image uploads.
+    Accepts a profile image upload. Resizing and storage happen in the job
+    worker; an image uploaded before is applied immediately.
     """
-    profile, _ = Profile.objects.get_or_create(user=request.user)
+    if image.size > settings.PROFILE_IMAGE_MAX_SIZE:
+        return 400, {"detail": "Image is too large."}
+    upload, sha256 = stage_upload(image)
+    if not is_image(upload):
+        discard_upload(upload)
+        return 400, {"detail": "Upload is not a supported image."}
 
-    # Ensure previous image replaced cleanly
-    if profile.image:
-        if default_storage.exists(profile.image.name):
-            default_storage.delete(profile.image.name)
-
-    # Save new image
-    profile.image.save(image.name, image)
-    profile.save()
-
-    return {
-        "detail": "Profile image uploaded successfully.",
-        "image": profile.image.url,
+    profile, _ = Profile.objects.get_or_create(user=request.user)
+    if attach_upload(profile, upload, sha256):
+        return 200, {
+            "detail": "Profile image uploaded successfully.",
+            "image": profile.image.url,
+        }
+    enqueue_profile_image(profile.pk, upload, sha256)
+    return 202, {
+        "detail": "Profile image is being processed.",
+        "image": profile.image.url if profile.image else None,
     }
 
 @router.delete("/profile", auth=django_auth, response={200: MessageSchema, 500: MessageSchema})
 def delete_account(request):
     try:
-        user = request.user
-        user.delete()
+        # Hidden and logged out everywhere now, purged in the background
+        soft_delete(request.user, is_active=False)
         return 200, {"detail": "User account deleted successfully."}
     except:
         return 500, {"detail": "Internal server error."}
@@ -252,6 +319,93 @@ def delete_account(request):
 # STAFF & ADMIN USER MANAGEMENT
 # -------------------------------------------------
 
+@router.get(
+    "/users", auth=django_auth,
+    response={200: UserPageSchema, 400: MessageSchema, 403: MessageSchema}
+)
+def list_users(
+    request,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_staff: Optional[bool] = None,
+):
+    """
+    Users newest first, paged by id without counting. `q` matches the
+    start of the username or email, ignoring case, via the prefix indexes.
+    """
+    if not is_admin(request.user):
+        return 403, {"detail": "Permission denied."}
+    limit = page_size(limit)
+    users = User.objects.select_related("profile").order_by("-id")
+    if q and q.strip():
+        prefix = q.strip().upper()
+        users = users.alias(
+            username_upper=Upper("username"), email_upper=Upper("email")
+        ).filter(Q(username_upper__startswith=prefix) | Q(email_upper__startswith=prefix))
+    if is_active is not None:
+        users = users.filter(is_active=is_active)
+    if is_staff is not None:
+        users = users.filter(is_staff=is_staff)
+    if cursor:
+        try:
+            (last_id,) = decode_cursor(cursor)
+            users = users.filter(id__lt=int(last_id))
+        except (TypeError, ValueError):
+            return 400, {"detail": "Invalid cursor"}
+
+    page = list(users[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].pk)
+    return 200, {"items": [serialize_user(u) for u in page], "next_cursor": next_cursor}
+
+def _bulk_targets(request, ids):
+    """Never the caller, and superusers only for superusers."""
+    users = User.objects.filter(pk__in=ids).exclude(pk=request.user.pk)
+    if not request.user.is_superuser:
+        users = users.filter(is_superuser=False)
+    return users
+
+def _bulk_set_active(request, ids, active):
+    # One UPDATE, skipping rows already in the wanted state
+    count = _bulk_targets(request, ids).exclude(is_active=active).update(is_active=active)
+    invalidate_user_payloads(ids)
+    return count
+
+@router.post(
+    "/users/bulk-activate", auth=django_auth,
+    response={200: BulkResultSchema, 403: MessageSchema}
+)
+def bulk_activate_users(request, payload: UserBulkSchema):
+    if not is_admin(request.user):
+        return 403, {"detail": "Permission denied."}
+    count = _bulk_set_active(request, payload.ids, True)
+    return 200, {"detail": f"{count} user(s) activated.", "count": count}
+
+@router.post(
+    "/users/bulk-deactivate", auth=django_auth,
+    response={200: BulkResultSchema, 403: MessageSchema}
+)
+def bulk_deactivate_users(request, payload: UserBulkSchema):
+    if not is_admin(request.user):
+        return 403, {"detail": "Permission denied."}
+    count = _bulk_set_active(request, payload.ids, False)
+    return 200, {"detail": f"{count} user(s) deactivated.", "count": count}
+
+@router.post(
+    "/users/bulk-delete", auth=django_auth_superuser,
+    response={200: BulkResultSchema}
+)
+def bulk_delete_users(request, payload: UserBulkSchema):
+    # One UPDATE hides them all; the purge jobs clear their rows later
+    deleted = soft_delete_queryset(_bulk_targets(request, payload.ids), is_active=False)
+    invalidate_user_payloads(deleted)
+    count = len(deleted)
+    return 200, {"detail": f"{count} user(s) deleted.", "count": count}
+
 @router.post("/users", auth=django_auth, response={201: UserOutSchema, 403: MessageSchema})
 def admin_create_user(request, payload: AdminCreateUserSchema):
     if not request.user.is_superuser:
@@ -281,23 +435,16 @@ def admin_create_user(request, payload: AdminCreateUserSchema):
 
 @router.get("/users/{user_id}", auth=django_auth, response={200: UserOutSchema, 403: MessageSchema})
 def get_user_detail(request, user_id: int):
-    user = get_object_or_404(User, pk=user_id)
-    if not (is_admin(request.user) or request.user.id == user.pk):
+    payload = get_user_payload(user_id)
+    if payload is None:
+        raise Http404("No User matches the given query.")
+    if not (is_admin(request.user) or request.user.id == user_id):
         return 403, {"detail": "Permission denied."}
-    profile = Profile.objects.filter(user=user).first()
-    return 200, {
-        "id": user.pk,
-        "username": user.username,
-        "email": user.email,
-        "name": profile.name if profile else "",
-        "surname": profile.surname if profile else "",
-        "is_active": user.is_active,
-        "is_staff": user.is_staff
-    }
+    return 200, payload
 
 @router.patch("/users/{user_id}", auth=django_auth, response={200: UserOutSchema, 403: MessageSchema})
 def update_user_detail(request, user_id: int, data: AdminUserUpdateSchema):
-    target_user = get_object_or_404(User, pk=user_id)
+    target_user = get_object_or_404(User.objects.select_related("profile"), pk=user_id)
     if not (request.user.is_superuser or request.user.id == target_user.pk):
         return 403, {"detail": "Permission denied."}
     update_data = data.dict(exclude_unset=True)
@@ -307,21 +454,12 @@ def update_user_detail(request, user_id: int, data: AdminUserUpdateSchema):
         setattr(target_user, k, v)
     target_user.save()
 
-    profile = Profile.objects.filter(user=target_user).first()
-    return 200, {
-        "id": target_user.pk,
-        "username": target_user.username,
-        "email": target_user.email,
-        "name": profile.name if profile else "",
-        "surname": profile.surname if profile else "",
-        "is_active": target_user.is_active,
-        "is_staff": target_user.is_staff,
-    }
+    return 200, serialize_user(target_user)
 
 @router.delete("/users/{user_id}", auth=django_auth_superuser, response={200: MessageSchema, 403: MessageSchema})
 def admin_delete_user(request, user_id: int):
     user = get_object_or_404(User, pk=user_id)
     if not (request.user.is_superuser or request.user.id == user.pk):
         return 403, {"detail": "Permission denied."}
-    user.delete()
+    soft_delete(user, is_active=False)
     return 200, {"detail": "User deleted successfully."}
\ No newline at end of file
@@ -1,14 +1,40 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.functions import Upper
 
 User = get_user_model()
 
 class EmailOrUsernameBackend(ModelBackend):
+    """
+    Log in with a username or an email address, ignoring case.
+
+    Both identifiers are matched in one query, which the functional unique
+    indexes on UPPER(username) and UPPER(email) serve directly.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
-        user = (
-            User.objects.filter(username__iexact=username).first()
-            or User.objects.filter(email__iexact=username).first()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        identifier = username.upper()
+        candidates = list(
+            User.objects
+            .alias(username_upper=Upper('username'), email_upper=Upper('email'))
+            .filter(Q(username_upper=identifier) | Q(email_upper=identifier))[:2]
+        )
+        # A username that looks like someone else's email loses to the username
+        user = next(
+            (u for u in candidates if u.username.upper() == identifier),
+            candidates[0] if candidates else None,
         )
-        if user and user.check_password(password):
+        if user is None:
+            # Hash anyway so unknown identifiers take as long as wrong passwords
+            User().set_password(password)
+            return None
+        # A hash from another hasher or older work factors is replaced with
+        # one from the current profile here, saving only the password column
+        if user.check_password(password):
             return user
         return None
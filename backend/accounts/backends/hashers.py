@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with its work factors taken from `settings.ARGON2_PARAMS`.
+
+    The algorithm name stays "argon2", so hashes made with other parameters
+    still verify, and `must_update` flags them for rehashing at next login.
+    """
+
+    def _param(self, name):
+        return settings.ARGON2_PARAMS.get(name, getattr(Argon2PasswordHasher, name))
+
+    @property
+    def time_cost(self):
+        return self._param('time_cost')
+
+    @property
+    def memory_cost(self):
+        return self._param('memory_cost')
+
+    @property
+    def parallelism(self):
+        return self._param('parallelism')
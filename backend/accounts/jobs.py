@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from core.utils.jobs import job, enqueue
+from .utils.avatars import process_upload
+from .utils.emails import send_password_reset_email
+
+User = get_user_model()
+
+
+def enqueue_password_reset(email, domain):
+    """Queue a reset email with one insert, whether or not the account exists."""
+    return enqueue('accounts.send_password_reset', {'email': email, 'domain': domain})
+
+
+@job('accounts.send_password_reset')
+def send_password_reset(email, domain):
+    # The lookup happens here so the request costs the same either way
+    user = User.objects.filter(email__iexact=email, is_active=True).first()
+    if user is None or not user.has_usable_password():
+        return
+    send_password_reset_email(user, domain)
+
+
+def enqueue_profile_image(profile_id, upload, sha256):
+    return enqueue(
+        'accounts.process_profile_image',
+        {'profile_id': profile_id, 'upload': upload, 'sha256': sha256},
+    )
+
+
+@job('accounts.process_profile_image')
+def process_profile_image(profile_id, upload, sha256):
+    process_upload(profile_id, upload, sha256)
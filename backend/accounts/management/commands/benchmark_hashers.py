@@ -0,0 +1,83 @@
+"""
+Django command to time password hashing under each hasher profile.
+Run it on the deployment machine to size workers for login traffic.
+"""
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """Django benchmark_hashers command class."""
+
+    help = 'Time password verification for each PASSWORD_HASHER_PROFILES entry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help='Profile to time; repeat for several. Defaults to all.'
+        )
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument(
+            '--logins-per-second', type=float,
+            help='Peak login rate to size CPU cores against.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        profiles = settings.PASSWORD_HASHER_PROFILES
+        names = options['profiles'] or list(profiles)
+        unknown = set(names) - set(profiles)
+        if unknown:
+            raise CommandError(f'Unknown profile(s): {", ".join(sorted(unknown))}')
+
+        for name in names:
+            hasher = import_string(profiles[name][0])()
+            try:
+                timings = self._time_verify(hasher, options['rounds'])
+            except ValueError as exc:
+                # Raised when the hasher's library is not installed
+                self.stderr.write(self.style.WARNING(f'{name}: {exc}'))
+                continue
+
+            median = statistics.median(timings)
+            worst = max(timings)
+            active = ' (active)' if name == settings.PASSWORD_HASHER_PROFILE else ''
+            self.stdout.write(
+                f'{name}{active}: {hasher.algorithm} '
+                f'{self._describe(hasher)}, '
+                f'median {median * 1000:.1f}ms, max {worst * 1000:.1f}ms, '
+                f'{1 / median:,.1f} logins/s per core'
+            )
+            if options['logins_per_second']:
+                cores = math.ceil(options['logins_per_second'] * median)
+                self.stdout.write(
+                    f'  {options["logins_per_second"]:,.0f} logins/s needs '
+                    f'{cores} core(s) of hashing'
+                )
+
+    def _time_verify(self, hasher, rounds):
+        password = 'correct horse battery staple'
+        encoded = hasher.encode(password, hasher.salt())
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            hasher.verify(password, encoded)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def _describe(self, hasher):
+        if hasattr(hasher, 'memory_cost'):
+            return (
+                f't={hasher.time_cost} m={hasher.memory_cost}KiB '
+                f'p={hasher.parallelism}'
+            )
+        if hasattr(hasher, 'iterations'):
+            return f'{hasher.iterations:,} iterations'
+        if hasattr(hasher, 'rounds'):
+            return f'{hasher.rounds} rounds'
+        return ''
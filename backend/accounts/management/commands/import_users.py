@@ -0,0 +1,102 @@
+"""
+Django command to bulk import users and their profiles from a CSV file.
+"""
+import csv
+import os
+import sys
+import time
+from contextlib import ExitStack
+from django.core.management.base import BaseCommand, CommandError
+from accounts.utils.imports import CHUNK_SIZE, import_users, read_rows
+
+
+class Command(BaseCommand):
+    """Django import_users command class."""
+
+    help = (
+        'Create users and profiles from a CSV with username, email and '
+        'optional password, name, surname and is_active columns.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to read, or - for standard input.')
+        parser.add_argument(
+            '--hashed', action='store_true',
+            help='The password column holds hashes in a configured hasher format.'
+        )
+        parser.add_argument(
+            '--activate', action='store_true',
+            help='Mark every imported user active, ignoring is_active.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Processes hashing passwords; 0 hashes in this process.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Users inserted per transaction.'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Write skipped rows and the reason to this CSV file '
+                 'instead of standard error.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['chunk_size'] < 1 or options['workers'] < 0:
+            raise CommandError('Chunk size must be positive and workers not negative.')
+        with ExitStack() as stack:
+            if options['path'] == '-':
+                source = sys.stdin
+            else:
+                try:
+                    source = stack.enter_context(
+                        open(options['path'], newline='', encoding='utf-8-sig')
+                    )
+                except OSError as exc:
+                    raise CommandError(exc)
+            try:
+                rows = read_rows(source, activate=options['activate'])
+            except ValueError as exc:
+                raise CommandError(exc)
+
+            rejects = None
+            if options['rejects']:
+                rejects = csv.writer(stack.enter_context(
+                    open(options['rejects'], 'w', newline='')
+                ))
+                rejects.writerow(['line', 'username', 'email', 'reason'])
+            self._run(rows, rejects, options)
+
+    def _run(self, rows, rejects, options):
+        read = created = skipped = 0
+        started = time.perf_counter()
+        chunks = import_users(
+            rows, hashed=options['hashed'],
+            workers=options['workers'], chunk_size=options['chunk_size'],
+        )
+        for count, chunk_created, rejected in chunks:
+            read += count
+            created += chunk_created
+            skipped += len(rejected)
+            for reject in rejected:
+                if rejects:
+                    rejects.writerow([reject.line, reject.username, reject.email, reject.reason])
+                else:
+                    self.stderr.write(
+                        f'line {reject.line}: {reject.username} <{reject.email}> '
+                        f'skipped, {reject.reason}'
+                    )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{read:,} rows read, {created:,} created, {skipped:,} skipped '
+                f'({read / elapsed if elapsed else 0:,.0f} rows/s)'
+            )
+
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created:,} of {read:,} users in {elapsed:.1f}s '
+            f'({rate:,.0f} users/s), {skipped:,} skipped.'
+        ))
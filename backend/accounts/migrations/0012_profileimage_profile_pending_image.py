@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_user_upper_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('image', models.ImageField(max_length=255, upload_to='')),
+                ('thumbnail', models.ImageField(max_length=255, upload_to='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='pending_image',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,21 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_profileimage_profile_pending_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='text_pattern_ops'), name='accounts_user_username_prefix'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='text_pattern_ops'), name='accounts_user_email_prefix'),
+        ),
+    ]
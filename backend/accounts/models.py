@@ -3,7 +3,8 @@ import uuid
 from functools import partial
 from django.db import models
 from django.conf import settings
-from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import OpClass
 from django_countries.fields import CountryField
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -28,6 +29,10 @@ def model_image_file_path(instance, filename, model=None):
 class UserManager(BaseUserManager):
     """Class for creating a user manager"""
 
+    def get_queryset(self):
+        # Soft-deleted users can no longer log in or be looked up
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
     def create_user(self, username, email, password=None, **extrafields):
         """Create, save and return a new user."""
         if not email:
@@ -60,15 +65,51 @@ class User(AbstractBaseUser, PermissionsMixin):
     created_at = models.AutoField
     is_active = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
+    # Set when deleted; the row is purged by a background job
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
 
     objects = UserManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            # Case-insensitive uniqueness, and the indexes login looks up by
+            models.UniqueConstraint(
+                Upper('username'), name='accounts_user_username_upper_uniq'
+            ),
+            models.UniqueConstraint(
+                Upper('email'), name='accounts_user_email_upper_uniq'
+            ),
+        ]
+        indexes = [
+            # Staff search by prefix, UPPER(...) LIKE 'PREFIX%'
+            models.Index(
+                OpClass(Upper('username'), name='text_pattern_ops'),
+                name='accounts_user_username_prefix',
+            ),
+            models.Index(
+                OpClass(Upper('email'), name='text_pattern_ops'),
+                name='accounts_user_email_prefix',
+            ),
+        ]
 
     def _str_(self):
         return self.username
 
+class ProfileImage(models.Model):
+    """Avatar renditions of one uploaded image, shared by identical uploads."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    image = models.ImageField(max_length=255)
+    thumbnail = models.ImageField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255, blank=True)
@@ -78,6 +119,8 @@ class Profile(models.Model):
         blank=True,
         upload_to=partial(model_image_file_path, model="profile")
     )
+    # Temporary file of an upload still waiting for processing
+    pending_image = models.CharField(max_length=255, blank=True)
 
     def __str__(self):
         return  f"{self.name} {self.surname}"
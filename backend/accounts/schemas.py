@@ -1,6 +1,6 @@
 from ninja import Schema, UploadedFile, File
-from typing import Optional
-from pydantic import EmailStr
+from typing import List, Optional
+from pydantic import EmailStr, Field
 
 # -------------------------------------------------
 # USER SCHEMAS
@@ -28,6 +28,16 @@ class UserLoginSchema(Schema):
     password: str
 
 
+class PasswordResetRequestSchema(Schema):
+    email: EmailStr
+
+
+class PasswordResetConfirmSchema(Schema):
+    uidb64: str
+    token: str
+    password: str
+
+
 class UserOutSchema(Schema):
     id: int
     username: str
@@ -64,6 +74,11 @@ class ProfileBaseSchema(Schema):
         from_attributes = True
 
 
+class ProfileImageUploadSchema(Schema):
+    detail: str
+    image: Optional[str] = None
+
+
 class ProfileUpdateSchema(Schema):
     name: Optional[str] = None
     surname: Optional[str] = None
@@ -90,3 +105,17 @@ class AdminUserUpdateSchema(Schema):
     surname: Optional[str] = None
     is_active: Optional[bool] = None
     is_staff: Optional[bool] = None
+
+
+class UserPageSchema(Schema):
+    items: List[UserOutSchema]
+    next_cursor: Optional[str] = None
+
+
+class UserBulkSchema(Schema):
+    ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class BulkResultSchema(Schema):
+    detail: str
+    count: int
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from .models import Profile
+from .utils.profiles import invalidate_user_payload
+
+User = get_user_model()
+
+# Saved on every login and password rehash, and not part of the payload
+UNCACHED_FIELDS = frozenset({'last_login', 'password'})
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and update_fields <= UNCACHED_FIELDS:
+        return
+    invalidate_user_payload(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile(sender, instance, **kwargs):
+    invalidate_user_payload(instance.user_id)
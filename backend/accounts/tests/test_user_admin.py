@@ -3,8 +3,11 @@ Test module for django admin modifications.
 """
 from http import HTTPStatus
 from django.urls import reverse
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from accounts.utils.context_processor import profile_context
 
 
 class AdminSiteTests(TestCase):
@@ -44,4 +47,42 @@ class AdminSiteTests(TestCase):
         """Test the create user page works."""
         url = reverse('admin:accounts_user_add')
         res = self.client.get(url)
-        self.assertEqual(res.status_code, HTTPStatus.OK)
\ No newline at end of file
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+
+class ContextProcessorQueryTests(TestCase):
+    """The cart and profile context processors stay idle on admin pages."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            username='admin-user',
+            email='admin@example.com',
+            password='testpass123',
+        )
+        self.client.force_login(self.admin_user)
+
+    def assertPageSkipsContext(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        profile_queries = [
+            q for q in ctx.captured_queries if 'accounts_profile' in q['sql']
+        ]
+        self.assertEqual(profile_queries, [])
+        self.assertNotIn('session_key', self.client.session)
+
+    def test_admin_index_skips_context(self):
+        self.assertPageSkipsContext(reverse('admin:index'))
+
+    def test_admin_changelist_skips_context(self):
+        self.assertPageSkipsContext(reverse('admin:accounts_user_changelist'))
+
+    def test_cms_dashboard_skips_context(self):
+        self.assertPageSkipsContext(reverse('wagtailadmin_home'))
+
+    def test_profile_resolved_on_access(self):
+        request = RequestFactory().get('/')
+        request.user = self.admin_user
+        context = profile_context(request)
+        with self.assertNumQueries(1):
+            self.assertFalse(context['profile'])
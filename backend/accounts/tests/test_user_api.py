@@ -1,17 +1,27 @@
 import io
+import csv
 import os
+import re
 import json
 import http
+import struct
 import tempfile
+import zlib
 from PIL import Image
 from http import HTTPStatus
 from django.test import (
     TestCase, Client, RequestFactory, override_settings
 )
+from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.db import connection, IntegrityError, transaction
+from django.test.utils import CaptureQueriesContext
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.sites.shortcuts import get_current_site
 
 from ninja.testing import TestClient
@@ -19,7 +29,11 @@ from unittest.mock import MagicMock, patch
 
 from accounts.api import router  
 from accounts.utils.emails import send_verification_email
-from accounts.models import Profile, model_image_file_path
+from core.models import OutboundEmail
+from core.models import Job
+from core.utils.jobs import run_pending
+from core.utils.outbox import deliver_outbox
+from accounts.models import Profile, ProfileImage, model_image_file_path
 
 User = get_user_model()
 client = TestClient(router)
@@ -144,13 +158,18 @@ class SendVerificationEmailTests(TestCase):
 
     @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
     def test_email_is_sent(self):
-        # Calling the utility should result in one email in the outbox
+        # The utility only queues the email; the worker delivers it
         send_verification_email(self.request, self.user)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        deliver_outbox()
         self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(OutboundEmail.objects.exists())
     
     @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
     def test_email_subject_and_recipient(self):
         send_verification_email(self.request, self.user)
+        deliver_outbox()
         email = mail.outbox[0]
         self.assertEqual(email.to, [self.user.email])
         self.assertIn("Welcome to", email.subject)
@@ -158,6 +177,7 @@ class SendVerificationEmailTests(TestCase):
     @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
     def test_email_body_contains_username_and_domain(self):
         send_verification_email(self.request, self.user)
+        deliver_outbox()
         email = mail.outbox[0]
         self.assertIn(self.user.username, email.body)
         # Depending on how get_current_site works in your environment,
@@ -178,15 +198,19 @@ class SendVerificationEmailTests(TestCase):
         self.assertIn('token', context)
 
     @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
-    @patch('accounts.utils.emails.EmailMessage.send')
+    @patch('core.utils.outbox.EmailMessage.send')
     def test_email_send_called_once(self, mock_send):
-        # Ensures EmailMessage.send is called once (side-effect not repeated)
+        # Ensures EmailMessage.send is called once, and only by the worker
         send_verification_email(self.request, self.user)
+        mock_send.assert_not_called()
+        deliver_outbox()
+        deliver_outbox()
         mock_send.assert_called_once()
 
     @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
     def test_email_is_html(self):
         send_verification_email(self.request, self.user)
+        deliver_outbox()
         email = mail.outbox[0]
         self.assertEqual(email.content_subtype, "html")
 
@@ -231,11 +255,275 @@ class TestVerifiedRequests(TestCase):
         self.assertIn(res.status_code, (http.HTTPStatus.OK, http.HTTPStatus.OK))
         self.assertEqual(res.json().get("detail"), "Login successful.")
 
+    def test_login_is_case_insensitive(self):
+        for identifier in ("AuthUser", "AUTH@example.com"):
+            res = Client().post(
+                "/api/accounts/login",
+                data=json.dumps({"username": identifier, "password": "strongpass123"}),
+                content_type="application/json"
+            )
+            self.assertEqual(res.status_code, http.HTTPStatus.OK)
+
+    def test_login_costs_one_user_lookup(self):
+        payload = {"email": self.credentials["email"], "password": self.credentials["password"]}
+        with CaptureQueriesContext(connection) as queries:
+            res = self.session_client.post(
+                "/api/accounts/login",
+                data=json.dumps(payload),
+                content_type="application/json"
+            )
+        self.assertEqual(res.status_code, http.HTTPStatus.OK)
+        lookups = [
+            q["sql"] for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "accounts_user"' in q["sql"]
+        ]
+        self.assertEqual(len(lookups), 1, lookups)
+        self.assertIn('UPPER("accounts_user"."email"', lookups[0])
+
+    def test_identifiers_unique_ignoring_case(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_user(username="AUTHUSER", email="other@example.com", password="x")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_user(username="other", email="Auth@Example.com", password="x")
+
     def test_csrf_token_endpoint(self):
         res = client.get("/set-csrf-token")
         self.assertEqual(res.status_code, http.HTTPStatus.OK)
         self.assertIn("detail", res.json())
 
+class PasswordResetTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="resetuser",
+            email="reset@example.com",
+            password="oldpass12345",
+            is_active=True,
+        )
+
+    def _request(self, email, **extra):
+        return Client().post(
+            "/api/accounts/password-reset",
+            data=json.dumps({"email": email}),
+            content_type="application/json",
+            **extra
+        )
+
+    def _confirm(self, uidb64, token, password="N3w-passphrase!"):
+        return Client().post(
+            "/api/accounts/password-reset/confirm",
+            data=json.dumps({"uidb64": uidb64, "token": token, "password": password}),
+            content_type="application/json",
+        )
+
+    def _reset_link(self):
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        match = re.search(r"password-update/([^/]+)/([^/]+)/", mail.outbox[0].body)
+        return match.group(1), match.group(2)
+
+    def test_request_does_the_same_work_for_unknown_email(self):
+        answers = []
+        for email in ("RESET@example.com", "nobody@example.com"):
+            with CaptureQueriesContext(connection) as queries:
+                res = self._request(email)
+            answers.append((res.status_code, res.json(), len(queries)))
+        self.assertEqual(answers[0], answers[1])
+        # Nothing is looked up, rendered or sent on the request path
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(Job.objects.count(), 2)
+
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["reset@example.com"])
+
+    def test_reset_link_sets_password_once(self):
+        self._request("reset@example.com")
+        uidb64, token = self._reset_link()
+
+        res = self._confirm(uidb64, token)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("N3w-passphrase!"))
+
+        res = self._confirm(uidb64, token, password="An0ther-passphrase!")
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_verification_token_is_not_a_reset_token(self):
+        send_verification_email(RequestFactory().get("/"), self.user)
+        deliver_outbox()
+        match = re.search(r"verify-email/([^/]+)/([^/]+)/", mail.outbox[0].body)
+        res = self._confirm(match.group(1), match.group(2))
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_confirm_rejects_weak_password(self):
+        self._request("reset@example.com")
+        uidb64, token = self._reset_link()
+        res = self._confirm(uidb64, token, password="123")
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("oldpass12345"))
+
+    def test_inactive_account_gets_no_email(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self._request("reset@example.com")
+        run_pending()
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(RATELIMIT={
+        'ENABLED': True,
+        'BACKEND': 'core.utils.ratelimit.LocalMemoryBackend',
+    })
+    def test_requests_are_limited_per_account(self):
+        for n in range(3):
+            res = self._request("reset@example.com", REMOTE_ADDR=f"10.0.0.{n}")
+            self.assertEqual(res.status_code, HTTPStatus.OK)
+        res = self._request("Reset@Example.com", REMOTE_ADDR="10.0.0.9")
+        self.assertEqual(res.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(self._request("other@example.com").status_code, HTTPStatus.OK)
+
+
+FAST_ARGON2 = {'time_cost': 1, 'memory_cost': 256, 'parallelism': 1}
+
+
+@override_settings(ARGON2_PARAMS=FAST_ARGON2)
+class PasswordRehashTests(TestCase):
+    def setUp(self):
+        with self.settings(PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES['pbkdf2']):
+            self.user = create_user(
+                username="hashuser", email="hash@example.com",
+                password="strongpass123", is_active=True,
+            )
+
+    def _login(self, password="strongpass123"):
+        return Client().post(
+            "/api/accounts/login",
+            data=json.dumps({"username": "hashuser", "password": password}),
+            content_type="application/json",
+        )
+
+    def test_login_upgrades_hash_to_active_profile(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+        with self.settings(PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES['argon2']):
+            self.assertEqual(self._login("wrong").status_code, HTTPStatus.UNAUTHORIZED)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+
+            self.assertEqual(self._login().status_code, HTTPStatus.OK)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("argon2$argon2id$"))
+            self.assertIn("m=256,t=1,p=1", self.user.password)
+
+            # Retuning the work factors upgrades again on the next login
+            with self.settings(ARGON2_PARAMS={**FAST_ARGON2, 'memory_cost': 512}):
+                self.assertEqual(self._login().status_code, HTTPStatus.OK)
+            self.user.refresh_from_db()
+            self.assertIn("m=512,t=1,p=1", self.user.password)
+
+    def test_benchmark_command_reports_each_profile(self):
+        out = io.StringIO()
+        call_command("benchmark_hashers", rounds=1, logins_per_second=100, stdout=out)
+        output = out.getvalue()
+        for profile in settings.PASSWORD_HASHER_PROFILES:
+            self.assertIn(f"{profile}", output)
+        self.assertIn("logins/s per core", output)
+        self.assertIn("core(s) of hashing", output)
+
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+LEGACY_HASHERS = FAST_HASHERS + ['django.contrib.auth.hashers.PBKDF2PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        self.dir = self.enterContext(tempfile.TemporaryDirectory())
+        create_user(username="Taken", email="old@example.com", password="pass")
+
+    def _csv(self, text, name="users.csv"):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _import(self, text, *args, **options):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_users", self._csv(text), *args, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_users_and_profiles_in_chunks(self):
+        rows = "\n".join(
+            f"user{i},user{i}@example.com,secret{i},Name{i},Surname{i}" for i in range(7)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            out, err = self._import(
+                "username,email,password,name,surname\n" + rows,
+                workers=0, chunk_size=3, activate=True,
+            )
+        # A lookup and two inserts per chunk, whatever the chunk size
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 6)
+        self.assertIn("Imported 7 of 7 users", out)
+        self.assertIn("rows/s", out)
+        self.assertEqual(err, "")
+
+        user = User.objects.get(username="user4")
+        self.assertTrue(user.is_active)
+        self.assertTrue(user.check_password("secret4"))
+        self.assertEqual(user.profile.surname, "Surname4")
+
+    def test_hashes_in_worker_processes(self):
+        out, _ = self._import(
+            "username,email,password\na,a@example.com,first\nb,b@example.com,second\n",
+            workers=2,
+        )
+        self.assertIn("Imported 2 of 2 users", out)
+        self.assertTrue(User.objects.get(username="b").check_password("second"))
+        self.assertFalse(User.objects.get(username="a").is_active)
+
+    def test_reports_duplicates_and_bad_rows(self):
+        text = (
+            "username,email,password\n"
+            "taken,new@example.com,x\n"
+            "fresh,OLD@example.com,x\n"
+            "twice,twice@example.com,x\n"
+            "TWICE,other@example.com,x\n"
+            ",missing@example.com,x\n"
+            "ok,ok@example.com,x\n"
+        )
+        rejects = os.path.join(self.dir, "rejects.csv")
+        out, _ = self._import(text, workers=0, rejects=rejects)
+        self.assertIn("Imported 2 of 6 users", out)
+        with open(rejects) as f:
+            reasons = {row[0]: row[3] for row in list(csv.reader(f))[1:]}
+        self.assertEqual(reasons, {
+            "2": "username already exists",
+            "3": "email already exists",
+            "5": "username repeated in file",
+            "6": "missing username or email",
+        })
+
+    def test_accepts_prehashed_passwords(self):
+        with self.settings(PASSWORD_HASHERS=LEGACY_HASHERS):
+            legacy = make_password("legacy", hasher="pbkdf2_sha256")
+        text = (
+            "username,email,password\n"
+            f"moved,moved@example.com,{legacy}\n"
+            "broken,broken@example.com,plaintext\n"
+            "nopass,nopass@example.com,\n"
+        )
+        with self.settings(PASSWORD_HASHERS=LEGACY_HASHERS):
+            out, err = self._import(text, hashed=True)
+        self.assertIn("Imported 2 of 3 users", out)
+        self.assertIn("broken <broken@example.com> skipped, unrecognised password hash", err)
+        self.assertEqual(User.objects.get(username="moved").password, legacy)
+        self.assertFalse(User.objects.get(username="nopass").has_usable_password())
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(CommandError, "Missing column(s): email"):
+            self._import("username,password\nsomeone,x\n")
+
+
 class TestAuthenticatedRequests(TestCase):
     """Test endpoints that require authentication (login session)."""
 
@@ -252,6 +540,35 @@ class TestAuthenticatedRequests(TestCase):
         self.assertEqual(res.json().get("username"), self.user.username)
         self.assertEqual(res.json().get("email"), self.user.email)
 
+    def test_profile_is_served_from_cache(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            client.get("/profile", user=self.user)
+        with self.assertNumQueries(0):
+            res = client.get("/profile", user=self.user)
+        self.assertEqual(res.json().get("name"), "")
+
+        client.patch("/profile", data={"name": "Cached"}, user=self.user)
+        self.assertEqual(client.get("/profile", user=self.user).json().get("name"), "Cached")
+
+        self.user.email = "changed@example.com"
+        self.user.save()
+        res = client.get("/profile", user=self.user)
+        self.assertEqual(res.json().get("email"), "changed@example.com")
+
+    def test_login_keeps_cached_profile(self):
+        self.user.is_active = True
+        self.user.save()
+        client.get("/profile", user=self.user)
+        res = Client().post(
+            "/api/accounts/login",
+            data=json.dumps({"username": "dummy", "password": "testpass123"}),
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, http.HTTPStatus.OK)
+        with self.assertNumQueries(0):
+            client.get("/profile", user=self.user)
+
     def test_update_profile(self):
         payload = {"name": "Updated", "surname": "User"}
         res = client.patch("/profile", data=payload, user=self.user)
@@ -334,12 +651,124 @@ class TestAuthenticatedAdminRequests(TestCase):
         self.assertIn(res.status_code, (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.UNAUTHORIZED))
 
 
-@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class StaffUserListTests(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(
+            username="adminuser", email="admin@example.com", password="adminpass"
+        )
+        self.staff = create_user(
+            username="staffer", email="staff@example.com", password="pass",
+            is_active=True, is_staff=True,
+        )
+        self.customers = [
+            create_user(
+                username=f"cust{n}", email=f"shopper{n}@example.com",
+                password="pass", is_active=n % 3 != 0,
+            )
+            for n in range(25)
+        ]
+        Profile.objects.create(user=self.customers[0], name="First", surname="Customer")
+
+    def _list(self, user=None, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return client.get(f"/users?{query}", user=user or self.staff)
+
+    def test_keyset_pages_without_counting(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            with CaptureQueriesContext(connection) as queries:
+                res = self._list(**params)
+            self.assertEqual(res.status_code, HTTPStatus.OK)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn("COUNT(", queries[0]["sql"])
+            self.assertIn('"accounts_profile"', queries[0]["sql"])
+            data = res.json()
+            seen += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(User.objects.values_list("id", flat=True), reverse=True))
+        first = next(item for item in res.json()["items"] if item["id"] == self.customers[0].pk)
+        self.assertEqual(first["name"], "First")
+
+    def test_prefix_search_and_filters(self):
+        res = self._list(q="CUST1")
+        names = {item["username"] for item in res.json()["items"]}
+        self.assertEqual(names, {"cust1"} | {f"cust{n}" for n in range(10, 20)})
+
+        res = self._list(q="Shopper2", is_active="false")
+        names = {item["username"] for item in res.json()["items"]}
+        self.assertEqual(names, {"cust21", "cust24"})
+
+        res = self._list(is_staff="true")
+        names = {item["username"] for item in res.json()["items"]}
+        self.assertEqual(names, {"adminuser", "staffer"})
+
+    def test_search_uses_pattern_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._list(q="cust")
+        self.assertIn('UPPER("accounts_user"."username")', queries[0]["sql"])
+        self.assertIn("LIKE", queries[0]["sql"])
+
+    def test_invalid_cursor_and_permissions(self):
+        self.assertEqual(self._list(cursor="nonsense").status_code, HTTPStatus.BAD_REQUEST)
+        res = self._list(user=self.customers[1])
+        self.assertEqual(res.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_bulk_deactivate_is_one_update(self):
+        ids = [u.pk for u in self.customers[:5]] + [self.staff.pk, self.superuser.pk]
+        # Cache a payload that the update has to drop
+        client.get(f"/users/{self.customers[1].pk}", user=self.staff)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.post("/users/bulk-deactivate", json={"ids": ids}, user=self.staff)
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith("SELECT")])
+        # cust0 and cust3 were already inactive, the caller and superuser are skipped
+        self.assertEqual(res.json()["count"], 3)
+        self.assertTrue(User.objects.get(pk=self.staff.pk).is_active)
+        self.assertTrue(User.objects.get(pk=self.superuser.pk).is_active)
+
+        res = client.get(f"/users/{self.customers[1].pk}", user=self.staff)
+        self.assertFalse(res.json()["is_active"])
+
+        res = client.post("/users/bulk-activate", json={"ids": ids}, user=self.staff)
+        self.assertEqual(res.json()["count"], 5)
+
+    def test_bulk_delete_needs_superuser(self):
+        ids = [u.pk for u in self.customers[:4]]
+        res = client.post("/users/bulk-delete", json={"ids": ids}, user=self.staff)
+        self.assertIn(res.status_code, (HTTPStatus.FORBIDDEN, HTTPStatus.UNAUTHORIZED))
+
+        res = client.post(
+            "/users/bulk-delete", json={"ids": ids + [self.superuser.pk]}, user=self.superuser
+        )
+        self.assertEqual(res.json()["count"], 4)
+        self.assertFalse(User.objects.filter(pk__in=ids).exists())
+        # Profiles go with the purge jobs
+        self.assertTrue(Profile.objects.filter(user_id=self.customers[0].pk).exists())
+        run_pending()
+        self.assertFalse(Profile.objects.filter(user_id=self.customers[0].pk).exists())
+        self.assertTrue(User.objects.filter(pk=self.superuser.pk).exists())
+
+    def test_bulk_rejects_empty_selection(self):
+        res = client.post("/users/bulk-activate", json={"ids": []}, user=self.staff)
+        self.assertEqual(res.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+
+
 class TestProfileImageUpload(TestCase):
     def setUp(self):
         """
         Create an active test user and associated profile.
         """
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media_root,
+            UPLOAD_TEMP_ROOT=os.path.join(media_root, "tmp"),
+        ))
         self.user = User.objects.create_user(
             username="imguser",
             email="img@example.com",
@@ -371,35 +800,106 @@ class TestProfileImageUpload(TestCase):
         expected_path = f"uploads/profile/{uuid}.jpg"
         self.assertEqual(file_path, expected_path)
 
-    def test_upload_profile_image(self):
-        """
-        Uploads a valid image and ensures it is saved to storage correctly.
-        """
-        image_file = self.generate_temp_image()
-
-        image = SimpleUploadedFile(
-            name=image_file.name,
-            content=image_file.read(),
-            content_type="image/png",
-        )
-
-        # Perform multipart/form-data upload request
-        res = self.client.post(
+    def _upload(self, content, content_type="image/png", name="avatar.png"):
+        return self.client.post(
             "/api/accounts/upload-profile-image",
-            data={"image": image},
+            data={"image": SimpleUploadedFile(name, content, content_type=content_type)},
             format="multipart",
         )
 
-        self.assertEqual(res.status_code, HTTPStatus.OK, msg=res.content)
-        data = res.json()
-        self.assertIn("detail", data)
-        self.assertIn("image", data)
+    def test_upload_profile_image(self):
+        """
+        Uploads a valid image; the job worker stores its renditions.
+        """
+        res = self._upload(self.generate_temp_image().read())
 
-        # Refresh profile from DB to check if file persisted
+        self.assertEqual(res.status_code, HTTPStatus.ACCEPTED, msg=res.content)
+        data = res.json()
+        self.assertEqual(data["detail"], "Profile image is being processed.")
+        self.assertIsNone(data["image"])
         profile = Profile.objects.get(user=self.user)
-        normalized_path = os.path.normpath(profile.image.name)
+        self.assertFalse(profile.image)
+        self.assertTrue(profile.pending_image)
 
+        run_pending()
+        profile.refresh_from_db()
+        normalized_path = os.path.normpath(profile.image.name)
         self.assertIn(os.path.join("uploads", "profile"), normalized_path)
-        self.assertTrue(normalized_path.endswith(".png"))
+        self.assertTrue(normalized_path.endswith("-512.webp"))
         self.assertNotIn("avatar.png", profile.image.name)
-        self.assertEqual(data["detail"], "Profile image uploaded successfully.")
+        self.assertEqual(profile.pending_image, "")
+        with Image.open(profile.image.path) as stored:
+            self.assertEqual(stored.size, (512, 512))
+        # The staged upload is gone
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_ROOT), [])
+
+    def test_exif_is_stripped(self):
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"  # Make
+        exif[0x0112] = 6  # Orientation: rotate 90
+        file = io.BytesIO()
+        Image.new("RGB", (400, 300), color="red").save(file, format="JPEG", exif=exif.tobytes())
+        self._upload(file.getvalue(), content_type="image/jpeg", name="photo.jpg")
+        run_pending()
+
+        rendition = ProfileImage.objects.get()
+        for field in (rendition.image, rendition.thumbnail):
+            with Image.open(field.path) as stored:
+                self.assertEqual(len(stored.getexif()), 0)
+        with Image.open(rendition.thumbnail.path) as stored:
+            self.assertEqual(stored.size, (128, 128))
+
+    def test_identical_upload_reuses_renditions(self):
+        content = self.generate_temp_image().read()
+        self._upload(content)
+        run_pending()
+        first = Profile.objects.get(user=self.user).image.name
+
+        other = create_user(
+            username="twin", email="twin@example.com", password="testpass123", is_active=True
+        )
+        self.client.force_login(other)
+        with patch("accounts.utils.avatars.store_renditions") as store:
+            res = self._upload(content)
+        store.assert_not_called()
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertEqual(res.json()["detail"], "Profile image uploaded successfully.")
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(Profile.objects.get(user=other).image.name, first)
+        self.assertEqual(ProfileImage.objects.count(), 1)
+
+    def test_newer_upload_wins(self):
+        self._upload(self.generate_temp_image().read())
+        other = io.BytesIO()
+        Image.new("RGB", (50, 50), color="black").save(other, format="PNG")
+        self._upload(other.getvalue())
+        run_pending()
+
+        # The superseded upload is never rendered
+        self.assertEqual(ProfileImage.objects.count(), 1)
+        latest = ProfileImage.objects.latest("id")
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.image.name, latest.image.name)
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_ROOT), [])
+
+    def test_rejects_decompression_bomb(self):
+        # A few dozen bytes whose header declares 100000 x 100000 pixels
+        header = struct.pack(">IIBBBBB", 100000, 100000, 8, 2, 0, 0, 0)
+        chunk = b"IHDR" + header
+        bomb = (
+            b"\x89PNG\r\n\x1a\n"
+            + struct.pack(">I", len(header)) + chunk
+            + struct.pack(">I", zlib.crc32(chunk))
+            # Header parsing stops at the first image data chunk
+            + struct.pack(">I", 0) + b"IDAT" + struct.pack(">I", zlib.crc32(b"IDAT"))
+        )
+        res = self._upload(bomb)
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_ROOT), [])
+
+    def test_rejects_non_image(self):
+        res = self._upload(b"not an image at all")
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_ROOT), [])
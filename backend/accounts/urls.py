@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import EmailVerificationView
+from .views import EmailVerificationView, PasswordUpdateView
 
 urlpatterns = [
     path(
@@ -7,4 +7,9 @@ urlpatterns = [
         EmailVerificationView.as_view(),
         name='email-verification'
     ),
+    path(
+        'password-update/<uidb64>/<token>/',
+        PasswordUpdateView.as_view(),
+        name='password-update'
+    ),
 ]
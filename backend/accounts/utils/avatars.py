@@ -0,0 +1,166 @@
+"""
+Profile image processing off the request path.
+
+The upload view streams the file into UPLOAD_TEMP_ROOT, hashing it on the
+way, and queues a job. The worker decodes it with Pillow, applies the EXIF
+orientation, and stores square WebP renditions without any metadata under
+names derived from the content hash. Content seen before reuses the stored
+renditions, so identical uploads cost no image work and no storage writes.
+"""
+import io
+import os
+import uuid
+import hashlib
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from ..models import Profile, ProfileImage
+
+try:
+    from pillow_heif import register_heif_opener
+except ImportError:
+    pass
+else:
+    # Phones upload HEIC by default
+    register_heif_opener()
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZE = 512
+THUMBNAIL_SIZE = 128
+
+
+def temp_path(name):
+    return os.path.join(settings.UPLOAD_TEMP_ROOT, name)
+
+
+def stage_upload(upload):
+    """Copy an upload into temp storage chunk by chunk. Returns (name, sha256)."""
+    os.makedirs(settings.UPLOAD_TEMP_ROOT, exist_ok=True)
+    name = f"{uuid.uuid4().hex}.upload"
+    digest = hashlib.sha256()
+    with open(temp_path(name), "wb") as out:
+        for chunk in upload.chunks():
+            digest.update(chunk)
+            out.write(chunk)
+    return name, digest.hexdigest()
+
+
+def discard_upload(name):
+    try:
+        os.remove(temp_path(name))
+    except FileNotFoundError:
+        pass
+
+
+def is_image(name):
+    """Cheap check that reads only the file header."""
+    try:
+        with Image.open(temp_path(name)):
+            return True
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        # Including headers claiming more pixels than would be decoded
+        return False
+
+
+def render(image, size):
+    """Square crop of `image` at `size` pixels, as WebP bytes."""
+    square = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    # Passing empty exif keeps camera and location data out of the file
+    square.save(out, "WEBP", quality=85, exif=b"")
+    return out.getvalue()
+
+
+def store_renditions(sha256, path):
+    with Image.open(path) as source:
+        # JPEGs decode straight to a reduced scale, far cheaper for photos
+        source.draft("RGB", (AVATAR_SIZE * 2, AVATAR_SIZE * 2))
+        image = ImageOps.exif_transpose(source)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    prefix = f"uploads/profile/{sha256[:2]}/{sha256}"
+    return {
+        field: default_storage.save(f"{prefix}-{size}.webp", ContentFile(render(image, size)))
+        for field, size in (("image", AVATAR_SIZE), ("thumbnail", THUMBNAIL_SIZE))
+    }
+
+
+def get_or_create_renditions(sha256, path):
+    rendition = ProfileImage.objects.filter(sha256=sha256).first()
+    if rendition is not None:
+        return rendition
+    names = store_renditions(sha256, path)
+    try:
+        with transaction.atomic():
+            return ProfileImage.objects.create(sha256=sha256, **names)
+    except IntegrityError:
+        # Another worker stored the same content first
+        rendition = ProfileImage.objects.get(sha256=sha256)
+        for name in names.values():
+            if name not in (rendition.image.name, rendition.thumbnail.name):
+                default_storage.delete(name)
+        return rendition
+
+
+def _delete_if_unused(name):
+    # Renditions are shared, only files uploaded before them are removed
+    if (
+        name
+        and not ProfileImage.objects.filter(image=name).exists()
+        and not Profile.objects.filter(image=name).exists()
+    ):
+        default_storage.delete(name)
+
+
+def set_profile_image(profile, rendition):
+    old = profile.image.name if profile.image else ""
+    profile.image.name = rendition.image.name
+    profile.pending_image = ""
+    profile.save(update_fields=["image", "pending_image"])
+    if old != rendition.image.name:
+        _delete_if_unused(old)
+
+
+def attach_upload(profile, upload, sha256):
+    """
+    Use known content straight away and return True. Otherwise mark the
+    upload pending for the worker and return False.
+    """
+    rendition = ProfileImage.objects.filter(sha256=sha256).first()
+    if rendition is not None:
+        discard_upload(upload)
+        set_profile_image(profile, rendition)
+        return True
+    profile.pending_image = upload
+    profile.save(update_fields=["pending_image"])
+    return False
+
+
+def process_upload(profile_id, upload, sha256):
+    """Render a staged upload and set it on the profile, if still wanted."""
+    if not Profile.objects.filter(pk=profile_id, pending_image=upload).exists():
+        # Replaced by a newer upload while it waited, or already processed
+        discard_upload(upload)
+        return
+    try:
+        rendition = get_or_create_renditions(sha256, temp_path(upload))
+    except FileNotFoundError:
+        # Already processed by an earlier run of this job
+        return
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning("Rejected profile image %s: %s", upload, exc)
+        Profile.objects.filter(pk=profile_id, pending_image=upload).update(pending_image="")
+        discard_upload(upload)
+        return
+
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().filter(pk=profile_id).first()
+        # Checked again in case a newer upload arrived while rendering
+        if profile is not None and profile.pending_image == upload:
+            set_profile_image(profile, rendition)
+    discard_upload(upload)
@@ -1,7 +1,11 @@
+from django.utils.functional import SimpleLazyObject
 from ..models import Profile
 
-def profile_context(request):
-    profile = None
+def _get_profile(request):
     if request.user.is_authenticated:
-        profile = Profile.objects.filter(user=request.user).first()
-    return {'profile': profile}
\ No newline at end of file
+        return Profile.objects.filter(user=request.user).first()
+    return None
+
+def profile_context(request):
+    # Deferred so pages that never render the profile skip the query
+    return {'profile': SimpleLazyObject(lambda: _get_profile(request))}
@@ -1,12 +1,12 @@
 # core/email_utils.py
 import os
-from django.core.mail import EmailMessage
-from django.utils.html import strip_tags
-from django.template.loader import render_to_string
+from functools import lru_cache
+from django.template.loader import get_template, render_to_string
 from django.contrib.sites.shortcuts import get_current_site
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from .tokens import user_tokenizer_generate
+from core.utils.outbox import queue_email
+from .tokens import user_tokenizer_generate, password_reset_token
 
 def send_verification_email(request, user):
     platform_name = os.getenv("PLATFORM", "")
@@ -24,35 +24,26 @@ def send_verification_email(request, user):
         }
     )
     #plain_message = strip_tags(html_message)  # fallback text-only version
-    email = EmailMessage(
-        subject=subject,
-        body=html_message,
-        from_email=None,  # uses DEFAULT_FROM_EMAIL
-        to=[recipient_email],
-    )
-    email.content_subtype = "html"  # send as HTML
-    email.send()
+    # Delivered by the job worker, never on the request path
+    return queue_email(subject, html_message, [recipient_email])
 
 
-def send_password_reset_email(request, user):
-    recipient_email = user.email
-    subject = "Password Update Request Recieved"
-    current_site = get_current_site(request)
-    html_message = render_to_string(
-        "emails/password/password-restet.html", 
-        {
-            "username": user.username,
-            "domain": current_site,
-            "uid": urlsafe_base64_encode(force_bytes(user.pk)),
-            "token": user_tokenizer_generate.make_token(user)
-        }
-    )
-    plain_message = strip_tags(html_message)  # fallback text-only version
-    email = EmailMessage(
-        subject=subject,
-        body=html_message,
-        from_email=None,  # uses DEFAULT_FROM_EMAIL
-        to=[recipient_email],
-    )
-    email.content_subtype = "html"  # send as HTML
-    email.send()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def compiled_template(name):
+    """Parse an email template once per process."""
+    return get_template(name)
+
+
+def send_password_reset_email(user, domain):
+    """
+    Queue a reset link for `user`. Runs in the job worker, so it takes the
+    site domain captured with the request rather than the request itself.
+    """
+    subject = "Password Update Request Received"
+    html_message = compiled_template("emails/password/password-reset.html").render({
+        "username": user.username,
+        "domain": domain,
+        "uid": urlsafe_base64_encode(force_bytes(user.pk)),
+        "token": password_reset_token.make_token(user),
+    })
+    return queue_email(subject, html_message, [user.email])
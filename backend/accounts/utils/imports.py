@@ -0,0 +1,250 @@
+"""
+Bulk import of users from a CSV export.
+
+`create_user` saves and hashes one user at a time, which makes migrating
+a large customer base take hours. Here rows are read lazily, passwords are
+hashed in a pool of worker processes while earlier chunks are written, and
+each chunk of users and profiles goes in with two `bulk_create` calls.
+
+Rows clashing with an existing account are found with one query per
+chunk against the case-insensitive unique indexes; clashes within the file
+are caught before they reach the database.
+"""
+import csv
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+from accounts.models import Profile
+
+User = get_user_model()
+
+CHUNK_SIZE = 1000
+# Passwords per task handed to a worker; small enough to keep every
+# worker busy, large enough that pickling costs nothing next to hashing
+HASH_BATCH = 50
+REQUIRED_COLUMNS = {'username', 'email'}
+TRUTHY = {'1', 't', 'true', 'y', 'yes'}
+
+
+@dataclass(frozen=True)
+class ImportRow:
+    line: int
+    username: str
+    email: str
+    password: str
+    name: str = ''
+    surname: str = ''
+    is_active: bool = False
+
+
+@dataclass(frozen=True)
+class Rejected:
+    line: int
+    username: str
+    email: str
+    reason: str
+
+
+def read_rows(stream, activate=False):
+    """
+    Return an iterator of ImportRow, or Rejected for an unusable line, per
+    CSV record. Columns besides username and email are optional.
+    """
+    reader = csv.DictReader(stream)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f'Missing column(s): {", ".join(sorted(missing))}')
+    return (_parse(reader.line_num, record, activate) for record in reader)
+
+
+def _parse(line, record, activate):
+    username = (record.get('username') or '').strip()
+    email = User.objects.normalize_email((record.get('email') or '').strip())
+    if not username or not email:
+        return Rejected(line, username, email, 'missing username or email')
+    return ImportRow(
+        line=line,
+        username=username,
+        email=email,
+        password=record.get('password') or '',
+        name=(record.get('name') or '').strip(),
+        surname=(record.get('surname') or '').strip(),
+        is_active=activate or (record.get('is_active') or '').strip().lower() in TRUTHY,
+    )
+
+
+def _init_worker():
+    # Workers started with spawn or forkserver import settings afresh
+    django.setup()
+
+
+def hash_passwords(passwords):
+    """Encode plain passwords; blank ones become unusable passwords."""
+    return [make_password(password or None) for password in passwords]
+
+
+def check_hashes(encoded):
+    """
+    Pass through hashes from a previous system, or None for those no
+    configured hasher recognises. They are upgraded to the current hasher
+    on each user's first login.
+    """
+    checked = []
+    for value in encoded:
+        if not value:
+            checked.append(make_password(None))
+            continue
+        try:
+            identify_hasher(value)
+        except ValueError:
+            checked.append(None)
+        else:
+            checked.append(value)
+    return checked
+
+
+def _dedupe(rows, seen_usernames, seen_emails):
+    """Split a chunk into new rows and rows repeating an earlier line."""
+    fresh, rejected = [], []
+    for row in rows:
+        if isinstance(row, Rejected):
+            rejected.append(row)
+            continue
+        username, email = row.username.upper(), row.email.upper()
+        if username in seen_usernames:
+            rejected.append(Rejected(row.line, row.username, row.email, 'username repeated in file'))
+        elif email in seen_emails:
+            rejected.append(Rejected(row.line, row.username, row.email, 'email repeated in file'))
+        else:
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            fresh.append(row)
+    return fresh, rejected
+
+
+def _taken(rows):
+    """Upper-cased usernames and emails of `rows` already in use."""
+    usernames = [row.username.upper() for row in rows]
+    emails = [row.email.upper() for row in rows]
+    # Soft-deleted users still hold their names until purged
+    existing = (
+        User.all_objects
+        .alias(username_upper=Upper('username'), email_upper=Upper('email'))
+        .filter(Q(username_upper__in=usernames) | Q(email_upper__in=emails))
+        .values_list('username', 'email')
+    )
+    taken_usernames, taken_emails = set(), set()
+    for username, email in existing:
+        taken_usernames.add(username.upper())
+        taken_emails.add(email.upper())
+    return taken_usernames, taken_emails
+
+
+def _build(row, encoded):
+    user = User(
+        username=row.username, email=row.email,
+        password=encoded, is_active=row.is_active,
+    )
+    return user, Profile(user=user, name=row.name, surname=row.surname)
+
+
+def insert_chunk(rows, hashes):
+    """
+    Create users and profiles for `rows`, paired with their encoded
+    passwords. Returns (created, rejected).
+    """
+    rejected = []
+    ready = []
+    for row, encoded in zip(rows, hashes):
+        if encoded is None:
+            rejected.append(Rejected(row.line, row.username, row.email, 'unrecognised password hash'))
+        else:
+            ready.append((row, encoded))
+    if not ready:
+        return 0, rejected
+
+    taken_usernames, taken_emails = _taken([row for row, _ in ready])
+    accepted = []
+    for row, encoded in ready:
+        if row.username.upper() in taken_usernames:
+            rejected.append(Rejected(row.line, row.username, row.email, 'username already exists'))
+        elif row.email.upper() in taken_emails:
+            rejected.append(Rejected(row.line, row.username, row.email, 'email already exists'))
+        else:
+            accepted.append((row, *_build(row, encoded)))
+    if not accepted:
+        return 0, rejected
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user, _ in accepted])
+            Profile.objects.bulk_create([profile for _, _, profile in accepted])
+    except IntegrityError:
+        # Someone signed up with one of these names since the check, or
+        # Postgres upper-cases a character differently; find which rows
+        created = 0
+        for row, user, profile in accepted:
+            user.pk = None
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                    profile.user = user
+                    profile.save(force_insert=True)
+            except IntegrityError:
+                rejected.append(Rejected(row.line, row.username, row.email, 'already exists'))
+            else:
+                created += 1
+        return created, rejected
+    return len(accepted), rejected
+
+
+def import_users(rows, hashed=False, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Import `rows` from `read_rows` in chunks, yielding (rows read, created,
+    rejected) per chunk. With `hashed`, passwords are already encoded;
+    otherwise they are hashed by `workers` processes, or in this process
+    when `workers` is 0.
+    """
+    seen_usernames, seen_emails = set(), set()
+    chunks = itertools.batched(rows, chunk_size)
+    pool = None
+    if not hashed and workers != 0:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    def prepare(chunk):
+        fresh, rejected = _dedupe(chunk, seen_usernames, seen_emails)
+        passwords = [row.password for row in fresh]
+        if hashed:
+            hashes = check_hashes(passwords)
+        elif pool is None:
+            hashes = hash_passwords(passwords)
+        else:
+            # Resolved when the chunk's turn comes to be written
+            hashes = [
+                pool.submit(hash_passwords, list(batch))
+                for batch in itertools.batched(passwords, HASH_BATCH)
+            ]
+        return len(chunk), fresh, rejected, hashes
+
+    try:
+        # Keep the workers fed with the next chunks while one is written
+        lookahead = 1 if pool is None else 2
+        pending = deque(prepare(chunk) for chunk in itertools.islice(chunks, lookahead))
+        while pending:
+            count, fresh, rejected, hashes = pending.popleft()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(prepare(chunk))
+            if pool is not None:
+                hashes = [encoded for future in hashes for encoded in future.result()]
+            created, clashes = insert_chunk(fresh, hashes)
+            yield count, created, rejected + clashes
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,63 @@
+"""
+Cached read path for a user and their profile.
+
+The SPA fetches /profile on every navigation, so the serialized payload is
+kept per user in the shared cache and dropped whenever the User or Profile
+row is saved or deleted. A miss costs one query joining both tables.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from ..models import Profile
+
+User = get_user_model()
+
+PROFILE_CACHE_TIMEOUT = 60 * 15
+
+
+def profile_cache_key(user_id):
+    return f"accounts:profile:{user_id}"
+
+
+def serialize_user(user):
+    """UserOutSchema payload for a user fetched with select_related('profile')."""
+    try:
+        profile = user.profile
+    except Profile.DoesNotExist:
+        profile = None
+    return {
+        "id": user.pk,
+        "username": user.username,
+        "email": user.email,
+        "name": profile.name if profile else "",
+        "surname": profile.surname if profile else "",
+        "is_active": user.is_active,
+        "is_staff": user.is_staff,
+    }
+
+
+def get_user_payload(user_id):
+    """Serialized user and profile, or None if the user does not exist."""
+    key = profile_cache_key(user_id)
+    payload = cache.get(key)
+    if payload is None:
+        user = User.objects.select_related("profile").filter(pk=user_id).first()
+        if user is None:
+            return None
+        payload = serialize_user(user)
+        cache.set(key, payload, timeout=PROFILE_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_user_payload(user_id):
+    key = profile_cache_key(user_id)
+    cache.delete(key)
+    # Again once committed, in case a read cached the old row in between
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_user_payloads(user_ids):
+    """Drop cached payloads after a queryset update, which sends no signals."""
+    keys = [profile_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -6,3 +6,21 @@ class UserVerificationTokenGenerator(PasswordResetTokenGenerator):
         return f"{user.pk}{timestamp}{user.is_active}"
 
 user_tokenizer_generate = UserVerificationTokenGenerator()
+
+
+class UserPasswordResetTokenGenerator(UserVerificationTokenGenerator):
+    # Own salt so a verification link cannot be replayed as a reset link
+    key_salt = "accounts.utils.tokens.UserPasswordResetTokenGenerator"
+
+    def _make_hash_value(self, user, timestamp):
+        # Changing the password or logging in spends the token
+        login_timestamp = (
+            "" if user.last_login is None
+            else user.last_login.replace(microsecond=0, tzinfo=None)
+        )
+        return (
+            super()._make_hash_value(user, timestamp)
+            + f"{user.password}{login_timestamp}"
+        )
+
+password_reset_token = UserPasswordResetTokenGenerator()
@@ -6,3 +6,10 @@ class EmailVerificationView(TemplateView):
     def get(self, request, uidb64, token):
         # For testing purposes, just return a basic response
         return HttpResponse("Email verified!")
+
+
+class PasswordUpdateView(TemplateView):
+    template_name = 'account/password/password-update.html'
+    def get(self, request, uidb64, token):
+        # The client posts the new password to /api/accounts/password-reset/confirm
+        return HttpResponse("Choose a new password.")
@@ -1,9 +1,11 @@
 import logging
 from ninja_extra import NinjaExtraAPI
+from core.utils.ratelimit import RateLimited
 from cart.api import router as cart_router
 from store.api import router as product_router
 from accounts.api import router as accounts_router
 from payments.api import router as payments_router
+from reports.api import router as reports_router
 from home.api import router as home_router
 from blog.api import router as blog_router
 
@@ -11,9 +13,22 @@ logger = logging.getLogger(__name__)
 
 api = NinjaExtraAPI(csrf=True)
 
+
+@api.exception_handler(RateLimited)
+def rate_limited(request, exc):
+    response = api.create_response(
+        request,
+        {"detail": "Too many requests, please try again later."},
+        status=429,
+    )
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
 api.add_router("/accounts", accounts_router)
 api.add_router("/store", product_router)
 api.add_router("/cart", cart_router)
 api.add_router("/payments", payments_router)
+api.add_router("/reports", reports_router)
 api.add_router("/home", home_router)
 api.add_router("/blog", blog_router)
\ No newline at end of file
@@ -40,8 +40,8 @@ logger = logging.getLogger(__name__)
 
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
-    'accounts.backends.auth.EmailOrUsernameBackend'
+    # Subclasses ModelBackend, so permissions still resolve through it
+    'accounts.backends.auth.EmailOrUsernameBackend',
 ]
 
 # Application definition
@@ -74,6 +74,7 @@ INSTALLED_APPS = [
     'store',
     'accounts',
     'payments', 
+    'reports',
     'home',
     'blog',
 ]
@@ -99,6 +100,10 @@ else:
         )
     ]
 
+    FULFILMENT_EMAILS = list(filter(
+        None, os.getenv('FULFILMENT_EMAILS', '').split(',')
+    ))
+
     if not EMAIL_HOST or not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD:
         raise Exception('SMTP credentials are not fully defined')
 
@@ -170,6 +175,33 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Rate limit counters and the version counters for the in-process lookup
+# tables live here, so every worker must share it. docker-compose.prod.yaml
+# points it at the memcached service (PyMemcacheCache, cache:11211).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Rate limiting, see core/utils/ratelimit.py
+RATELIMIT = {
+    # The test runner below switches it off; limiter tests switch it back on
+    'ENABLED': os.environ.get('RATELIMIT_ENABLED', '1') == '1',
+    'BACKEND': 'core.utils.ratelimit.CacheBackend',
+    'OPTIONS': {'alias': 'default'},
+    # Header the proxy puts the client address in, REMOTE_ADDR when unset
+    'IP_HEADER': os.environ.get('RATELIMIT_IP_HEADER'),
+}
+
+TEST_RUNNER = 'core.utils.testrunner.TestRunner'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -188,6 +220,32 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# The first hasher in a profile hashes new passwords, the rest only verify
+# old hashes. Logging in upgrades a hash made by another hasher, or by the
+# same one with other work factors, so profiles can change without a migration.
+# Time each profile on the target machine with `manage.py benchmark_hashers`.
+
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'accounts.backends.hashers.TunedArgon2PasswordHasher',
+    ],
+    'argon2': [
+        'accounts.backends.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ],
+}
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+# Argon2id work factors; memory_cost is in KiB
+ARGON2_PARAMS = {
+    'time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 19 * 1024)),
+    'parallelism': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+}
+
 AUTH_USER_MODEL = 'accounts.User'
 
 # Internationalization
@@ -247,6 +305,11 @@ else: # Local development
     MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'mediafiles'))
 
 
+# Uploads wait here for the job worker, so both must share this directory
+UPLOAD_TEMP_ROOT = os.getenv('UPLOAD_TEMP_ROOT', os.path.join(BASE_DIR, 'uploads-tmp'))
+PROFILE_IMAGE_MAX_SIZE = 20 * 1024 * 1024
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
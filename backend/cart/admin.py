@@ -1,9 +1,24 @@
-from .models import Coupon
+from .models import Coupon, AbandonedCart
 from django.contrib import admin
 
 
 class CouponAdmin(admin.ModelAdmin):
-    list_display = ('name', 'discount', 'is_active')
+    list_display = (
+        'name', 'discount', 'is_active', 'valid_from', 'valid_until',
+        'times_used', 'max_uses'
+    )
+    list_filter = ('is_active',)
+    readonly_fields = ('times_used',)
+    filter_horizontal = ('products', 'categories')
 
 
-admin.site.register(Coupon, CouponAdmin)
\ No newline at end of file
+admin.site.register(Coupon, CouponAdmin)
+
+@admin.register(AbandonedCart)
+class AbandonedCartAdmin(admin.ModelAdmin):
+    list_display = ('session_key', 'expired_at', 'item_count', 'subtotal', 'coupon')
+    list_filter = ('expired_at',)
+    readonly_fields = (
+        'session_key', 'expired_at', 'user', 'items',
+        'item_count', 'subtotal', 'coupon'
+    )
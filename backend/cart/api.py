@@ -45,6 +45,7 @@ def apply_coupon(request, data: CouponApplySchema):
 @router.get("/items", response=CartListResponseSchema)
 def get_cart(request):
     cart = Cart(request)
+    changes = cart.revalidate()
     items = []
     for item in cart:
         items.append(
@@ -61,4 +62,5 @@ def get_cart(request):
         "items": items,
         "cart_qty": len(cart),
         "total": total,
+        "changes": changes,
     }
@@ -0,0 +1,68 @@
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_alter_coupon_discount'),
+        ('store', '0006_rename_title_product_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coupon',
+            name='valid_from',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='valid_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='min_spend',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='max_uses',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='max_uses_per_user',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='times_used',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='products',
+            field=models.ManyToManyField(blank=True, related_name='coupons', to='store.product'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='categories',
+            field=models.ManyToManyField(blank=True, related_name='coupons', to='store.category'),
+        ),
+        migrations.CreateModel(
+            name='CouponRedemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('redeemed_at', models.DateTimeField(auto_now_add=True)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redemptions', to='cart.coupon')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['coupon', 'user'], name='cart_redemption_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0004_coupon_rules_couponredemption'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbandonedCart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40)),
+                ('expired_at', models.DateTimeField(db_index=True)),
+                ('items', models.JSONField(default=dict)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('coupon', models.CharField(blank=True, max_length=50)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Abandoned Carts',
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Coupon(models.Model):
@@ -8,6 +9,67 @@ class Coupon(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(33)]
     )
     is_active = models.BooleanField(default=True)
+    # Validity window, open-ended when unset
+    valid_from = models.DateTimeField(null=True, blank=True)
+    valid_until = models.DateTimeField(null=True, blank=True)
+    min_spend = models.DecimalField(
+        max_digits=8, decimal_places=2, default=0,
+        validators=[MinValueValidator(0)]
+    )
+    # Usage limits, unlimited when unset
+    max_uses = models.PositiveIntegerField(null=True, blank=True)
+    max_uses_per_user = models.PositiveIntegerField(null=True, blank=True)
+    times_used = models.PositiveIntegerField(default=0, editable=False)
+    # Scoping, applies to the whole cart when both are empty
+    products = models.ManyToManyField(
+        'store.Product', related_name='coupons', blank=True
+    )
+    categories = models.ManyToManyField(
+        'store.Category', related_name='coupons', blank=True
+    )
+
+    def __str__(self):
+        return f"{self.name} - {round(self.discount)}% off"
+
+
+class CouponRedemption(models.Model):
+    coupon = models.ForeignKey(
+        Coupon, related_name='redemptions', on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True
+    )
+    redeemed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['coupon', 'user'], name='cart_redemption_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon.name} - #{self.pk}"
+
+
+class AbandonedCart(models.Model):
+    """Compact snapshot of a non-empty cart whose session expired."""
+    session_key = models.CharField(max_length=40)
+    expired_at = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True, blank=True
+    )
+    # {product_id: qty}
+    items = models.JSONField(default=dict)
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    coupon = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Abandoned Carts'
 
     def __str__(self):
-        return f"{self.name} - {round(self.discount)}% off"
\ No newline at end of file
+        return f"Abandoned Cart - #{self.pk}"
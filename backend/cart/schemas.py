@@ -1,5 +1,5 @@
 from ninja import Schema
-from typing import List
+from typing import List, Optional
 
 
 
@@ -26,7 +26,16 @@ class CartItemSchema(Schema):
     price: float
     slug: str
 
+class CartChangeSchema(Schema):
+    product_id: int
+    old_price: float
+    new_price: Optional[float] = None
+    old_discount: float
+    new_discount: Optional[float] = None
+    removed: bool = False
+
 class CartListResponseSchema(Schema):
     items: List[CartItemSchema]
     cart_qty: int
-    total: float
\ No newline at end of file
+    total: float
+    changes: List[CartChangeSchema] = []
\ No newline at end of file
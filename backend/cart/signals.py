@@ -0,0 +1,17 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from .models import Coupon
+from .utils.coupons import active_coupons
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupons(sender, **kwargs):
+    active_coupons.invalidate()
+
+
+@receiver(m2m_changed, sender=Coupon.products.through)
+@receiver(m2m_changed, sender=Coupon.categories.through)
+def invalidate_coupon_scope(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        active_coupons.invalidate()
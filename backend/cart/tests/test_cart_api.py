@@ -5,7 +5,11 @@ from store.models import Product, Category
 from cart.models import Coupon
 from cart.api import router  
 from http import HTTPStatus
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 
 client = TestClient(router)
 
@@ -132,3 +136,113 @@ class CartApiTests(TestCase):
         qty_map = {item['product_id']: item['qty'] for item in data['items']}
         self.assertEqual(qty_map[self.product1.pk], 2)
         self.assertEqual(qty_map[self.product2.pk], 1)
+
+    def test_apply_inactive_coupon(self):
+        Coupon.objects.create(name="RETIRED", discount=10, is_active=False)
+        res = self.session_client.post(
+            "/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": "RETIRED"}
+        )
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertFalse(res.json()['success'])
+
+    def test_apply_expired_coupon(self):
+        Coupon.objects.create(
+            name="EXPIRED", discount=10,
+            valid_until=timezone.now() - timedelta(days=1)
+        )
+        res = self.session_client.post(
+            "/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": "EXPIRED"}
+        )
+        self.assertFalse(res.json()['success'])
+
+    def test_coupon_scoped_to_product(self):
+        scoped = Coupon.objects.create(name="SCOPED", discount=10)
+        scoped.products.add(self.product1)
+        for product in (self.product1, self.product2):
+            self.session_client.post("/api/cart/update",
+                content_type="application/json",
+                data={"product_id": product.pk, "product_qty": 1, "action": "post"}
+            )
+        self.session_client.post(
+            "/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": "SCOPED"}
+        )
+        res = self.session_client.get("/api/cart/items")
+        # Only product1 (10.00) gets 10% off
+        self.assertAlmostEqual(res.json()['total'], 19.0)
+
+    def test_coupon_min_spend(self):
+        Coupon.objects.create(name="BIGSPEND", discount=10, min_spend=100)
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product1.pk, "product_qty": 1, "action": "post"}
+        )
+        self.session_client.post(
+            "/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": "BIGSPEND"}
+        )
+        res = self.session_client.get("/api/cart/items")
+        self.assertAlmostEqual(res.json()['total'], 10.0)
+
+    def test_apply_coupon_is_query_free_once_compiled(self):
+        self.session_client.post(
+            "/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": self.coupon.name}
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self.session_client.post(
+                "/api/cart/apply-coupon",
+                content_type="application/json",
+                data={"coupon_code": self.coupon.name}
+            )
+        coupon_queries = [
+            q for q in ctx.captured_queries if 'cart_coupon' in q['sql']
+        ]
+        self.assertEqual(coupon_queries, [])
+
+    def test_get_cart_reports_price_changes(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product1.pk, "product_qty": 2, "action": "post"}
+        )
+        res = self.session_client.get("/api/cart/items")
+        self.assertEqual(res.json()['changes'], [])
+
+        self.product1.price = 12
+        self.product1.save()
+
+        res = self.session_client.get("/api/cart/items")
+        data = res.json()
+        self.assertEqual(len(data['changes']), 1)
+        self.assertEqual(data['changes'][0]['product_id'], self.product1.pk)
+        self.assertEqual(data['changes'][0]['new_price'], 12.0)
+        self.assertAlmostEqual(data['total'], 24.0)
+
+        # The cart is stamped again, so the next read reports nothing
+        res = self.session_client.get("/api/cart/items")
+        self.assertEqual(res.json()['changes'], [])
+
+    def test_revalidation_skipped_when_catalog_unchanged(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product1.pk, "product_qty": 1, "action": "post"}
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self.session_client.post("/api/cart/delete",
+                content_type="application/json",
+                data={"product_id": self.product2.pk, "action": "post"}
+            )
+            res = self.session_client.get("/api/cart/items")
+        product_queries = [
+            q for q in ctx.captured_queries if 'store_product' in q['sql']
+        ]
+        # Only the item listing itself touches products
+        self.assertEqual(len(product_queries), 1)
+        self.assertEqual(res.json()['changes'], [])
@@ -1,8 +1,18 @@
 """
 Module for testing any models within the core app.
 """
+from io import StringIO
 from decimal import Decimal
+from datetime import timedelta
+from importlib import import_module
+from django.conf import settings
 from django.test import TestCase
+from django.utils import timezone
+from django.core.management import call_command
+from django.contrib.sessions.models import Session
+from cart.utils.sweeper import run_sweep
+from core.utils.tests import get_user
+from cart.utils.coupons import get_coupon, redeem_coupon, CouponUnavailable
 from .. import models
 
 
@@ -19,4 +29,94 @@ class ModelTests(TestCase):
             is_active=True
         )
         
-        self.assertEqual(str(coupon), f"{name} - {round(discount)}% off")
\ No newline at end of file
+        self.assertEqual(str(coupon), f"{name} - {round(discount)}% off")
+
+class CouponRedemptionTests(TestCase):
+    def setUp(self):
+        self.user = get_user()
+
+    def test_redeem_increments_counter(self):
+        coupon = models.Coupon.objects.create(name="ONCE", discount=5, max_uses=1)
+        redeem_coupon(get_coupon("ONCE"), self.user)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.times_used, 1)
+        self.assertEqual(coupon.redemptions.count(), 1)
+
+    def test_redeem_respects_global_limit(self):
+        models.Coupon.objects.create(name="ONCE", discount=5, max_uses=1)
+        compiled = get_coupon("ONCE")
+        redeem_coupon(compiled, self.user)
+        with self.assertRaises(CouponUnavailable):
+            redeem_coupon(compiled, get_user())
+
+    def test_redeem_respects_per_user_limit(self):
+        coupon = models.Coupon.objects.create(
+            name="PERUSER", discount=5, max_uses_per_user=1
+        )
+        compiled = get_coupon("PERUSER")
+        redeem_coupon(compiled, self.user)
+        with self.assertRaises(CouponUnavailable):
+            redeem_coupon(compiled, self.user)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.times_used, 1)
+
+    def test_last_use_invalidates_stale_snapshot(self):
+        coupon = models.Coupon.objects.create(name="TWICE", discount=5, max_uses=2)
+        compiled = get_coupon("TWICE")
+        # Another process redeemed it since this one compiled its table
+        models.Coupon.objects.filter(pk=coupon.pk).update(times_used=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            redeem_coupon(compiled, self.user)
+        self.assertIsNone(get_coupon("TWICE"))
+
+    def test_edit_invalidates_compiled_coupon(self):
+        coupon = models.Coupon.objects.create(name="EDIT", discount=5)
+        self.assertIsNotNone(get_coupon("EDIT"))
+        coupon.is_active = False
+        coupon.save()
+        self.assertIsNone(get_coupon("EDIT"))
+
+
+class SessionSweeperTests(TestCase):
+    def setUp(self):
+        self.store = import_module(settings.SESSION_ENGINE).SessionStore
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        self.cart_session = self._session('cart', past, {'session_key': {
+            '7': {'price': '10.00', 'discount': 0, 'qty': 3},
+        }, 'coupon': 'SAVE'})
+        self._session('empty', past, {'session_key': {}})
+        self._session('live', future, {'session_key': {
+            '7': {'price': '10.00', 'discount': 0, 'qty': 1},
+        }})
+
+    def _session(self, key, expires, data):
+        return Session.objects.create(
+            session_key=key,
+            session_data=self.store().encode(data),
+            expire_date=expires
+        )
+
+    def test_sweep_deletes_expired_and_snapshots_carts(self):
+        deleted, snapshotted, _ = run_sweep(batch_size=1)
+        self.assertEqual((deleted, snapshotted), (2, 1))
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['live']
+        )
+        snapshot = models.AbandonedCart.objects.get()
+        self.assertEqual(snapshot.session_key, 'cart')
+        self.assertEqual(snapshot.items, {'7': 3})
+        self.assertEqual(snapshot.item_count, 3)
+        self.assertEqual(snapshot.subtotal, Decimal('30.00'))
+        self.assertEqual(snapshot.coupon, 'SAVE')
+
+    def test_sweep_without_snapshot(self):
+        deleted, snapshotted, _ = run_sweep(snapshot=False)
+        self.assertEqual((deleted, snapshotted), (2, 0))
+        self.assertFalse(models.AbandonedCart.objects.exists())
+
+    def test_sweep_command_reports_progress(self):
+        out = StringIO()
+        call_command('sweep_sessions', '--batch-size', '1', stdout=out)
+        self.assertIn('Deleted 2 expired sessions', out.getvalue())
@@ -1,8 +1,11 @@
 import copy
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from store.models import Product
 from django.urls import reverse
-from cart.models import Coupon
+from store.utils.catalog import catalog_version
+from .coupons import get_coupon
+
+CENT = Decimal('0.01')
 
 class Cart():
     def __init__(self, request):
@@ -10,7 +13,11 @@ class Cart():
         cart = self.session.get('session_key', {})
         self.session['session_key'] = cart  # Ensure session_key is always set
         self.cart = cart
-        self.coupon = self.session.get('coupon', None)
+        self.coupon_code = self.session.get('coupon', None)
+
+    @property
+    def coupon(self):
+        return get_coupon(self.coupon_code)
 
     def __len__(self):
         return sum(item['qty'] for item in self.cart.values())
@@ -32,8 +39,64 @@ class Cart():
         
             yield item
 
+    def revalidate(self):
+        """
+        Refresh captured prices and discounts from the catalog.
+
+        Only hits the database when the catalog version differs from the
+        one stamped on the cart, and then with a single query. Returns the
+        lines that changed so the client can tell the shopper.
+        """
+        version = catalog_version()
+        if self.session.get('catalog_version') == version:
+            return []
+
+        changes = []
+        if self.cart:
+            products = Product.objects.filter(
+                id__in=self.cart.keys()
+            ).only('id', 'price', 'discount', 'category_id', 'weight')
+            live = {str(product.pk): product for product in products}
+
+            for product_id, item in list(self.cart.items()):
+                product = live.get(product_id)
+                if product is None:
+                    del self.cart[product_id]
+                    changes.append({
+                        'product_id': int(product_id),
+                        'old_price': float(item['price']),
+                        'new_price': None,
+                        'old_discount': item.get('discount', 0),
+                        'new_discount': None,
+                        'removed': True,
+                    })
+                    continue
+
+                price = str(product.price)
+                discount = float(product.discount) if product.discount else 0
+                if Decimal(item['price']) != product.price or item.get('discount', 0) != discount:
+                    changes.append({
+                        'product_id': product.pk,
+                        'old_price': float(item['price']),
+                        'new_price': float(product.price),
+                        'old_discount': item.get('discount', 0),
+                        'new_discount': discount,
+                        'removed': False,
+                    })
+                item['price'] = price
+                item['discount'] = discount
+                item['category'] = product.category_id
+                item['weight'] = str(product.weight)
+
+        self.session['catalog_version'] = version
+        self.session.modified = True
+        return changes
+
     def add(self, product, product_qty):
         product_id = str(product.id)
+        if not self.cart:
+            # A fresh cart is built from live rows, so it is current
+            self.session['catalog_version'] = catalog_version()
 
         if product_id in self.cart: 
             self.cart[product_id]['qty'] = product_qty
@@ -41,6 +104,8 @@ class Cart():
             self.cart[product_id] = {
                 'price': str(product.price),
                 'discount': float(product.discount) if product.discount else 0,
+                'category': product.category_id,
+                'weight': str(product.weight),
                 'qty': int(product_qty)
             }
         self.session.modified = True
@@ -62,41 +127,77 @@ class Cart():
         self.session.modified = True
 
     def apply_coupon(self, coupon_code:str):
-        try:
-            coupon = Coupon.objects.get(name=coupon_code)
-            if coupon.discount is not None and coupon.discount >= 0:
-                self.coupon = float(coupon.discount)  # Store only the discount value
-                self.session['coupon'] = self.coupon  # Store discount in session
-            else:
-                self.coupon = None
-                self.session['coupon'] = None
-        except Coupon.DoesNotExist:
-            self.coupon = None
-            self.session['coupon'] = None
+        coupon = get_coupon(coupon_code)
+        self.coupon_code = coupon.name if coupon else None
+        self.session['coupon'] = self.coupon_code
         self.session.modified = True
 
-    def get_total(self):
-        total = 0
-        savings = 0
-        
-        for item in self.cart.values():
+    def price_lines(self):
+        """
+        Single pricing pass over the session cart, without DB access.
+
+        Returns the per-line breakdown plus cart totals as Decimals rounded
+        to cents, so every consumer (totals, quotes, orders) agrees.
+        """
+        lines = []
+        total = Decimal(0)
+        weight = Decimal(0)
+        eligible = []
+
+        for product_id, item in self.cart.items():
             price = Decimal(item.get('price', 0))
             discount = Decimal(item.get('discount', 0))
+            line_total = price * item['qty']
+            line = {
+                'product_id': int(product_id),
+                'qty': item['qty'],
+                'price': price,
+                'discount': discount,
+                'category': item.get('category'),
+                'total': line_total,
+                'savings': _cents(line_total * discount / 100),
+                'coupon_applied': False,
+            }
+            lines.append(line)
+            total += line_total
+            weight += Decimal(item.get('weight', 0)) * item['qty']
+            if discount <= 0:
+                eligible.append(line)
+
+        # Resolve the coupon once for the whole cart
+        coupon = self.coupon
+        coupon_savings = Decimal(0)
+        if coupon and total >= coupon.min_spend:
+            coupon_rate = coupon.discount / 100
+            for line in eligible:
+                if coupon.applies_to(line['product_id'], line['category']):
+                    line['savings'] = _cents(line['total'] * coupon_rate)
+                    line['coupon_applied'] = True
+                    coupon_savings += line['savings']
+
+        savings = Decimal(0)
+        for line in lines:
+            line['net'] = line['total'] - line['savings']
+            savings += line['savings']
 
-            if discount > 0:
-                total += price * item['qty']
-                discount_value = price * discount * item['qty'] / 100
-                savings += discount_value
-            else:
-                total += price * item['qty']
-                if self.coupon:
-                    coupon_discount = Decimal(self.coupon) / 100
-                    savings += price * coupon_discount * item['qty']
-
-        discount_total = total - savings
+        return {
+            'lines': lines,
+            'total': total,
+            'savings': savings,
+            'coupon': coupon.name if coupon and coupon_savings else None,
+            'coupon_savings': coupon_savings,
+            'discount_total': total - savings,
+            'weight': weight,
+        }
 
+    def get_total(self):
+        pricing = self.price_lines()
         return {
-            'total': float(total),
-            'discount_total': float(discount_total),
-            'savings': float(savings)
-        }
\ No newline at end of file
+            'total': float(pricing['total']),
+            'discount_total': float(pricing['discount_total']),
+            'savings': float(pricing['savings'])
+        }
+
+
+def _cents(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
@@ -1,4 +1,6 @@
+from django.utils.functional import SimpleLazyObject
 from .cart import Cart
 
 def cart_context(request):
-    return {'cart': Cart(request)}
\ No newline at end of file
+    # Only touch the session when a template actually reads the cart
+    return {'cart': SimpleLazyObject(lambda: Cart(request))}
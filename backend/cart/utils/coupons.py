@@ -0,0 +1,121 @@
+from decimal import Decimal
+from dataclasses import dataclass
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from core.utils.versioning import CompiledTable
+from cart.models import Coupon, CouponRedemption
+
+
+class CouponUnavailable(Exception):
+    """Raised when a coupon can no longer be redeemed."""
+
+
+@dataclass(frozen=True)
+class CompiledCoupon:
+    id: int
+    name: str
+    discount: Decimal
+    valid_from: object
+    valid_until: object
+    min_spend: Decimal
+    max_uses: int | None
+    max_uses_per_user: int | None
+    times_used: int
+    product_ids: frozenset
+    category_ids: frozenset
+
+    def is_live(self, now=None):
+        now = now or timezone.now()
+        if self.valid_from and now < self.valid_from:
+            return False
+        if self.valid_until and now >= self.valid_until:
+            return False
+        if self.max_uses is not None and self.times_used >= self.max_uses:
+            return False
+        return True
+
+    def applies_to(self, product_id, category_id=None):
+        """Whether a cart line falls inside the coupon's scope."""
+        if not self.product_ids and not self.category_ids:
+            return True
+        return (
+            int(product_id) in self.product_ids
+            or (category_id is not None and int(category_id) in self.category_ids)
+        )
+
+
+def _compile_coupons():
+    coupons = (
+        Coupon.objects.filter(is_active=True)
+        .prefetch_related('products', 'categories')
+    )
+    return {
+        coupon.name: CompiledCoupon(
+            id=coupon.pk,
+            name=coupon.name,
+            discount=Decimal(coupon.discount),
+            valid_from=coupon.valid_from,
+            valid_until=coupon.valid_until,
+            min_spend=Decimal(coupon.min_spend),
+            max_uses=coupon.max_uses,
+            max_uses_per_user=coupon.max_uses_per_user,
+            times_used=coupon.times_used,
+            product_ids=frozenset(p.pk for p in coupon.products.all()),
+            category_ids=frozenset(c.pk for c in coupon.categories.all()),
+        )
+        for coupon in coupons
+    }
+
+
+active_coupons = CompiledTable('coupons', _compile_coupons)
+
+
+def get_coupon(code):
+    """Look up a live coupon by code. Costs no queries once compiled."""
+    if not code:
+        return None
+    coupon = active_coupons.get().get(str(code))
+    if coupon is None or not coupon.is_live():
+        return None
+    return coupon
+
+
+def redeem_coupon(coupon, user=None):
+    """
+    Count one use of a coupon against its global and per-user limits.
+
+    The conditional UPDATE holds the coupon row lock until the surrounding
+    transaction ends, so concurrent checkouts serialise on it and the
+    per-user count that follows always sees earlier redemptions.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = (
+            Coupon.objects
+            .filter(pk=coupon.id, is_active=True)
+            .filter(Q(valid_from__isnull=True) | Q(valid_from__lte=now))
+            .filter(Q(valid_until__isnull=True) | Q(valid_until__gt=now))
+            .filter(Q(max_uses__isnull=True) | Q(times_used__lt=F('max_uses')))
+            .update(times_used=F('times_used') + 1)
+        )
+        if not updated:
+            raise CouponUnavailable(coupon.name)
+        # The compiled count may predate redemptions made by other processes
+        times_used, max_uses = (
+            Coupon.objects.filter(pk=coupon.id)
+            .values_list('times_used', 'max_uses').get()
+        )
+
+        if coupon.max_uses_per_user is not None and user is not None:
+            used = CouponRedemption.objects.filter(
+                coupon_id=coupon.id, user=user
+            ).count()
+            if used >= coupon.max_uses_per_user:
+                raise CouponUnavailable(coupon.name)
+
+        CouponRedemption.objects.create(coupon_id=coupon.id, user=user)
+
+    if max_uses is not None and times_used >= max_uses:
+        # Drop the exhausted coupon from every process's table
+        transaction.on_commit(active_coupons.invalidate)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'send_after', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('attempts', 'last_error', 'created_at')
@@ -0,0 +1,13 @@
+from .utils.jobs import job
+from .utils.outbox import DELIVER_JOB, deliver_outbox
+from .utils.softdelete import PURGE_JOB, run_purge
+
+
+@job(DELIVER_JOB)
+def deliver(**payload):
+    deliver_outbox()
+
+
+@job(PURGE_JOB)
+def purge(model, pk):
+    run_purge(model, pk)
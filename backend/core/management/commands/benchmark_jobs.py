@@ -0,0 +1,47 @@
+"""
+Django command to measure job queue throughput.
+Run it against a disposable database: it fills the queue with no-op jobs.
+"""
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core.models import Job
+from core.utils.jobs import build_job
+
+
+class Command(BaseCommand):
+    """Django benchmark_jobs command class."""
+
+    help = 'Enqueue no-op jobs and time a worker draining them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        count = options['jobs']
+        started = time.monotonic()
+        Job.objects.bulk_create(
+            (build_job('core.noop') for _ in range(count)), batch_size=5000
+        )
+        enqueued = time.monotonic() - started
+        self.stdout.write(
+            f'Enqueued {count:,} jobs in {enqueued:.1f}s '
+            f'({count / enqueued:,.0f} jobs/s).'
+        )
+
+        started = time.monotonic()
+        call_command(
+            'run_jobs', once=True, names=['core.noop'],
+            threads=options['threads'], batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Drained {count:,} jobs in {elapsed:.1f}s '
+            f'({count / elapsed:,.0f} jobs/s).'
+        ))
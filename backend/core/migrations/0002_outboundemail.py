@@ -0,0 +1,33 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to', models.JSONField(default=list)),
+                ('subject', models.CharField(max_length=998)),
+                ('body', models.TextField()),
+                ('html', models.BooleanField(default=True)),
+                ('from_email', models.CharField(blank=True, max_length=254)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('dead', 'Dead')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Outbound Emails',
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['send_after'], name='core_email_ready_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work claimed by `manage.py run_jobs` workers."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DEAD = 'dead', 'Dead'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers only ever scan ready jobs, so keep that index tiny
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='queued'),
+                name='core_job_ready_idx',
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=models.Q(status='running'),
+                name='core_job_running_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - #{self.pk}"
+
+
+class OutboundEmail(models.Model):
+    """A message in the outbox, delivered in batches by the job worker."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        DEAD = 'dead', 'Dead'
+
+    to = models.JSONField(default=list)
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    html = models.BooleanField(default=True)
+    # DEFAULT_FROM_EMAIL when blank
+    from_email = models.CharField(max_length=254, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    send_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            models.Index(
+                fields=['send_after'],
+                condition=models.Q(status='queued'),
+                name='core_email_ready_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
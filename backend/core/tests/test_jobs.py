@@ -0,0 +1,78 @@
+"""
+Tests for the database job queue.
+"""
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import MagicMock
+from django.test import TestCase
+from django.utils import timezone
+from django.core.management import call_command
+from core.models import Job
+from core.utils import jobs
+
+
+calls = MagicMock()
+
+
+@jobs.job('tests.record', max_attempts=2)
+def record(**payload):
+    calls(**payload)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.reset_mock(side_effect=True)
+
+    def test_enqueue_unknown_job(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue('tests.missing')
+
+    def test_run_pending_executes_and_deletes(self):
+        jobs.enqueue('tests.record', {'value': 1})
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        calls.assert_called_once_with(value=1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_future_jobs_wait(self):
+        jobs.enqueue(
+            'tests.record', run_after=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(jobs.run_pending(), (0, 0))
+        calls.assert_not_called()
+
+    def test_failure_retries_with_backoff(self):
+        calls.side_effect = RuntimeError('boom')
+        jobs.enqueue('tests.record')
+        self.assertEqual(jobs.run_pending(), (0, 1))
+        queued = Job.objects.get()
+        self.assertEqual(queued.status, Job.Status.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn('boom', queued.last_error)
+
+    def test_exhausted_job_is_dead_lettered(self):
+        calls.side_effect = RuntimeError('boom')
+        jobs.enqueue('tests.record')
+        jobs.run_pending()
+        Job.objects.update(run_after=timezone.now())
+        jobs.run_pending()
+        dead = Job.objects.get()
+        self.assertEqual(dead.status, Job.Status.DEAD)
+        self.assertEqual(dead.attempts, 2)
+
+    def test_stale_running_job_is_requeued(self):
+        queued = jobs.enqueue('tests.record')
+        jobs.claim()
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.Status.QUEUED)
+
+    def test_worker_command_drains_queue(self):
+        jobs.enqueue_many([('tests.record', {'value': n}) for n in range(5)])
+        out = StringIO()
+        # Inline, so handlers see this test's uncommitted rows
+        call_command('run_jobs', once=True, threads=0, stdout=out)
+        self.assertIn('5 succeeded', out.getvalue())
+        self.assertEqual(calls.call_count, 5)
+        self.assertFalse(Job.objects.exists())
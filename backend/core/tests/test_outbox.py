@@ -0,0 +1,145 @@
+"""
+Tests for the email outbox.
+"""
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
+from core.models import Job, OutboundEmail
+from core.utils.jobs import run_pending
+from core.utils.outbox import DELIVER_JOB, deliver_outbox, queue_email
+
+SMTP_LATENCY = 2.0
+
+
+class CountingBackend(locmem.EmailBackend):
+    """locmem backend that counts connections and refuses some recipients."""
+    opened = 0
+    refuse_connections = False
+
+    def open(self):
+        if CountingBackend.refuse_connections:
+            raise ConnectionRefusedError("SMTP server down")
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(to.startswith("bounce@") for m in messages for to in m.to):
+            raise RuntimeError("Recipient refused")
+        return super().send_messages(messages)
+
+
+class SlowBackend(locmem.EmailBackend):
+    """locmem backend with the latency of a slow mail server."""
+    opened = 0
+
+    def open(self):
+        SlowBackend.opened += 1
+        time.sleep(SMTP_LATENCY)
+        return super().open()
+
+
+@override_settings(EMAIL_BACKEND='core.tests.test_outbox.CountingBackend')
+class OutboxTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.refuse_connections = False
+
+    def test_batches_share_a_connection(self):
+        for n in range(120):
+            queue_email("Hello", "<p>Hi</p>", [f"user{n}@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(deliver_outbox(batch_size=50), (120, 0))
+        self.assertEqual(len(mail.outbox), 120)
+        self.assertEqual(CountingBackend.opened, 3)
+        self.assertEqual(mail.outbox[0].content_subtype, "html")
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_failed_message_is_retried_later(self):
+        queue_email("Hello", "Hi", ["ok@example.com"], html=False)
+        bounced = queue_email("Hello", "Hi", ["bounce@example.com"])
+        Job.objects.all().delete()
+
+        self.assertEqual(deliver_outbox(), (1, 1))
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.attempts, 1)
+        self.assertGreater(bounced.send_after, timezone.now())
+        self.assertIn("Recipient refused", bounced.last_error)
+        # A drain is scheduled for when the retry is due
+        retry = Job.objects.get(name=DELIVER_JOB)
+        self.assertEqual(retry.run_after, bounced.send_after)
+
+        OutboundEmail.objects.filter(pk=bounced.pk).update(
+            send_after=timezone.now(), attempts=bounced.max_attempts - 1
+        )
+        deliver_outbox()
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboundEmail.Status.DEAD)
+
+    def test_connection_failure_keeps_messages(self):
+        CountingBackend.refuse_connections = True
+        queue_email("Hello", "Hi", ["a@example.com"])
+        queue_email("Hello", "Hi", ["b@example.com"])
+        self.assertEqual(deliver_outbox(), (0, 2))
+        self.assertEqual(
+            OutboundEmail.objects.filter(attempts=1).count(), 2
+        )
+
+        CountingBackend.refuse_connections = False
+        OutboundEmail.objects.update(send_after=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver_outbox(), (2, 0))
+
+    def test_burst_shares_one_drain_job(self):
+        for n in range(10):
+            queue_email("Hello", "Hi", [f"user{n}@example.com"])
+        self.assertEqual(Job.objects.filter(name=DELIVER_JOB).count(), 1)
+        # A message held back for later still gets its own wake-up
+        later = queue_email(
+            "Later", "Hi", ["later@example.com"],
+            send_after=timezone.now() + timedelta(hours=1),
+        )
+        self.assertTrue(Job.objects.filter(name=DELIVER_JOB, run_after=later.send_after).exists())
+
+        run_pending()
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual(CountingBackend.opened, 1)
+
+    def test_job_worker_delivers(self):
+        queue_email("Hello", "Hi", ["a@example.com"])
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND='core.tests.test_outbox.SlowBackend')
+class RegistrationLatencyTests(TestCase):
+    def setUp(self):
+        SlowBackend.opened = 0
+
+    def test_registration_does_not_wait_for_smtp(self):
+        client = Client()
+        timings = []
+        for n in range(5):
+            started = time.monotonic()
+            res = client.post(
+                "/api/accounts/register",
+                data={
+                    "username": f"newuser{n}",
+                    "email": f"newuser{n}@example.com",
+                    "password": "strongpass123",
+                },
+                content_type="application/json",
+            )
+            timings.append(time.monotonic() - started)
+            self.assertEqual(res.status_code, HTTPStatus.CREATED)
+
+        # No request opened an SMTP connection or paid its latency
+        self.assertEqual(SlowBackend.opened, 0)
+        self.assertLess(max(timings), SMTP_LATENCY)
+
+        self.assertEqual(deliver_outbox(), (5, 0))
+        self.assertEqual(SlowBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
@@ -0,0 +1,83 @@
+"""
+Tests for the request rate limiter.
+"""
+import json
+from http import HTTPStatus
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from core.utils.ratelimit import (
+    CacheBackend, LocalMemoryBackend, parse_rate, get_backend
+)
+
+LIMITER = {
+    'ENABLED': True,
+    'BACKEND': 'core.utils.ratelimit.LocalMemoryBackend',
+}
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def _check_backend(self, backend):
+        for second in range(3):
+            self.assertEqual(backend.hit('k', 3, 60, now=600 + second), 0)
+        retry = backend.hit('k', 3, 60, now=610)
+        self.assertEqual(retry, 50)
+        # Half way into the next window the old hits weigh 1.5
+        self.assertEqual(backend.hit('k', 3, 60, now=690), 0)
+        self.assertEqual(backend.hit('k', 3, 60, now=690), 0)
+        self.assertGreater(backend.hit('k', 3, 60, now=690), 0)
+        # Other keys are unaffected
+        self.assertEqual(backend.hit('other', 3, 60, now=610), 0)
+
+    def test_local_memory_backend(self):
+        self._check_backend(LocalMemoryBackend())
+
+    def test_cache_backend(self):
+        cache.clear()
+        self._check_backend(CacheBackend())
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('100/15m'), (100, 900))
+        self.assertEqual(parse_rate('1/d'), (1, 86400))
+
+
+@override_settings(RATELIMIT=LIMITER)
+class LoginRateLimitTests(TestCase):
+    def _login(self, client, identifier, **extra):
+        return client.post(
+            "/api/accounts/login",
+            data=json.dumps({"username": identifier, "password": "wrong"}),
+            content_type="application/json",
+            **extra
+        )
+
+    def test_account_limit_returns_retry_after(self):
+        client = Client()
+        for _ in range(5):
+            self.assertEqual(
+                self._login(client, "victim").status_code, HTTPStatus.UNAUTHORIZED
+            )
+        with self.assertNumQueries(0):
+            res = self._login(client, "VICTIM")
+        self.assertEqual(res.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertGreater(int(res["Retry-After"]), 0)
+        # Another account from the same address is still allowed
+        self.assertEqual(
+            self._login(client, "someone").status_code, HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_ip_limit(self):
+        client = Client()
+        for attempt in range(20):
+            self._login(client, f"user{attempt}", REMOTE_ADDR="10.0.0.1")
+        res = self._login(client, "fresh", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(res.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        res = self._login(client, "fresh", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(res.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_disabled(self):
+        with self.settings(RATELIMIT={**LIMITER, 'ENABLED': False}):
+            for _ in range(8):
+                res = self._login(Client(), "victim")
+            self.assertEqual(res.status_code, HTTPStatus.UNAUTHORIZED)
+        self.assertIsInstance(get_backend(), LocalMemoryBackend)
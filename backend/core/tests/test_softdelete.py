@@ -0,0 +1,126 @@
+"""
+Tests for soft deletion and chunked purging.
+"""
+import json
+from http import HTTPStatus
+from unittest.mock import patch
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from ninja.testing import TestClient
+from accounts.api import router as accounts_router
+from accounts.models import Profile
+from core.models import Job
+from core.utils.jobs import run_pending
+from core.utils.softdelete import PURGE_JOB
+from core.utils.tests import get_user, get_product
+from payments.models import Order, OrderItem
+from store.api import router as store_router
+from store.models import Category, Product
+from store.utils.catalog import delete_category
+
+store_client = TestClient(store_router)
+accounts_client = TestClient(accounts_router)
+
+
+def place_orders(user, product, count):
+    for _ in range(count):
+        order = Order.objects.create(
+            full_name="Buyer", email="buyer@example.com",
+            shipping_address="1 Street", amount_paid=10, user=user,
+        )
+        OrderItem.objects.create(order=order, product=product, price=10, user=user)
+
+
+class ProductDeletionTests(TestCase):
+    def setUp(self):
+        self.staff = get_user("staff")
+        self.customer = get_user()
+        self.category = Category.objects.create(name="Soft", slug="soft")
+
+    def _delete(self, product):
+        with CaptureQueriesContext(connection) as queries:
+            res = store_client.delete(f"/products/{product.pk}", user=self.staff)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_delete_cost_does_not_depend_on_history(self):
+        _, quiet = get_product(self.staff, self.category)
+        _, busy = get_product(self.staff, self.category)
+        place_orders(self.customer, busy, 40)
+
+        self.assertEqual(self._delete(quiet), self._delete(busy))
+        # Hidden at once; order lines point at it until the purge
+        self.assertFalse(Product.objects.filter(pk=busy.pk).exists())
+        self.assertEqual(store_client.get(f"/products/{busy.pk}").status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(OrderItem.objects.filter(product_id=busy.pk).count(), 40)
+
+    @patch("core.utils.softdelete.CHUNK_SIZE", 10)
+    @patch("core.utils.softdelete.MAX_CHUNKS", 2)
+    def test_purge_runs_in_bounded_steps(self):
+        _, product = get_product(self.staff, self.category)
+        place_orders(self.customer, product, 45)
+        self._delete(product)
+
+        # Each step clears at most two chunks, then queues the next step
+        steps = 0
+        while Job.objects.filter(name=PURGE_JOB).exists():
+            run_pending(batch_size=1)
+            steps += 1
+        self.assertGreaterEqual(steps, 3)
+        self.assertFalse(Product.all_objects.filter(pk=product.pk).exists())
+        # Order lines stay, detached from the product, so totals still add up
+        self.assertFalse(OrderItem.objects.filter(product_id=product.pk).exists())
+        self.assertEqual(OrderItem.objects.filter(product__isnull=True).count(), 45)
+        self.assertEqual(Order.objects.count(), 45)
+
+    def test_category_hides_its_products(self):
+        _, product = get_product(self.staff, self.category)
+        place_orders(self.customer, product, 3)
+        delete_category(self.category)
+
+        self.assertFalse(Category.objects.filter(pk=self.category.pk).exists())
+        self.assertFalse(Product.objects.filter(pk=product.pk).exists())
+        run_pending()
+        self.assertFalse(Category.all_objects.filter(pk=self.category.pk).exists())
+        self.assertFalse(Product.all_objects.filter(pk=product.pk).exists())
+        self.assertEqual(OrderItem.objects.filter(product__isnull=True).count(), 3)
+
+
+class UserDeletionTests(TestCase):
+    def setUp(self):
+        self.user = get_user()
+        Profile.objects.create(user=self.user, name="Gone")
+
+    def test_account_deletion_keeps_orders(self):
+        _, product = get_product(get_user("staff"))
+        place_orders(self.user, product, 3)
+
+        res = accounts_client.delete("/profile", user=self.user)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        # Can no longer log in, before any purge has run
+        res = Client().post(
+            "/api/accounts/login",
+            data=json.dumps({"username": self.user.username, "password": "pass"}),
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, HTTPStatus.UNAUTHORIZED)
+
+        run_pending()
+        self.assertFalse(type(self.user).all_objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Profile.objects.filter(user_id=self.user.pk).exists())
+        # Orders stay for accounting, detached from the account
+        self.assertEqual(Order.objects.filter(user__isnull=True).count(), 3)
+        self.assertEqual(OrderItem.objects.filter(user__isnull=True).count(), 3)
+
+    def test_referenced_user_stays_hidden(self):
+        staff = get_user("staff")
+        get_product(staff)
+        res = accounts_client.delete("/profile", user=staff)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+
+        with self.assertLogs("core.utils.softdelete", "WARNING"):
+            run_pending()
+        self.assertTrue(type(staff).all_objects.filter(pk=staff.pk).exists())
+        self.assertFalse(type(staff).objects.filter(pk=staff.pk).exists())
+        self.assertFalse(Job.objects.exists())
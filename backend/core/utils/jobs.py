@@ -0,0 +1,174 @@
+"""
+Postgres-backed job queue.
+
+Handlers are registered with `@job` in each app's `jobs.py` and enqueued
+with `enqueue()`, which writes a row in the caller's transaction, so a job
+only becomes visible once the work that produced it has committed. Workers
+(`manage.py run_jobs`) claim ready rows with FOR UPDATE SKIP LOCKED, so any
+number of them can share the table without a broker.
+"""
+import random
+import logging
+import traceback
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+BACKOFF_BASE = 5            # seconds before the first retry
+BACKOFF_CAP = 60 * 60       # never wait more than an hour
+VISIBILITY_TIMEOUT = timedelta(minutes=15)
+
+
+def job(name, max_attempts=5):
+    """Register a handler under `name`. It receives the payload as kwargs."""
+    def decorator(func):
+        _handlers[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name][0]
+
+
+def build_job(name, payload=None, run_after=None):
+    if name not in _handlers:
+        raise KeyError(f"No job handler registered for {name!r}")
+    return Job(
+        name=name,
+        payload=payload or {},
+        max_attempts=_handlers[name][1],
+        run_after=run_after or timezone.now(),
+    )
+
+
+def enqueue(name, payload=None, run_after=None):
+    """Queue one job. Call inside the transaction that makes it necessary."""
+    queued = build_job(name, payload, run_after)
+    queued.save()
+    return queued
+
+
+def enqueue_once(name, payload=None, run_after=None, not_before=None):
+    """
+    Queue a job unless an identical one is already queued to run between
+    `not_before` and `run_after`, for handlers whose one run covers all the
+    work queued so far. Returns the new job, or None when one was found.
+
+    The job found stays locked until the caller's transaction commits, so
+    a worker cannot run it before the work it is relied on for is visible.
+    """
+    run_after = run_after or timezone.now()
+    with transaction.atomic():
+        pending = Job.objects.select_for_update(skip_locked=True).filter(
+            name=name, payload=payload or {},
+            status=Job.Status.QUEUED, run_after__lte=run_after,
+        )
+        if not_before is not None:
+            pending = pending.filter(run_after__gte=not_before)
+        if pending.values_list('pk', flat=True)[:1]:
+            return None
+    return enqueue(name, payload, run_after)
+
+
+def enqueue_many(jobs):
+    """Queue several `(name, payload[, run_after])` jobs with one insert."""
+    return Job.objects.bulk_create([build_job(*spec) for spec in jobs])
+
+
+def backoff(attempts):
+    """Exponential backoff with jitter, capped."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_CAP)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim(batch_size=10, names=None):
+    """Lock a batch of ready jobs for this worker and mark them running."""
+    now = timezone.now()
+    with transaction.atomic():
+        ready = (
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by('run_after')
+        )
+        if names:
+            ready = ready.filter(name__in=names)
+        jobs = list(ready[:batch_size])
+        if jobs:
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(
+                status=Job.Status.RUNNING,
+                locked_at=now,
+                # Counted up front so a job that kills its worker still
+                # runs out of attempts
+                attempts=F('attempts') + 1,
+            )
+    for claimed in jobs:
+        claimed.attempts += 1
+    return jobs
+
+
+def execute(claimed):
+    """Run a claimed job, then delete it or schedule its retry."""
+    try:
+        func = get_handler(claimed.name)
+        func(**claimed.payload)
+    except Exception as exc:
+        error = ''.join(traceback.format_exception(exc))
+        if claimed.attempts >= claimed.max_attempts or claimed.name not in _handlers:
+            logger.error("Job %s dead-lettered: %s", claimed, exc)
+            Job.objects.filter(pk=claimed.pk).update(
+                status=Job.Status.DEAD,
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            logger.warning("Job %s failed, retrying: %s", claimed, exc)
+            Job.objects.filter(pk=claimed.pk).update(
+                status=Job.Status.QUEUED,
+                locked_at=None,
+                run_after=timezone.now() + backoff(claimed.attempts),
+                last_error=error,
+            )
+        return False
+    # Finished jobs are removed to keep the queue table and index small
+    Job.objects.filter(pk=claimed.pk).delete()
+    return True
+
+
+def requeue_stale(timeout=VISIBILITY_TIMEOUT):
+    """Return jobs held by crashed workers to the queue, or bury them."""
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - timeout,
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.DEAD, locked_at=None,
+        last_error='Worker stopped while running this job.'
+    )
+    return stale.update(status=Job.Status.QUEUED, locked_at=None)
+
+
+def run_pending(batch_size=100, names=None):
+    """Drain every ready job in this thread. Returns (succeeded, failed)."""
+    succeeded = failed = 0
+    while True:
+        jobs = claim(batch_size, names)
+        if not jobs:
+            return succeeded, failed
+        for claimed in jobs:
+            if execute(claimed):
+                succeeded += 1
+            else:
+                failed += 1
+
+
+@job('core.noop')
+def noop(**payload):
+    """Does nothing; used to benchmark queue overhead."""
@@ -0,0 +1,122 @@
+"""
+Database-backed email outbox.
+
+`queue_email` stores a message in the caller's transaction and wakes the
+job worker, so requests never wait on the mail server. The worker sends
+ready messages in batches, each batch over a single SMTP connection, and
+reschedules failures with backoff until they run out of attempts.
+
+Rows stay locked for the duration of their batch, so a worker that dies
+mid-batch releases them to the next one. Delivery is at least once.
+"""
+import logging
+import traceback
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from core.models import OutboundEmail
+from .jobs import backoff, enqueue, enqueue_once
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+DELIVER_JOB = 'core.deliver_outbox'
+
+
+def queue_email(subject, body, to, html=True, from_email=None, send_after=None):
+    """Put a message in the outbox. Costs at most two inserts, no SMTP."""
+    email = OutboundEmail.objects.create(
+        to=list(to),
+        subject=subject,
+        body=body,
+        html=html,
+        from_email=from_email or '',
+        send_after=send_after or timezone.now(),
+    )
+    if email.send_after <= timezone.now():
+        # Any queued drain that is already due picks this message up too
+        enqueue_once(DELIVER_JOB)
+    else:
+        enqueue(DELIVER_JOB, run_after=email.send_after)
+    return email
+
+
+def build_message(email, connection=None):
+    message = EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,  # uses DEFAULT_FROM_EMAIL
+        to=email.to,
+        connection=connection,
+    )
+    if email.html:
+        message.content_subtype = "html"
+    return message
+
+
+def _reschedule(email, error):
+    email.attempts += 1
+    email.last_error = error
+    if email.attempts >= email.max_attempts:
+        logger.error("Email %s dead-lettered", email.pk)
+        email.status = OutboundEmail.Status.DEAD
+    else:
+        email.send_after = timezone.now() + backoff(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'send_after'])
+    return email.send_after if email.status == OutboundEmail.Status.QUEUED else None
+
+
+def deliver_batch(batch_size=BATCH_SIZE):
+    """
+    Send up to `batch_size` ready messages over one connection.
+    Returns (sent, failed, earliest retry time or None).
+    """
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.QUEUED, send_after__lte=timezone.now())
+            .order_by('send_after')[:batch_size]
+        )
+        if not emails:
+            return 0, 0, None
+
+        sent = []
+        failed = []
+        try:
+            with get_connection() as connection:
+                for email in emails:
+                    try:
+                        build_message(email, connection).send()
+                        sent.append(email.pk)
+                    except Exception as exc:
+                        failed.append((email, ''.join(traceback.format_exception(exc))))
+        except Exception as exc:
+            # Could not connect, or the connection dropped: retry the rest
+            error = ''.join(traceback.format_exception(exc))
+            done = set(sent) | {email.pk for email, _ in failed}
+            failed += [(email, error) for email in emails if email.pk not in done]
+
+        OutboundEmail.objects.filter(pk__in=sent).delete()
+        retries = [t for t in (_reschedule(e, err) for e, err in failed) if t]
+    return len(sent), len(failed), min(retries, default=None)
+
+
+def deliver_outbox(batch_size=BATCH_SIZE):
+    """Drain every ready message. Returns (sent, failed)."""
+    sent = failed = 0
+    next_retry = None
+    while True:
+        batch_sent, batch_failed, retry_at = deliver_batch(batch_size)
+        if not batch_sent and not batch_failed:
+            break
+        sent += batch_sent
+        failed += batch_failed
+        if retry_at and (next_retry is None or retry_at < next_retry):
+            next_retry = retry_at
+        if not batch_sent:
+            # Everything in the batch failed, leave the rest for the retry
+            break
+    if next_retry:
+        enqueue(DELIVER_JOB, run_after=next_retry)
+    return sent, failed
@@ -0,0 +1,29 @@
+import json
+import base64
+import binascii
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values):
+    """Opaque cursor holding the sort key of the last row on a page."""
+    raw = json.dumps([
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values
+    ])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError on a tampered cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def page_size(limit):
+    return max(1, min(limit, MAX_PAGE_SIZE))
@@ -0,0 +1,234 @@
+"""
+Request rate limiting.
+
+Limits are sliding-window counters: the hits in the current fixed window,
+plus the previous window's hits weighted by how much of it still overlaps
+the sliding window. That smooths the burst a plain fixed window allows at
+its boundary while storing two integers per key.
+
+Counters live in a pluggable backend (`settings.RATELIMIT['BACKEND']`):
+`CacheBackend` shares them through a Django cache across processes, and
+`LocalMemoryBackend` keeps them in a dict for tests and single processes.
+A rejected request costs one counter read and never touches the database.
+"""
+import hashlib
+import math
+import threading
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from ninja.throttling import BaseThrottle
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+class RateLimited(Exception):
+    """Raised when a request exceeds a limit. Rendered as a 429."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60). Periods may carry a multiplier, as in '100/15m'."""
+    count, period = rate.split('/')
+    multiplier = int(period[:-1] or 1)
+    return int(count), multiplier * _PERIODS[period[-1]]
+
+
+def _retry_after(limit, period, previous, current, elapsed):
+    """Seconds until the weighted count drops back under the limit."""
+    if current >= limit or not previous:
+        wait = period - elapsed
+    else:
+        # previous * (period - elapsed - t) / period + current < limit
+        wait = period - elapsed - (limit - current) * period / previous
+    return max(1, math.ceil(wait))
+
+
+class BaseBackend:
+    def get_counts(self, keys):
+        raise NotImplementedError
+
+    def increment(self, key, timeout):
+        raise NotImplementedError
+
+    def hit(self, key, limit, period, now=None):
+        """Count a request. Returns 0 if allowed, else seconds to wait."""
+        now = time.time() if now is None else now
+        window, elapsed = divmod(now, period)
+        current_key = f"rl:{key}:{int(window)}"
+        previous_key = f"rl:{key}:{int(window) - 1}"
+        counts = self.get_counts([previous_key, current_key])
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        if previous * (period - elapsed) / period + current >= limit:
+            return _retry_after(limit, period, previous, current, elapsed)
+        # Kept for two periods so it can still act as the previous window
+        self.increment(current_key, timeout=2 * period)
+        return 0
+
+
+class CacheBackend(BaseBackend):
+    """Counters in a Django cache, shared by every process using it."""
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_counts(self, keys):
+        return self.cache.get_many(keys)
+
+    def increment(self, key, timeout):
+        cache = self.cache
+        cache.add(key, 0, timeout=timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, 1, timeout=timeout)
+
+
+class LocalMemoryBackend(BaseBackend):
+    """Counters in this process only."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get_counts(self, keys):
+        now = time.monotonic()
+        counts = {}
+        for key in keys:
+            entry = self._counts.get(key)
+            if entry is not None and entry[1] > now:
+                counts[key] = entry[0]
+        return counts
+
+    def increment(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._counts.get(key, (0, 0))
+            if expires <= now:
+                count = 0
+                # Drop expired windows so the dict cannot grow without bound
+                for stale in [k for k, (_, e) in self._counts.items() if e <= now]:
+                    del self._counts[stale]
+            self._counts[key] = (count + 1, now + timeout)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = getattr(settings, 'RATELIMIT', {})
+                backend_class = import_string(
+                    config.get('BACKEND', 'core.utils.ratelimit.CacheBackend')
+                )
+                _backend = backend_class(**config.get('OPTIONS', {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting=None, **kwargs):
+    """Forget the configured backend so the next check rebuilds it."""
+    global _backend
+    if setting in (None, 'RATELIMIT'):
+        _backend = None
+
+
+def client_ip(request):
+    header = getattr(settings, 'RATELIMIT', {}).get('IP_HEADER')
+    if header:
+        forwarded = request.headers.get(header)
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _key_for(request, key, args, kwargs):
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{client_ip(request)}"
+    return key(request, *args, **kwargs)
+
+
+def check_rate(group, identity, rate):
+    """Raise RateLimited if `identity` is over `rate` within `group`."""
+    if identity is None or not getattr(settings, 'RATELIMIT', {}).get('ENABLED', True):
+        return
+    limit, period = parse_rate(rate)
+    # Hashed so user input is always a short, cache-safe key
+    digest = hashlib.blake2b(f"{group}:{identity}".encode(), digest_size=16)
+    retry_after = get_backend().hit(digest.hexdigest(), limit, period)
+    if retry_after:
+        raise RateLimited(retry_after)
+
+
+def ratelimit(rate, key='ip', group=None):
+    """
+    Limit a view to `rate` requests per key.
+
+    `key` is 'ip', 'user' (the account when logged in, else the IP), or a
+    callable receiving the view's arguments and returning an identity
+    string, or None to skip the limit. Stack decorators for several limits.
+    """
+    def decorator(view):
+        label = key if isinstance(key, str) else key.__name__
+        name = f"{group or view.__module__ + '.' + view.__qualname__}:{label}"
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            check_rate(name, _key_for(request, key, args, kwargs), rate)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateThrottle(BaseThrottle):
+    """
+    The same limiter as a ninja throttle, for whole routers or APIs:
+    `Router(throttle=[RateThrottle('100/m')])`.
+    """
+
+    def __init__(self, rate, key='ip', group='throttle'):
+        self.rate = rate
+        self.key = key
+        self.group = group
+        self._wait = None
+
+    def allow_request(self, request):
+        try:
+            check_rate(
+                f"{self.group}:{self.rate}",
+                _key_for(request, self.key, (), {}),
+                self.rate,
+            )
+        except RateLimited as exc:
+            self._wait = exc.retry_after
+            return False
+        return True
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,170 @@
+"""
+Soft deletion with chunked background purging.
+
+Deleting a user, product or category used to run Django's cascade
+collector inside the request, loading and deleting every dependent row in
+one go. Instead, `soft_delete` stamps `deleted_at`, which the models'
+default managers filter out, and queues a purge job. The job clears the
+dependents a bounded chunk at a time, following each relation's on_delete
+rule, then deletes the row itself. A job that runs out of budget queues
+its own continuation, so no single transaction holds locks for long.
+"""
+import logging
+from django.apps import apps
+from django.db import models
+from django.utils import timezone
+from .jobs import enqueue, enqueue_many
+
+logger = logging.getLogger(__name__)
+
+PURGE_JOB = 'core.purge'
+CHUNK_SIZE = 500
+MAX_CHUNKS = 20
+
+
+class LiveQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def dead(self):
+        return self.filter(deleted_at__isnull=False)
+
+
+class LiveManager(models.Manager.from_queryset(LiveQuerySet)):
+    """Default manager that hides soft-deleted rows."""
+
+    def get_queryset(self):
+        return super().get_queryset().live()
+
+
+def purge_payload(model, pk):
+    return {'model': model._meta.label, 'pk': pk}
+
+
+def soft_delete(instance, **extra):
+    """Hide `instance` now and queue its purge. `extra` fields are saved too."""
+    instance.deleted_at = timezone.now()
+    for field, value in extra.items():
+        setattr(instance, field, value)
+    instance.save(update_fields=['deleted_at', *extra])
+    return enqueue(PURGE_JOB, purge_payload(type(instance), instance.pk))
+
+
+def soft_delete_queryset(queryset, **extra):
+    """Hide every row of `queryset` with one UPDATE and queue their purges."""
+    model = queryset.model
+    pks = list(queryset.filter(deleted_at__isnull=True).values_list('pk', flat=True))
+    if not pks:
+        return []
+    model._base_manager.filter(pk__in=pks).update(deleted_at=timezone.now(), **extra)
+    enqueue_many([(PURGE_JOB, purge_payload(model, pk)) for pk in pks])
+    return pks
+
+
+class SoftDeleteAdminMixin:
+    """Admin deletes hide the rows and leave the cascade to the purge job."""
+
+    def get_deleted_objects(self, objs, request):
+        # The confirmation page would otherwise walk the whole cascade
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        objs = list(objs)
+        return (
+            [str(obj) for obj in objs],
+            {self.opts.verbose_name_plural: len(objs)},
+            perms_needed,
+            [],
+        )
+
+    def delete_model(self, request, obj):
+        soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        soft_delete_queryset(queryset)
+
+
+def _relations(model):
+    """Reverse foreign keys whose rows must change before `model` rows go."""
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            # Join rows are removed by the final delete
+            continue
+        on_delete = rel.on_delete
+        if on_delete is models.CASCADE:
+            yield rel, 'delete'
+        elif on_delete is models.SET_NULL or (
+            on_delete is models.DO_NOTHING and rel.field.null
+        ):
+            # Detached rather than deleted, e.g. orders keep their history
+            yield rel, 'detach'
+
+
+def _blocking_relation(model, pk):
+    """A reference that would make deleting the row fail, if there is one."""
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            continue
+        blocks = rel.on_delete in (models.PROTECT, models.RESTRICT) or (
+            rel.on_delete is models.DO_NOTHING
+            and not rel.field.null
+            and rel.field.db_constraint
+        )
+        if blocks and rel.related_model._base_manager.filter(**{rel.field.name: pk}).exists():
+            return rel
+    return None
+
+
+def _clear_dependents(model, pks, budget):
+    """
+    Delete or detach rows referencing `pks`, depth first, one chunk per
+    unit of budget. Returns False when the budget ran out first.
+    """
+    for rel, action in _relations(model):
+        related = rel.related_model
+        field = rel.field.name
+        dependents = related._base_manager.filter(**{f'{field}__in': pks})
+        while True:
+            chunk = list(dependents.values_list('pk', flat=True)[:CHUNK_SIZE])
+            if not chunk:
+                break
+            if budget[0] <= 0:
+                return False
+            budget[0] -= 1
+            rows = related._base_manager.filter(pk__in=chunk)
+            if action == 'detach':
+                rows.update(**{field: None})
+            elif _clear_dependents(related, chunk, budget):
+                rows.delete()
+            else:
+                return False
+    return True
+
+
+def purge(model, pk, max_chunks=MAX_CHUNKS):
+    """
+    One bounded step of removing a soft-deleted row. Returns True once the
+    row is gone, False when another step is needed.
+    """
+    row = model._base_manager.filter(pk=pk)
+    if not row.filter(deleted_at__isnull=False).exists():
+        # Already purged, or restored since the job was queued
+        return True
+    blocker = _blocking_relation(model, pk)
+    if blocker is not None:
+        # e.g. a user who created products; hidden for good instead
+        logger.warning(
+            "%s %s stays soft-deleted, still referenced by %s",
+            model._meta.label, pk, blocker.related_model._meta.label,
+        )
+        return True
+    if not _clear_dependents(model, [pk], [max_chunks]):
+        return False
+    row.delete()
+    return True
+
+
+def run_purge(label, pk):
+    model = apps.get_model(label)
+    if not purge(model, pk):
+        enqueue(PURGE_JOB, {'model': label, 'pk': pk})
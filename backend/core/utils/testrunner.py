@@ -0,0 +1,20 @@
+"""
+Test runner that switches off request rate limiting for the test run.
+
+Tests log in and submit forms far faster than any limit allows, so the
+limiter is disabled here the way Django swaps in the locmem email backend;
+limiter tests turn it back on with override_settings.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._ratelimit = settings.RATELIMIT
+        settings.RATELIMIT = {**settings.RATELIMIT, 'ENABLED': False}
+
+    def teardown_test_environment(self, **kwargs):
+        settings.RATELIMIT = self._ratelimit
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,66 @@
+"""
+Version counters for process-local lookup tables.
+
+A namespace version lives in the shared cache. Writers bump it whenever the
+underlying rows change; readers compare it against the version their table
+was compiled from and rebuild only when the two differ.
+"""
+import time
+import threading
+from django.core.cache import cache
+
+
+def _version_key(namespace: str) -> str:
+    return f"version:{namespace}"
+
+
+def get_version(namespace: str) -> int:
+    """Return the current version of a namespace, initialising it if needed."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a flushed cache never replays an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace: str) -> int:
+    """Invalidate every table compiled for a namespace."""
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+class CompiledTable:
+    """
+    Process-local table rebuilt by `builder` whenever the namespace
+    version changes. Reading it costs one cache get.
+    """
+
+    def __init__(self, namespace: str, builder):
+        self.namespace = namespace
+        self.builder = builder
+        self._state = (None, None)
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = get_version(self.namespace)
+        compiled_version, table = self._state
+        if compiled_version == version:
+            return table
+        with self._lock:
+            compiled_version, table = self._state
+            if compiled_version != version:
+                # Version is read before building, so a concurrent edit
+                # only ever causes one extra rebuild, never a stale table.
+                table = self.builder()
+                self._state = (version, table)
+        return table
+
+    def invalidate(self):
+        bump_version(self.namespace)
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Order, OrderItem, ShippingAddress
+from .models import (
+    Order, OrderItem, ShippingAddress, IdempotencyKey, ShippingZone, ShippingRate,
+    TaxRate,
+)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -9,10 +12,10 @@ class OrderItemInline(admin.TabularInline):
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('full_name', 'email', 'amount_paid', 'date_ordered',)
+    list_display = ('full_name', 'email', 'amount_paid', 'item_count', 'date_ordered',)
     search_fields = ('email',)
     inlines =  [OrderItemInline]
-    readonly_fields = ('amount_paid',)
+    readonly_fields = ('amount_paid', 'item_count', 'subtotal')
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -26,3 +29,30 @@ class ShippingAddressAdmin(admin.ModelAdmin):
     list_filter = ('country', 'state', 'city')
     search_fields = ('user', 'city', 'address2', 'address1')
     ordering  = ('city',)    
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'owner', 'status_code', 'created_at')
+    search_fields = ('key', 'owner')
+    readonly_fields = ('owner', 'key', 'fingerprint', 'status_code', 'response', 'created_at')
+
+
+class ShippingRateInline(admin.TabularInline):
+    model = ShippingRate
+    extra = 1
+
+
+@admin.register(ShippingZone)
+class ShippingZoneAdmin(admin.ModelAdmin):
+    list_display = ('name', 'basis', 'free_over', 'is_active')
+    list_filter = ('basis', 'is_active')
+    search_fields = ('name',)
+    inlines = [ShippingRateInline]
+
+
+@admin.register(TaxRate)
+class TaxRateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'country', 'region', 'category', 'rate', 'is_active')
+    list_filter = ('country', 'is_active')
+    search_fields = ('name', 'region')
@@ -1,24 +1,61 @@
+from typing import Optional
 from ninja import Router
+from ninja.security import django_auth
+from django.db.models import Prefetch, Q
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
 from django.shortcuts import get_object_or_404
-from django_countries import countries
 
 from cart.utils.cart import Cart
+from cart.utils.coupons import CouponUnavailable
 from core.schemas import MessageSchema
+from core.utils.pagination import encode_cursor, decode_cursor, page_size
+from core.utils.ratelimit import ratelimit
 from django.contrib.auth.models import User
 
 
 from .models import ShippingAddress, Order, OrderItem
+from .utils.quote import get_quote
+from .utils.orders import place_order
+from .utils.idempotency import idempotent
+from .utils.reference import get_reference_payload
+from .utils.shipping import ShippingUnavailable
 from .schemas import (
     CheckoutResponseSchema, ShippingAddressSchema, 
-    CompleteOrderInputSchema
+    CompleteOrderInputSchema, QuoteSchema,
+    OrderPageSchema, OrderDetailSchema
 )
 
 router = Router(tags=["Payments"])
 
+REFERENCE_MAX_AGE = 60 * 60 * 24
+
+
+@router.get("/reference")
+def reference(request, lang: Optional[str] = None):
+    """
+    Country choices for the checkout form, in the requested or active
+    language. The body is built once per process and locale; clients
+    revalidate with If-None-Match.
+    """
+    payload = get_reference_payload(lang)
+    etags = request.headers.get('If-None-Match', '')
+    if payload.etag in (tag.strip().removeprefix('W/') for tag in etags.split(',')):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(payload.body, content_type='application/json')
+    response['ETag'] = payload.etag
+    response['Content-Language'] = payload.locale
+    response['Cache-Control'] = f'public, max-age={REFERENCE_MAX_AGE}'
+    patch_vary_headers(response, ['Accept-Language'])
+    return response
+
+
 @router.get("/checkout", response=CheckoutResponseSchema)
 def checkout(request):
-    country_choices = list(countries)
     cart = Cart(request)
+    cart.revalidate()
     shipping_address = None
     if request.user.is_authenticated:
         shipping_address_obj = ShippingAddress.objects.filter(user=request.user.id).first()
@@ -33,16 +70,36 @@ def checkout(request):
                 zipcode=str(shipping_address_obj.zipcode) or ""
             )
     return {
-        "countries": country_choices,
         "cart": list(cart),
         "shipping": shipping_address
     }
 
 
+@router.get("/quote", response=QuoteSchema)
+def quote(
+    request, country: Optional[str] = None, region: Optional[str] = None
+):
+    """
+    Totals for the current cart without placing an order. Cheap enough to
+    poll: results are cached under the cart fingerprint.
+    """
+    cart = Cart(request)
+    changes = cart.revalidate()
+    return {**get_quote(cart, country, region), "changes": changes}
+
+
 @router.post(
     "/complete-order", 
-    response={200: MessageSchema, 500: MessageSchema}
+    response={
+        200: MessageSchema,
+        409: MessageSchema,
+        422: MessageSchema,
+        429: MessageSchema,
+        500: MessageSchema
+    }
 )
+@ratelimit('10/m', key='user')
+@idempotent
 def complete_order(request, data: CompleteOrderInputSchema):
     full_name = f"{data.fn} {data.sn}"
     shipping_address = "\n".join(filter(
@@ -50,34 +107,101 @@ def complete_order(request, data: CompleteOrderInputSchema):
     )
 
     cart = Cart(request)
-    total_cost = cart.get_total()["discount_total"] if cart.get_total() else 0
+    if cart.revalidate():
+        return 409, {"detail": "Cart prices have changed, please review your cart"}
 
     try:
-        if request.user.is_authenticated:
-            order = Order.objects.create(
-                full_name=full_name,
-                email=data.em,
-                shipping_address=shipping_address,
-                amount_paid=total_cost,
-                user=request.user
-            )
-        else:
-            order = Order.objects.create(
-                full_name=full_name,
-                email=data.em,
-                shipping_address=shipping_address,
-                amount_paid=total_cost,
-            )
-        for item in cart:
-            OrderItem.objects.create(
-                order=order,
-                product=item["product"],
-                quantity=item["qty"],
-                price=item["price"],
-                user=request.user if request.user.is_authenticated else None
-            )
+        place_order(
+            cart,
+            request.user,
+            full_name=full_name,
+            email=data.em,
+            shipping_address=shipping_address,
+            country=data.cntry,
+            region=data.st,
+        )
         return 200, {"detail": "Order created successfully"}
+    except ShippingUnavailable:
+        return 422, {"detail": "We do not ship to this address"}
+    except CouponUnavailable:
+        return 409, {"detail": "Coupon is no longer available"}
     except Exception as e:
         # Log the error accordingly
         print(f"Error creating order: {e}")
-        return 500, {"detail": "Order creation failed"}
\ No newline at end of file
+        return 500, {"detail": "Order creation failed"}
+
+# -------------------------------------------------
+# ORDER HISTORY
+# -------------------------------------------------
+@router.get(
+    "/orders", auth=django_auth,
+    response={200: OrderPageSchema, 400: MessageSchema}
+)
+def list_orders(request, limit: int = 20, cursor: Optional[str] = None):
+    """
+    The customer's orders, newest first, paged by (date_ordered, id).
+    Served from the history index without reading OrderItem.
+    """
+    limit = page_size(limit)
+    orders = (
+        Order.objects.filter(user=request.user)
+        .only('id', 'date_ordered', 'amount_paid', 'subtotal', 'item_count')
+        .order_by('-date_ordered', '-id')
+    )
+    if cursor:
+        try:
+            date_ordered, order_id = decode_cursor(cursor)
+            date_ordered = parse_datetime(date_ordered)
+            order_id = int(order_id)
+            if date_ordered is None:
+                raise ValueError("Invalid cursor")
+        except (TypeError, ValueError):
+            return 400, {"detail": "Invalid cursor"}
+        orders = orders.filter(
+            Q(date_ordered__lt=date_ordered)
+            | Q(date_ordered=date_ordered, id__lt=order_id)
+        )
+
+    page = list(orders[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].date_ordered, page[-1].pk)
+    return 200, {"items": page, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/orders/{order_id}", auth=django_auth,
+    response={200: OrderDetailSchema, 404: MessageSchema}
+)
+def get_order(request, order_id: int):
+    order = get_object_or_404(
+        Order.objects.prefetch_related(
+            Prefetch(
+                'orderitem_set',
+                queryset=OrderItem.objects.select_related('product'),
+            )
+        ),
+        pk=order_id, user=request.user
+    )
+    items = [
+        {
+            "product_id": item.product_id,
+            "name": item.product.name if item.product else None,
+            "slug": item.product.slug if item.product else None,
+            "quantity": item.quantity,
+            "price": item.price,
+        }
+        for item in order.orderitem_set.all()
+    ]
+    return 200, {
+        "id": order.pk,
+        "date_ordered": order.date_ordered,
+        "amount_paid": order.amount_paid,
+        "subtotal": order.subtotal,
+        "item_count": order.item_count,
+        "full_name": order.full_name,
+        "email": order.email,
+        "shipping_address": order.shipping_address,
+        "items": items,
+    }
@@ -0,0 +1,98 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.template.loader import render_to_string
+from core.utils.jobs import job, enqueue_many, enqueue_once
+from core.utils.outbox import queue_email
+from store.models import Product
+from .models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+ORDER_JOBS = (
+    'payments.send_order_confirmation',
+    'payments.decrement_stock',
+    'payments.notify_fulfilment',
+)
+
+
+# Rollups skip very recent orders, so give the order time to age in
+ROLLUP_DELAY = timedelta(minutes=3)
+# One rollup run folds in every order placed within this window
+ROLLUP_WINDOW = timedelta(minutes=2)
+
+
+def enqueue_order_jobs(order):
+    """Queue post-processing for a new order."""
+    payload = {'order_id': order.pk}
+    jobs = enqueue_many([(name, payload) for name in ORDER_JOBS])
+    # A run queued by an earlier order covers this one if it is not due
+    # before the order has aged in
+    ready_at = timezone.now() + ROLLUP_DELAY
+    enqueue_once(
+        'reports.update_rollups',
+        run_after=ready_at + ROLLUP_WINDOW, not_before=ready_at,
+    )
+    return jobs
+
+
+def _load(order_id):
+    order = Order.objects.get(pk=order_id)
+    items = list(
+        OrderItem.objects.filter(order=order).select_related('product')
+    )
+    return order, items
+
+
+@job('payments.send_order_confirmation')
+def send_order_confirmation(order_id):
+    order, items = _load(order_id)
+    queue_email(
+        subject=f"Order #{order.pk} confirmed",
+        body=render_to_string(
+            "emails/orders/order-confirmation.html",
+            {"order": order, "items": items}
+        ),
+        to=[order.email],
+    )
+
+
+@job('payments.decrement_stock')
+def decrement_stock(order_id):
+    with transaction.atomic():
+        # A retried or re-run job finds the order already claimed
+        claimed = Order.objects.filter(
+            pk=order_id, stock_decremented=False
+        ).update(stock_decremented=True)
+        if not claimed:
+            return
+        # Products without tracked stock are left alone
+        for product_id, quantity in OrderItem.objects.filter(
+            order_id=order_id, product__isnull=False
+        ).values_list('product_id', 'quantity'):
+            Product.objects.filter(pk=product_id, stock__isnull=False).update(
+                stock=Greatest(F('stock') - quantity, 0)
+            )
+
+
+@job('payments.notify_fulfilment')
+def notify_fulfilment(order_id):
+    recipients = getattr(settings, 'FULFILMENT_EMAILS', [])
+    if not recipients:
+        logger.info("Order #%s ready for fulfilment", order_id)
+        return
+    order, items = _load(order_id)
+    lines = "\n".join(
+        f"{item.quantity} x {item.product.name if item.product else 'n/a'}"
+        for item in items
+    )
+    queue_email(
+        subject=f"Fulfil order #{order.pk}",
+        body=f"{lines}\n\nShip to:\n{order.full_name}\n{order.shipping_address}",
+        to=recipients,
+        html=False,
+    )
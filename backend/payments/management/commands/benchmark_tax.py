@@ -0,0 +1,85 @@
+"""
+Django command to measure tax calculation over synthetic carts.
+Uses the compiled rates in the database, or an in-memory synthetic table.
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.models import TaxRate
+from payments.utils.tax import TaxIndex, tax_index
+
+
+class Command(BaseCommand):
+    """Django benchmark_tax command class."""
+
+    help = 'Time tax calculation for synthetic carts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carts', type=int, default=10_000)
+        parser.add_argument('--max-lines', type=int, default=8)
+        parser.add_argument(
+            '--synthetic', action='store_true',
+            help='Benchmark a generated rate table instead of the database.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options['seed'])
+        if options['synthetic']:
+            rows = self._synthetic_rows()
+            index = TaxIndex(rows)
+        else:
+            rows = list(
+                TaxRate.objects.filter(is_active=True)
+                .values_list('country', 'region', 'category_id', 'rate')
+            )
+            if not rows:
+                raise CommandError('No tax rates configured; try --synthetic.')
+            started = time.monotonic()
+            index = tax_index.builder()
+            self.stdout.write(
+                f'Compiled {len(index):,} rates in '
+                f'{(time.monotonic() - started) * 1000:.1f}ms.'
+            )
+
+        destinations = sorted({(str(c), r) for c, r, _, _ in rows})
+        categories = sorted({cat for _, _, cat, _ in rows if cat is not None})
+        carts = [
+            (
+                *rng.choice(destinations),
+                [
+                    {
+                        'category': rng.choice(categories) if categories else None,
+                        'net': Decimal(rng.randint(100, 50_000)) / 100,
+                    }
+                    for _ in range(rng.randint(1, options['max_lines']))
+                ],
+            )
+            for _ in range(options['carts'])
+        ]
+        line_count = sum(len(lines) for _, _, lines in carts)
+
+        started = time.monotonic()
+        for country, region, lines in carts:
+            index.tax_lines(lines, country, region)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Taxed {len(carts):,} carts ({line_count:,} lines) in '
+            f'{elapsed * 1000:.1f}ms ({elapsed / len(carts) * 1e6:.1f}us/cart).'
+        ))
+
+    def _synthetic_rows(self, countries=60, regions=8, categories=40):
+        rows = []
+        for c in range(countries):
+            country = chr(65 + c // 26) + chr(65 + c % 26)
+            rows.append((country, '', None, Decimal(20)))
+            for r in range(regions):
+                rows.append((country, f'region {r}', None, Decimal(r)))
+                rows.append((country, f'region {r}', r % categories, Decimal(5)))
+            for category in range(0, categories, 4):
+                rows.append((country, '', category, Decimal(10)))
+        return rows
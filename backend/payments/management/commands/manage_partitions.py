@@ -0,0 +1,42 @@
+"""
+Django command to maintain the monthly partitions of the order tables.
+"""
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from payments.utils.partitions import ensure_partitions, detach_partitions
+
+
+class Command(BaseCommand):
+    """Django manage_partitions command class."""
+
+    help = 'Create upcoming order partitions and detach old ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=3,
+            help='Months of partitions to keep ready beyond the current one.'
+        )
+        parser.add_argument(
+            '--detach-before', metavar='YYYY-MM',
+            help='Detach partitions for months before this one.'
+        )
+        parser.add_argument(
+            '--archive-schema',
+            help='Move detached partitions into this schema.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        created = ensure_partitions(ahead=options['ahead'])
+        for name in created:
+            self.stdout.write(f'Created {name}')
+
+        if options['detach_before']:
+            try:
+                before = datetime.strptime(options['detach_before'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--detach-before must look like YYYY-MM.')
+            for name in detach_partitions(before, options['archive_schema']):
+                self.stdout.write(f'Detached {name}')
+
+        self.stdout.write(self.style.SUCCESS('Order partitions up to date.'))
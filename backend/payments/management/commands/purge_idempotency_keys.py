@@ -0,0 +1,30 @@
+"""
+Django command to delete expired Idempotency-Key records.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from payments.utils.idempotency import KEY_TTL, PURGE_BATCH, purge_expired_keys
+
+
+class Command(BaseCommand):
+    """Django purge_idempotency_keys command class."""
+
+    help = 'Delete stored Idempotency-Key responses older than the retry window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=KEY_TTL.total_seconds() / 3600,
+            help='Age after which a key can no longer be replayed.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH,
+            help='Keys deleted per statement.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        deleted = purge_expired_keys(
+            ttl=timedelta(hours=options['hours']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys.'))
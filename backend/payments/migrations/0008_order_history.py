@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model('payments', 'Order')
+    OrderItem = apps.get_model('payments', 'OrderItem')
+    per_order = OrderItem.objects.filter(order=OuterRef('pk')).values('order')
+    Order.objects.update(
+        item_count=Coalesce(
+            Subquery(per_order.annotate(n=Sum('quantity')).values('n')), 0
+        ),
+        subtotal=Coalesce(
+            Subquery(
+                per_order.annotate(
+                    total=Sum(F('price') * F('quantity'), output_field=DecimalField())
+                ).values('total')
+            ),
+            0,
+            output_field=DecimalField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='date_ordered',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-date_ordered', '-id'], include=['amount_paid', 'item_count', 'subtotal'], name='payments_order_history_idx'),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,126 @@
+"""
+Convert payments_order and payments_orderitem into tables range partitioned
+by month on date_ordered.
+
+Each table is rebuilt as a partitioned copy of itself: monthly partitions
+cover every existing order plus three months ahead, a DEFAULT partition
+catches anything outside them, and `manage.py manage_partitions` keeps
+creating months from then on. The primary keys become (id, date_ordered),
+as Postgres requires the partition key in every unique constraint, which is
+also why order items no longer carry a database-level foreign key to orders.
+"""
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def partition_table_sql(table):
+    old = f'{table}_old'
+    return f"""
+        ALTER TABLE {table} RENAME TO {old};
+        ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey;
+
+        CREATE TABLE {table} (
+            LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (date_ordered);
+        ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT;
+        ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+        ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, date_ordered);
+
+        DO $$
+        DECLARE
+            first_day date := date_trunc(
+                'month', coalesce(
+                    (SELECT min(date_ordered) FROM {old}), now()
+                ) AT TIME ZONE 'UTC'
+            );
+            last_day date := date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '3 months';
+        BEGIN
+            WHILE first_day <= last_day LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(first_day, 'YYYYMM'),
+                    first_day || ' 00:00:00+00',
+                    (first_day + interval '1 month')::date || ' 00:00:00+00'
+                );
+                first_day := first_day + interval '1 month';
+            END LOOP;
+        END $$;
+        CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT;
+
+        INSERT INTO {table} SELECT * FROM {old};
+        SELECT setval(
+            pg_get_serial_sequence('{table}', 'id'),
+            coalesce((SELECT max(id) FROM {table}), 0) + 1,
+            false
+        );
+        DROP TABLE {old};
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_order_date_index'),
+        ('store', '0007_product_stock'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderitem',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='payments.order'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='date_ordered',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunSQL(
+            sql=[
+                """
+                UPDATE payments_orderitem AS item
+                SET date_ordered = o.date_ordered
+                FROM payments_order AS o
+                WHERE item.order_id = o.id;
+                """,
+                partition_table_sql('payments_order'),
+                partition_table_sql('payments_orderitem'),
+                # Indexes and foreign keys went with the old tables. Indexes
+                # on the parent cascade to every partition, current and future.
+                """
+                CREATE INDEX payments_order_history_idx
+                    ON payments_order (user_id, date_ordered DESC, id DESC)
+                    INCLUDE (amount_paid, item_count, subtotal);
+                CREATE INDEX payments_order_date_idx
+                    ON payments_order (date_ordered);
+                ALTER TABLE payments_order
+                    ADD CONSTRAINT payments_order_user_id_fk_accounts_user_id
+                    FOREIGN KEY (user_id) REFERENCES accounts_user (id)
+                    DEFERRABLE INITIALLY DEFERRED;
+
+                CREATE INDEX payments_orderitem_order_id_idx
+                    ON payments_orderitem (order_id);
+                CREATE INDEX payments_orderitem_product_id_idx
+                    ON payments_orderitem (product_id);
+                CREATE INDEX payments_orderitem_user_id_idx
+                    ON payments_orderitem (user_id);
+                ALTER TABLE payments_orderitem
+                    ADD CONSTRAINT payments_orderitem_product_id_fk_store_product_id
+                    FOREIGN KEY (product_id) REFERENCES store_product (id)
+                    DEFERRABLE INITIALLY DEFERRED;
+                ALTER TABLE payments_orderitem
+                    ADD CONSTRAINT payments_orderitem_user_id_fk_accounts_user_id
+                    FOREIGN KEY (user_id) REFERENCES accounts_user (id)
+                    DEFERRABLE INITIALLY DEFERRED;
+                """,
+            ],
+            # Merging the partitions back into plain tables is not supported
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['date_ordered'], name='payments_orderitem_date_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+import django.core.validators
+import django.db.models.deletion
+import django_countries.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_partition_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingZone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('countries', django_countries.fields.CountryField(blank=True, max_length=746, multiple=True)),
+                ('basis', models.CharField(choices=[('weight', 'Cart weight (kg)'), ('subtotal', 'Cart subtotal')], default='weight', max_length=10)),
+                ('free_over', models.DecimalField(blank=True, decimal_places=2, help_text='Subtotal from which shipping is free.', max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Shipping Zones',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShippingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_value', models.DecimalField(decimal_places=3, default=0, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('max_value', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)])),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='payments.shippingzone')),
+            ],
+            options={
+                'verbose_name_plural': 'Shipping Rates',
+                'ordering': ('zone', 'min_value'),
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.core.validators
+import django.db.models.deletion
+import django_countries.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0011_shippingzone_shippingrate'),
+        ('store', '0008_product_weight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('country', django_countries.fields.CountryField(max_length=2)),
+                ('region', models.CharField(blank=True, max_length=255)),
+                ('rate', models.DecimalField(decimal_places=3, help_text='Percentage of the net line amount.', max_digits=6, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('is_active', models.BooleanField(default=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tax_rates', to='store.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Tax Rates',
+                'constraints': [models.UniqueConstraint(fields=('country', 'region', 'category'), name='payments_taxrate_scope_uniq', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_taxrate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='stock_decremented',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0013_order_stock_decremented'),
+        ('store', '0009_category_deleted_at_product_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderitem',
+            name='product',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.product'),
+        ),
+    ]
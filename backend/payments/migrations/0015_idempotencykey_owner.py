@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0014_alter_orderitem_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='owner',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='key',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('owner', 'key'), name='payments_idempotency_owner_key_uniq'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from store.models import Product
+from store.models import Product, Category
 from django_countries.fields import CountryField
 
 
@@ -9,20 +11,44 @@ class Order(models.Model):
     email = models.EmailField(max_length=255)
     shipping_address = models.TextField(max_length=10000)
     amount_paid = models.DecimalField(max_digits=8, decimal_places=2)
-    date_ordered = models.DateTimeField(auto_now=True)
+    # Denormalised from the items so listings never touch OrderItem
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    date_ordered = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
         get_user_model(), 
         on_delete=models.DO_NOTHING, 
         null=True, blank=True
     )
+    # Claimed by the decrement_stock job so a retry cannot apply it twice
+    stock_decremented = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a customer's history, covering the
+            # columns the list view returns
+            models.Index(
+                fields=['user', '-date_ordered', '-id'],
+                include=['amount_paid', 'item_count', 'subtotal'],
+                name='payments_order_history_idx',
+            ),
+            # Date-bounded scans for reports and rollups
+            models.Index(fields=['date_ordered'], name='payments_order_date_idx'),
+        ]
 
     def __str__(self):
         return 'Order - #' + str(self.pk)
     
 
 class OrderItem(models.Model): 
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True)
-    product = models.ForeignKey(Product, on_delete=models.CASCADE, null=True)
+    # Orders are partitioned by month, so their primary key in the database
+    # is (id, date_ordered) and a foreign key on order_id alone is not
+    # possible; place_order writes an order and its items in one transaction.
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, null=True, db_constraint=False
+    )
+    # Lines outlive their product so order totals keep adding up
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
     quantity = models.PositiveBigIntegerField(default=1)
     price = models.DecimalField(max_digits=6, decimal_places=2)
     user = models.ForeignKey(
@@ -30,13 +56,23 @@ class OrderItem(models.Model):
         on_delete=models.DO_NOTHING, 
         null=True, blank=True
     )
+    # Copy of the order's date, the partition key for this table
+    date_ordered = models.DateTimeField(default=timezone.now)
 
     class Meta:
         verbose_name_plural = 'Order Items'
+        indexes = [
+            models.Index(fields=['date_ordered'], name='payments_orderitem_date_idx'),
+        ]
     
     def __str__(self):
         return 'Order Item - #' + str(self.pk)
 
+    def save(self, *args, **kwargs):
+        if self.order_id and self._state.adding:
+            self.date_ordered = self.order.date_ordered
+        super().save(*args, **kwargs)
+
 
 class ShippingAddress(models.Model):
     name = models.CharField(max_length=50)
@@ -56,4 +92,110 @@ class ShippingAddress(models.Model):
         verbose_name_plural = 'Shipping Address'
 
     def __str__(self):
-        return 'Shipping Address - ' + str(self.pk)
\ No newline at end of file
+        return 'Shipping Address - ' + str(self.pk)
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a request submitted with an Idempotency-Key header."""
+    # Keys are chosen by clients, so they are only unique per account or
+    # anonymous session
+    owner = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'Idempotency Keys'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'key'], name='payments_idempotency_owner_key_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Idempotency Key - {self.key}"
+
+
+class ShippingZone(models.Model):
+    """Countries sharing one set of shipping rates."""
+
+    class Basis(models.TextChoices):
+        WEIGHT = 'weight', 'Cart weight (kg)'
+        SUBTOTAL = 'subtotal', 'Cart subtotal'
+
+    name = models.CharField(max_length=100, unique=True)
+    # A zone without countries is the fallback for every unlisted country
+    countries = CountryField(multiple=True, blank=True)
+    basis = models.CharField(
+        max_length=10, choices=Basis.choices, default=Basis.WEIGHT
+    )
+    free_over = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        validators=[MinValueValidator(0)],
+        help_text='Subtotal from which shipping is free.'
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name_plural = 'Shipping Zones'
+
+    def __str__(self):
+        return self.name
+
+
+class ShippingRate(models.Model):
+    """Price of shipping to a zone for carts in [min_value, max_value)."""
+    zone = models.ForeignKey(
+        ShippingZone, related_name='rates', on_delete=models.CASCADE
+    )
+    min_value = models.DecimalField(
+        max_digits=10, decimal_places=3, default=0,
+        validators=[MinValueValidator(0)]
+    )
+    # Open-ended when unset
+    max_value = models.DecimalField(
+        max_digits=10, decimal_places=3, null=True, blank=True
+    )
+    price = models.DecimalField(
+        max_digits=8, decimal_places=2, validators=[MinValueValidator(0)]
+    )
+
+    class Meta:
+        verbose_name_plural = 'Shipping Rates'
+        ordering = ('zone', 'min_value')
+
+    def __str__(self):
+        return f"{self.zone.name} - from {self.min_value}"
+
+
+class TaxRate(models.Model):
+    """VAT or sales tax percentage, narrowed by region and category."""
+    name = models.CharField(max_length=100)
+    country = CountryField()
+    # State or province, matched case-insensitively; country-wide when blank
+    region = models.CharField(max_length=255, blank=True)
+    # Applies to every category when unset
+    category = models.ForeignKey(
+        Category, related_name='tax_rates',
+        on_delete=models.CASCADE, null=True, blank=True
+    )
+    rate = models.DecimalField(
+        max_digits=6, decimal_places=3,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        help_text='Percentage of the net line amount.'
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name_plural = 'Tax Rates'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['country', 'region', 'category'],
+                nulls_distinct=False,
+                name='payments_taxrate_scope_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.rate}%"
@@ -1,5 +1,7 @@
 from ninja import Schema
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
+from cart.schemas import CartChangeSchema
 
 class ShippingAddressSchema(Schema):
     user_id: int
@@ -11,7 +13,6 @@ class ShippingAddressSchema(Schema):
     zipcode: str
 
 class CheckoutResponseSchema(Schema):
-    countries: list
     cart: list
     shipping: Optional[ShippingAddressSchema] = None
 
@@ -25,3 +26,49 @@ class CompleteOrderInputSchema(Schema):
     st: str
     cntry: str
     zip: str
+
+class QuoteLineSchema(Schema):
+    product_id: int
+    qty: int
+    price: float
+    discount: float
+    total: float
+    savings: float
+    net: float
+    tax: float = 0
+
+class QuoteSchema(Schema):
+    lines: List[QuoteLineSchema]
+    subtotal: float
+    savings: float
+    coupon: Optional[str] = None
+    coupon_savings: float
+    shipping: float
+    shipping_available: bool = True
+    tax: float
+    total: float
+    changes: List[CartChangeSchema] = []
+
+class OrderSummarySchema(Schema):
+    id: int
+    date_ordered: datetime
+    amount_paid: float
+    subtotal: float
+    item_count: int
+
+class OrderPageSchema(Schema):
+    items: List[OrderSummarySchema]
+    next_cursor: Optional[str] = None
+
+class OrderItemOutSchema(Schema):
+    product_id: Optional[int] = None
+    name: Optional[str] = None
+    slug: Optional[str] = None
+    quantity: int
+    price: float
+
+class OrderDetailSchema(OrderSummarySchema):
+    full_name: str
+    email: str
+    shipping_address: str
+    items: List[OrderItemOutSchema]
@@ -0,0 +1,19 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from .models import ShippingZone, ShippingRate, TaxRate
+from .utils.shipping import shipping_table
+from .utils.tax import tax_index
+
+
+@receiver(post_save, sender=ShippingZone)
+@receiver(post_delete, sender=ShippingZone)
+@receiver(post_save, sender=ShippingRate)
+@receiver(post_delete, sender=ShippingRate)
+def invalidate_shipping(sender, **kwargs):
+    shipping_table.invalidate()
+
+
+@receiver(post_save, sender=TaxRate)
+@receiver(post_delete, sender=TaxRate)
+def invalidate_tax(sender, **kwargs):
+    tax_index.invalidate()
@@ -1,11 +1,30 @@
 import json
+from io import StringIO
+from datetime import timedelta
 from http import HTTPStatus
-from django.test import TestCase, Client
+from unittest.mock import patch
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from ninja.testing import TestClient
 from django.contrib.auth import get_user_model
 from payments.api import router  # Adjust import to your actual api router module
-from payments.models import ShippingAddress, Order, OrderItem
-from store.models import Product
+from decimal import Decimal
+from payments.models import (
+    ShippingAddress, Order, OrderItem, IdempotencyKey, ShippingZone, ShippingRate,
+    TaxRate,
+)
+from payments.jobs import decrement_stock
+from payments.utils.shipping import shipping_cost
+from payments.utils.tax import tax_for_lines
+from store.models import Product, Category
+from cart.models import Coupon
+from core.models import Job
+from core.utils.jobs import run_pending
+from core.utils.pagination import encode_cursor
 from django_countries import countries
 from core.utils.tests import get_user, get_product
 
@@ -24,11 +43,32 @@ class PaymentsApiTests(TestCase):
         response = self.session_client.get("/api/payments/checkout")
         self.assertEqual(response.status_code, 200)
         data = response.json()
-        expected_countries = [list(c) for c in countries]
-        self.assertListEqual(data["countries"], expected_countries)
+        self.assertNotIn("countries", data)
         self.assertIsInstance(data["cart"], list)
         self.assertIsNone(data["shipping"])
 
+    def test_reference_data(self):
+        response = self.session_client.get("/api/payments/reference")
+        self.assertEqual(response.status_code, 200)
+        expected_countries = [[code, str(name)] for code, name in countries]
+        self.assertListEqual(response.json()["countries"], expected_countries)
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertIn("Accept-Language", response["Vary"])
+
+        cached = self.session_client.get(
+            "/api/payments/reference", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+    def test_reference_data_per_locale(self):
+        english = self.session_client.get("/api/payments/reference?lang=en")
+        german = self.session_client.get("/api/payments/reference?lang=de")
+        self.assertEqual(german.json()["locale"], "de")
+        self.assertNotEqual(english["ETag"], german["ETag"])
+        unknown = self.session_client.get("/api/payments/reference?lang=xx")
+        self.assertEqual(unknown.status_code, 200)
+
     def test_checkout_authenticated_with_shipping(self):
         ShippingAddress.objects.create(
             user=self.user,
@@ -89,3 +129,519 @@ class PaymentsApiTests(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertIn("detail", response.json())
         self.assertEqual(response.json()["detail"], "Order created successfully")
+
+    def test_complete_order_rejects_stale_prices(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 1, "action": "post"}
+        )
+        self.product.price = 25
+        self.product.save()
+        payload = {
+            "fn": "Jane", "sn": "Smith", "em": "jane@example.com",
+            "ad1": "456 Road", "ct": "Town", "st": "Province",
+            "cntry": "CA", "zip": "98765"
+        }
+        response = self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+        # The cart now carries the live price, so a resubmit goes through
+        response = self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(OrderItem.objects.get().price, 25)
+
+    def test_quote_empty_cart(self):
+        response = self.session_client.get("/api/payments/quote")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()
+        self.assertEqual(data["lines"], [])
+        self.assertEqual(data["total"], 0)
+
+    def test_quote_with_coupon(self):
+        Coupon.objects.create(name="TENOFF", discount=10)
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 3, "action": "post"}
+        )
+        self.session_client.post("/api/cart/apply-coupon",
+            content_type="application/json",
+            data={"coupon_code": "TENOFF"}
+        )
+        response = self.session_client.get("/api/payments/quote")
+        data = response.json()
+        self.assertEqual(data["subtotal"], 30.0)
+        self.assertEqual(data["coupon"], "TENOFF")
+        self.assertEqual(data["coupon_savings"], 3.0)
+        self.assertEqual(data["total"], 27.0)
+        self.assertEqual(data["lines"][0]["net"], 27.0)
+        self.assertCreatesNoOrder()
+
+    def test_quote_is_cached_by_fingerprint(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 1, "action": "post"}
+        )
+        self.session_client.get("/api/payments/quote")
+        with patch("payments.utils.quote.build_quote") as build:
+            response = self.session_client.get("/api/payments/quote")
+        build.assert_not_called()
+        self.assertEqual(response.json()["total"], 10.0)
+
+        # Editing the cart changes the fingerprint
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 2, "action": "post"}
+        )
+        response = self.session_client.get("/api/payments/quote")
+        self.assertEqual(response.json()["total"], 20.0)
+
+    def assertCreatesNoOrder(self):
+        self.assertFalse(Order.objects.exists())
+
+
+class ShippingTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.int, self.product = get_product(
+            staff_user=get_user("staff")
+        )
+        self.product.weight = Decimal("1.5")
+        self.product.save()
+        self.domestic = ShippingZone.objects.create(
+            name="Domestic", countries=["GB"], free_over=100
+        )
+        ShippingRate.objects.create(
+            zone=self.domestic, min_value=0, max_value=2, price=5
+        )
+        self.heavy = ShippingRate.objects.create(
+            zone=self.domestic, min_value=2, price=10
+        )
+
+    def _add(self, qty):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": qty, "action": "post"}
+        )
+
+    def test_weight_tiers(self):
+        self.assertEqual(shipping_cost("GB", Decimal(10), Decimal("1.5")), 5)
+        self.assertEqual(shipping_cost("gb", Decimal(10), Decimal("3")), 10)
+        self.assertEqual(shipping_cost("GB", Decimal(150), Decimal("3")), 0)
+        self.assertIsNone(shipping_cost("US", Decimal(10), Decimal("1")))
+        self.assertEqual(shipping_cost(None, Decimal(10), Decimal("1")), 0)
+
+    def test_fallback_zone_by_subtotal(self):
+        world = ShippingZone.objects.create(
+            name="World", basis=ShippingZone.Basis.SUBTOTAL
+        )
+        ShippingRate.objects.create(zone=world, min_value=0, max_value=50, price=20)
+        ShippingRate.objects.create(zone=world, min_value=50, price=12)
+        self.assertEqual(shipping_cost("US", Decimal(10), Decimal("9")), 20)
+        self.assertEqual(shipping_cost("US", Decimal(60), Decimal("9")), 12)
+
+    def test_compiled_lookup_costs_no_queries(self):
+        shipping_cost("GB", Decimal(10), Decimal(1))
+        with self.assertNumQueries(0):
+            for country in ("GB", "US", "FR"):
+                shipping_cost(country, Decimal(10), Decimal(1))
+
+    def test_rate_edits_invalidate_tables(self):
+        self.assertEqual(shipping_cost("GB", Decimal(10), Decimal(3)), 10)
+        self.heavy.price = 14
+        self.heavy.save()
+        self.assertEqual(shipping_cost("GB", Decimal(10), Decimal(3)), 14)
+
+    def test_quote_includes_shipping(self):
+        self._add(2)
+        data = self.session_client.get("/api/payments/quote?country=GB").json()
+        self.assertEqual(data["shipping"], 10.0)
+        self.assertEqual(data["total"], 30.0)
+        data = self.session_client.get("/api/payments/quote?country=US").json()
+        self.assertFalse(data["shipping_available"])
+
+    def test_order_to_unserved_country(self):
+        self._add(1)
+        payload = {
+            "fn": "Jane", "sn": "Smith", "em": "jane@example.com",
+            "ad1": "456 Road", "ct": "Town", "st": "Province",
+            "cntry": "US", "zip": "98765"
+        }
+        response = self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+        self.assertFalse(Order.objects.exists())
+
+        payload["cntry"] = "GB"
+        response = self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(Order.objects.get().amount_paid, 15)
+
+
+class TaxTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.int, self.product = get_product(
+            staff_user=get_user("staff")
+        )
+        self.category = self.product.category
+        TaxRate.objects.create(name="VAT", country="GB", rate=20)
+        TaxRate.objects.create(
+            name="Reduced VAT", country="GB", category=self.category, rate=5
+        )
+        TaxRate.objects.create(name="CA sales tax", country="US", region="CA", rate="7.25")
+
+    def _lines(self, *nets, category=None):
+        return [{"net": Decimal(net), "category": category} for net in nets]
+
+    def test_most_specific_rate_wins(self):
+        taxes, total = tax_for_lines(self._lines("10.00", "3.33"), "GB")
+        self.assertEqual(taxes, [Decimal("2.00"), Decimal("0.67")])
+        self.assertEqual(total, Decimal("2.67"))
+        _, total = tax_for_lines(self._lines("10.00", category=self.category.pk), "GB")
+        self.assertEqual(total, Decimal("0.50"))
+        _, total = tax_for_lines(self._lines("100"), "US", " ca")
+        self.assertEqual(total, Decimal("7.25"))
+        _, total = tax_for_lines(self._lines("100"), "US", "NY")
+        self.assertEqual(total, 0)
+
+    def test_compiled_rates_cost_no_queries(self):
+        tax_for_lines(self._lines("1"), "GB")
+        with self.assertNumQueries(0):
+            for country in ("GB", "US", "FR"):
+                tax_for_lines(self._lines("1", "2", "3"), country, "CA")
+
+    def test_rate_edits_invalidate_index(self):
+        TaxRate.objects.filter(category__isnull=True, country="GB").get().delete()
+        _, total = tax_for_lines(self._lines("10"), "GB")
+        self.assertEqual(total, 0)
+
+    def test_quote_includes_tax(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 2, "action": "post"}
+        )
+        data = self.session_client.get("/api/payments/quote?country=GB").json()
+        self.assertEqual(data["tax"], 1.0)
+        self.assertEqual(data["lines"][0]["tax"], 1.0)
+        self.assertEqual(data["total"], 21.0)
+
+
+class PlaceOrderQueryTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.staff_user = get_user("staff")
+        self.category = Category.objects.create(name="Bulk")
+        self.payload = {
+            "fn": "Jane", "sn": "Smith", "em": "jane@example.com",
+            "ad1": "456 Road", "ct": "Town", "st": "Province",
+            "cntry": "CA", "zip": "98765"
+        }
+
+    def _fill_cart(self, size):
+        products = [
+            Product.objects.create(
+                name=f"Bulk{size}-{index}",
+                slug=f"bulk-{size}-{index}",
+                price=5,
+                category=self.category,
+                created_by=self.staff_user,
+            )
+            for index in range(size)
+        ]
+        # Products exist before the cart is stamped, so checkout
+        # does not need to revalidate
+        for product in products:
+            self.session_client.post("/api/cart/update",
+                content_type="application/json",
+                data={"product_id": product.pk, "product_qty": 1, "action": "post"}
+            )
+
+    def _order_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.session_client.post(
+                "/api/payments/complete-order",
+                data=json.dumps(self.payload),
+                content_type="application/json"
+            )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_cart_size(self):
+        self._fill_cart(1)
+        small = self._order_queries()
+
+        self.session_client = Client()
+        self._fill_cart(25)
+        # Start from the same queue, the first order's rollup run would
+        # otherwise save the second its insert
+        Job.objects.all().delete()
+        large = self._order_queries()
+
+        self.assertEqual(small, large)
+        order = Order.objects.latest("pk")
+        self.assertEqual(order.orderitem_set.count(), 25)
+        self.assertEqual(order.amount_paid, 125)
+
+    def test_failed_order_writes_nothing(self):
+        self._fill_cart(3)
+        with patch.object(OrderItem.objects, "bulk_create", side_effect=RuntimeError):
+            response = self.session_client.post(
+                "/api/payments/complete-order",
+                data=json.dumps(self.payload),
+                content_type="application/json"
+            )
+        self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+        self.assertFalse(Order.objects.exists())
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.payload = {
+            "fn": "Jane", "sn": "Smith", "em": "jane@example.com",
+            "ad1": "456 Road", "ct": "Town", "st": "Province",
+            "cntry": "CA", "zip": "98765"
+        }
+
+    def _submit(self, payload, key):
+        return self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(payload),
+            content_type="application/json",
+            headers={"Idempotency-Key": key}
+        )
+
+    def test_retry_replays_stored_response(self):
+        first = self._submit(self.payload, "order-abc")
+        with patch("payments.api.place_order") as place:
+            second = self._submit(self.payload, "order-abc")
+        place.assert_not_called()
+        self.assertEqual(first.status_code, HTTPStatus.OK)
+        self.assertEqual(second.status_code, HTTPStatus.OK)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        self._submit(self.payload, "order-abc")
+        res = self._submit({**self.payload, "fn": "Janet"}, "order-abc")
+        self.assertEqual(res.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_attempt_can_be_retried(self):
+        with patch("payments.api.place_order", side_effect=RuntimeError):
+            res = self._submit(self.payload, "order-abc")
+        self.assertEqual(res.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        res = self._submit(self.payload, "order-abc")
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_without_header_each_submit_creates_order(self):
+        for _ in range(2):
+            self.session_client.post(
+                "/api/payments/complete-order",
+                data=json.dumps(self.payload),
+                content_type="application/json"
+            )
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_keys_are_scoped_to_their_owner(self):
+        # Two visitors, then two customers, happening to pick the same key
+        for _ in range(2):
+            self.session_client = Client()
+            res = self._submit(self.payload, "order-1")
+            self.assertEqual(res.status_code, HTTPStatus.OK)
+        for user in (get_user(), get_user()):
+            self.session_client = Client()
+            self.session_client.force_login(user)
+            res = self._submit(self.payload, "order-1")
+            self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertEqual(Order.objects.count(), 4)
+        self.assertEqual(IdempotencyKey.objects.filter(key="order-1").count(), 4)
+
+        # The same customer retrying still gets a replay
+        res = self._submit(self.payload, "order-1")
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertEqual(Order.objects.count(), 4)
+
+    def test_expired_keys_are_purged(self):
+        for key in ("old-1", "old-2", "recent"):
+            self._submit(self.payload, key)
+        IdempotencyKey.objects.exclude(key="recent").update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+        out = StringIO()
+        call_command("purge_idempotency_keys", "--batch-size", "1", stdout=out)
+        self.assertIn("Deleted 2 expired", out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["recent"])
+
+
+class OrderPostProcessingTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.int, self.product = get_product(staff_user=get_user("staff"))
+        self.product.stock = 5
+        self.product.save()
+        self.payload = {
+            "fn": "Jane", "sn": "Smith", "em": "jane@example.com",
+            "ad1": "456 Road", "ct": "Town", "st": "Province",
+            "cntry": "CA", "zip": "98765"
+        }
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_order_jobs_run_off_request_path(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 2, "action": "post"}
+        )
+        self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(self.payload),
+            content_type="application/json"
+        )
+        # Nothing has happened yet beyond queueing
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.count(), 4)
+
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["jane@example.com"])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+        # Only the delayed rollup is left
+        self.assertEqual(
+            list(Job.objects.values_list('name', flat=True)),
+            ['reports.update_rollups']
+        )
+
+
+    def test_orders_share_a_rollup_run(self):
+        for _ in range(3):
+            self.session_client.post(
+                "/api/payments/complete-order",
+                data=json.dumps(self.payload),
+                content_type="application/json"
+            )
+        self.assertEqual(Order.objects.count(), 3)
+        rollups = Job.objects.filter(name="reports.update_rollups")
+        self.assertEqual(rollups.count(), 1)
+        # Not due before the last order is old enough to be folded in
+        self.assertGreater(
+            rollups.get().run_after,
+            Order.objects.latest("pk").date_ordered + timedelta(minutes=2),
+        )
+
+    def test_stock_decrement_applies_once(self):
+        self.session_client.post("/api/cart/update",
+            content_type="application/json",
+            data={"product_id": self.product.pk, "product_qty": 2, "action": "post"}
+        )
+        self.session_client.post(
+            "/api/payments/complete-order",
+            data=json.dumps(self.payload),
+            content_type="application/json"
+        )
+        order = Order.objects.get()
+        # As when a job is retried or its dead worker's claim is requeued
+        decrement_stock(order.pk)
+        decrement_stock(order.pk)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+        order.refresh_from_db()
+        self.assertTrue(order.stock_decremented)
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.user = get_user()
+        self.other = get_user()
+        self.int, self.product = get_product(staff_user=get_user("staff"))
+        self.orders = []
+        for index in range(5):
+            order = Order.objects.create(
+                full_name="Jane Smith", email="jane@example.com",
+                shipping_address="456 Road", amount_paid=10 * (index + 1),
+                item_count=index + 1, subtotal=10 * (index + 1),
+                user=self.user
+            )
+            OrderItem.objects.create(
+                order=order, product=self.product,
+                quantity=index + 1, price=10, user=self.user
+            )
+            self.orders.append(order)
+        Order.objects.create(
+            full_name="Other", email="other@example.com",
+            shipping_address="1 Lane", amount_paid=5, user=self.other
+        )
+        self.session_client.force_login(self.user)
+
+    def test_list_requires_login(self):
+        response = Client().get("/api/payments/orders")
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_keyset_pagination(self):
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/payments/orders?limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = self.session_client.get(url).json()
+            seen += [order["id"] for order in data["items"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        expected = sorted(
+            self.orders, key=lambda o: (o.date_ordered, o.pk), reverse=True
+        )
+        self.assertEqual(seen, [order.pk for order in expected])
+
+    def test_list_does_not_touch_order_items(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.session_client.get("/api/payments/orders")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(any(
+            'payments_orderitem' in q['sql'] for q in ctx.captured_queries
+        ))
+        self.assertEqual(response.json()["items"][0]["item_count"], 5)
+
+    def test_invalid_cursor(self):
+        response = self.session_client.get("/api/payments/orders?cursor=nope")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        # Well-formed, but with an id that is not a number
+        tampered = encode_cursor("2024-01-01T00:00:00", "x")
+        response = self.session_client.get(f"/api/payments/orders?cursor={tampered}")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_detail_prefetches_items_and_products(self):
+        order = self.orders[-1]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.session_client.get(f"/api/payments/orders/{order.pk}")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        item_queries = [
+            q for q in ctx.captured_queries if 'payments_orderitem' in q['sql']
+        ]
+        self.assertEqual(len(item_queries), 1)
+        self.assertIn('store_product', item_queries[0]['sql'])
+        self.assertEqual(response.json()["items"][0]["quantity"], 5)
+
+    def test_detail_of_another_customer(self):
+        order = Order.objects.get(user=self.other)
+        response = self.session_client.get(f"/api/payments/orders/{order.pk}")
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -1,9 +1,16 @@
+from datetime import timedelta
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from payments.models import Order, OrderItem, ShippingAddress
 from store.models import Product
 from django.core.exceptions import ValidationError
 from core.utils.tests import get_user, get_product
+from payments.utils.partitions import (
+    add_months, create_partition, detach_partitions, ensure_partitions,
+    list_partitions, month_bounds, month_start, partition_name,
+)
 
 User = get_user_model()
 
@@ -70,4 +77,94 @@ class OrderItemModelTests(TestCase):
             city="Shelbyville",
             country="US"
         )
-        self.assertEqual(str(address), f"Shipping Address - {address.pk}")
\ No newline at end of file
+        self.assertEqual(str(address), f"Shipping Address - {address.pk}")
+
+
+class OrderPartitionTests(TestCase):
+    def setUp(self):
+        self.int, self.product = get_product(
+            staff_user=get_user("staff")
+        )
+        self.this_month = month_start(timezone.now().date())
+
+    def _order(self, when=None):
+        order = Order.objects.create(
+            full_name="John Smith",
+            email="johnsmith@example.com",
+            shipping_address="789 Road",
+            amount_paid=50.00
+        )
+        if when:
+            Order.objects.filter(pk=order.pk).update(date_ordered=when)
+            order.refresh_from_db()
+        OrderItem.objects.create(
+            order=order, product=self.product, quantity=1, price=50.00
+        )
+        return order
+
+    def _partition_of(self, table, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {table} WHERE id = %s",
+                [pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_rows_land_in_their_month(self):
+        order = self._order()
+        item = OrderItem.objects.get(order=order)
+        self.assertEqual(item.date_ordered, order.date_ordered)
+        self.assertEqual(
+            self._partition_of('payments_order', order.pk),
+            partition_name('payments_order', self.this_month),
+        )
+        self.assertEqual(
+            self._partition_of('payments_orderitem', item.pk),
+            partition_name('payments_orderitem', self.this_month),
+        )
+
+    def test_ensure_partitions_creates_ahead_once(self):
+        created = ensure_partitions(ahead=5)
+        self.assertIn(
+            partition_name('payments_order', add_months(self.this_month, 5)),
+            created,
+        )
+        self.assertEqual(ensure_partitions(ahead=5), [])
+
+    def test_new_partition_takes_rows_from_default(self):
+        far = add_months(self.this_month, 24)
+        start, end = month_bounds(far)
+        order = self._order(when=start + timedelta(days=3))
+        self.assertEqual(
+            self._partition_of('payments_order', order.pk),
+            'payments_order_pdefault',
+        )
+        ensure_partitions(ahead=0, today=far)
+        self.assertEqual(
+            self._partition_of('payments_order', order.pk),
+            partition_name('payments_order', far),
+        )
+        self.assertEqual(OrderItem.objects.get(order=order).price, 50)
+
+    def test_date_bounded_queries_prune(self):
+        start, end = month_bounds(self.this_month)
+        plan = OrderItem.objects.filter(
+            date_ordered__gte=start, date_ordered__lt=end
+        ).explain()
+        self.assertIn(partition_name('payments_orderitem', self.this_month), plan)
+        self.assertNotIn(
+            partition_name('payments_orderitem', add_months(self.this_month, 1)),
+            plan,
+        )
+
+    def test_detach_old_partitions(self):
+        old = add_months(self.this_month, -12)
+        for table in ('payments_orderitem', 'payments_order'):
+            create_partition(table, old)
+        detached = detach_partitions(self.this_month, archive_schema='archive')
+        self.assertEqual(detached, [
+            partition_name('payments_orderitem', old),
+            partition_name('payments_order', old),
+        ])
+        self.assertNotIn(old, list_partitions('payments_order'))
+        self.assertIn(self.this_month, list_partitions('payments_order'))
@@ -0,0 +1,108 @@
+import hashlib
+from datetime import timedelta
+from functools import wraps
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ..models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Far longer than any client keeps retrying one checkout
+KEY_TTL = timedelta(hours=24)
+PURGE_BATCH = 5000
+
+
+class _Discard(Exception):
+    """Rolls back the key row so a failed attempt can be retried."""
+
+
+def request_owner(request):
+    """Whose keys a request's key is checked against: its account or session."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if not request.session.session_key:
+        # Visitors with a cart always have one; a bare request gets its own
+        request.session.save()
+    return f"session:{request.session.session_key}"
+
+
+def request_fingerprint(request):
+    # The key is already scoped to the owner; this catches a key reused
+    # for a different body
+    owner = request.user.pk if request.user.is_authenticated else 'anonymous'
+    digest = hashlib.sha256()
+    digest.update(f"{request.method}:{request.path}:{owner}:".encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return 422, {"detail": "Idempotency-Key was reused for a different request"}
+    return record.status_code, record.response
+
+
+def idempotent(view):
+    """
+    Make a `(status, body)` returning view safe to retry.
+
+    Keys are scoped to the caller's account, or session when anonymous.
+    With an Idempotency-Key header, the first request inserts the key and
+    does the work in the same transaction; concurrent duplicates block on
+    the unique index until it commits and then replay the stored response.
+    Retries cost one indexed lookup. Only successful responses are kept.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return 422, {"detail": "Idempotency-Key is too long"}
+
+        owner = request_owner(request)
+        fingerprint = request_fingerprint(request)
+        record = IdempotencyKey.objects.filter(owner=owner, key=key).first()
+        if record is not None:
+            return _replay(record, fingerprint)
+
+        result = None
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    owner=owner, key=key, fingerprint=fingerprint
+                )
+                result = view(request, *args, **kwargs)
+                status, body = result
+                if status >= 300:
+                    raise _Discard
+                record.status_code = status
+                record.response = body
+                record.save(update_fields=['status_code', 'response'])
+        except _Discard:
+            return result
+        except IntegrityError:
+            if result is not None:
+                raise
+            # Lost the race: the winner has committed by now
+            return _replay(
+                IdempotencyKey.objects.get(owner=owner, key=key), fingerprint
+            )
+        return result
+    return wrapper
+
+
+def purge_expired_keys(ttl=KEY_TTL, batch_size=PURGE_BATCH):
+    """
+    Delete keys older than `ttl` in batches found through the created_at
+    index, so each delete stays short. Returns the number deleted.
+    """
+    cutoff = timezone.now() - ttl
+    deleted = 0
+    while True:
+        batch = list(
+            IdempotencyKey.objects.filter(created_at__lt=cutoff)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
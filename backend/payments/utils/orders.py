@@ -0,0 +1,55 @@
+from django.db import transaction
+from cart.utils.coupons import redeem_coupon
+from ..models import Order, OrderItem
+from ..jobs import enqueue_order_jobs
+from .quote import build_quote
+from .shipping import ShippingUnavailable
+
+
+def place_order(
+    cart, user, full_name, email, shipping_address, country=None, region=None
+):
+    """
+    Turn the cart into an order in one transaction.
+
+    Items and `amount_paid` come from the same pricing pass, and all items
+    are written with a single bulk insert, so the query count does not
+    grow with the size of the cart. Raises ShippingUnavailable if nothing
+    ships to `country`, or CouponUnavailable if the applied coupon cannot
+    be redeemed; nothing is written in either case.
+    """
+    user = user if user is not None and user.is_authenticated else None
+    quote = build_quote(cart, country, region)
+    if not quote['shipping_available']:
+        raise ShippingUnavailable(country)
+
+    with transaction.atomic():
+        coupon = cart.coupon
+        if coupon and quote['coupon']:
+            redeem_coupon(coupon, user)
+
+        order = Order.objects.create(
+            full_name=full_name,
+            email=email,
+            shipping_address=shipping_address,
+            amount_paid=quote['total'],
+            item_count=sum(line['qty'] for line in quote['lines']),
+            subtotal=quote['subtotal'],
+            user=user,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=line['product_id'],
+                quantity=line['qty'],
+                price=line['price'],
+                user=user,
+                # Partition key, so each order's items share its month
+                date_ordered=order.date_ordered,
+            )
+            for line in quote['lines']
+        ])
+        # Emails, stock and fulfilment run in the job worker, and only
+        # become visible to it once the order commits
+        enqueue_order_jobs(order)
+    return order
@@ -0,0 +1,143 @@
+"""
+Monthly partitions of the order tables.
+
+`payments_order` and `payments_orderitem` are range partitioned on
+`date_ordered`, one partition per calendar month (UTC) named
+`<table>_pYYYYMM`, plus a DEFAULT partition for anything no month covers.
+Months are created ahead of time by `ensure_partitions`; old ones can be
+detached, and optionally moved to an archive schema, by `detach_partitions`.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Items first, so a detached month never leaves items without their order
+PARTITIONED_TABLES = ('payments_orderitem', 'payments_order')
+
+_MONTH_SUFFIX = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    """UTC [start, end) of the month beginning on `month`."""
+    start = datetime.combine(month, datetime.min.time(), dt_timezone.utc)
+    end = datetime.combine(add_months(month, 1), datetime.min.time(), dt_timezone.utc)
+    return start, end
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def list_partitions(table):
+    """Return `{month: name}` for the attached monthly partitions of a table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = _MONTH_SUFFIX.search(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def create_partition(table, month):
+    """
+    Attach a partition for `month`.
+
+    Rows that already landed in the DEFAULT partition for that month are
+    moved into the new partition first, since Postgres refuses to carve a
+    range out of a default partition that holds rows for it.
+    """
+    name = partition_name(table, month)
+    start, end = month_bounds(month)
+    # DDL takes no bind parameters, and the bounds are ours to format
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    qn = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {qn(table + "_pdefault")} '
+            f'WHERE date_ordered >= %s AND date_ordered < %s)',
+            [start, end],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f'CREATE TABLE {qn(name)} PARTITION OF {qn(table)} {bounds}'
+            )
+            return name
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} (LIKE {qn(table)} '
+            f'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS ('
+            f'  DELETE FROM {qn(table + "_pdefault")} '
+            f'  WHERE date_ordered >= %s AND date_ordered < %s RETURNING *'
+            f') INSERT INTO {qn(name)} SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} {bounds}'
+        )
+    return name
+
+
+def ensure_partitions(ahead=3, today=None):
+    """Create any missing partitions from this month to `ahead` months out."""
+    first = month_start(today or timezone.now().date())
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = list_partitions(table)
+        for offset in range(ahead + 1):
+            month = add_months(first, offset)
+            if month not in existing:
+                created.append(create_partition(table, month))
+    return created
+
+
+def detach_partitions(before, archive_schema=None):
+    """
+    Detach every monthly partition that ends on or before `before`.
+
+    Detached partitions keep their data as ordinary tables; with
+    `archive_schema` they are also moved out of the public schema, ready
+    to be dumped or dropped.
+    """
+    before = month_start(before)
+    qn = connection.ops.quote_name
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if archive_schema:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {qn(archive_schema)}')
+        for table in PARTITIONED_TABLES:
+            for month, name in sorted(list_partitions(table).items()):
+                if month >= before:
+                    continue
+                cursor.execute(
+                    f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}'
+                )
+                if archive_schema:
+                    cursor.execute(
+                        f'ALTER TABLE {qn(name)} SET SCHEMA {qn(archive_schema)}'
+                    )
+                detached.append(name)
+    return detached
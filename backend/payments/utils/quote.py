@@ -0,0 +1,75 @@
+import json
+import hashlib
+from decimal import Decimal
+from django.core.cache import cache
+from core.utils.versioning import get_version
+from cart.utils.coupons import active_coupons
+from store.utils.catalog import catalog_version
+from .shipping import shipping_cost, shipping_table
+from .tax import tax_for_lines, tax_index
+
+QUOTE_TIMEOUT = 60 * 10
+
+
+def cart_fingerprint(cart, *extra):
+    """
+    Hash of everything a quote depends on: the lines, the coupon and the
+    versions of the tables used to price them.
+    """
+    payload = json.dumps(
+        [
+            cart.cart,
+            cart.coupon_code,
+            catalog_version(),
+            get_version(active_coupons.namespace),
+            get_version(shipping_table.namespace),
+            get_version(tax_index.namespace),
+            *extra,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_quote(cart, country=None, region=None):
+    """Price the cart for checkout without touching the database."""
+    pricing = cart.price_lines()
+    shipping = shipping_cost(country, pricing['discount_total'], pricing['weight'])
+    shipping_available = shipping is not None
+    if not shipping_available:
+        shipping = Decimal(0)
+    line_taxes, tax = tax_for_lines(pricing['lines'], country, region)
+    return {
+        'lines': [
+            {
+                'product_id': line['product_id'],
+                'qty': line['qty'],
+                'price': line['price'],
+                'discount': line['discount'],
+                'total': line['total'],
+                'savings': line['savings'],
+                'net': line['net'],
+                'tax': line_tax,
+            }
+            for line, line_tax in zip(pricing['lines'], line_taxes)
+        ],
+        'subtotal': pricing['total'],
+        'savings': pricing['savings'],
+        'coupon': pricing['coupon'],
+        'coupon_savings': pricing['coupon_savings'],
+        'shipping': shipping,
+        'shipping_available': shipping_available,
+        'tax': tax,
+        'total': pricing['discount_total'] + shipping + tax,
+    }
+
+
+def get_quote(cart, country=None, region=None):
+    """Memoised build_quote, keyed by the cart fingerprint."""
+    key = f"quote:{cart_fingerprint(cart, country, region)}"
+    quote = cache.get(key)
+    if quote is None:
+        quote = build_quote(cart, country, region)
+        cache.set(key, quote, QUOTE_TIMEOUT)
+    return quote
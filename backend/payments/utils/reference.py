@@ -0,0 +1,56 @@
+"""
+Static checkout reference data, rendered once per process and locale.
+
+The country list only changes with a deploy, so each locale's payload is
+serialised the first time it is asked for and served from memory as bytes,
+with an ETag clients and proxies can revalidate against.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from django.utils import translation
+from django_countries import countries
+
+
+@dataclass(frozen=True)
+class ReferencePayload:
+    locale: str
+    body: bytes
+    etag: str
+
+
+_payloads = {}
+_lock = threading.Lock()
+
+
+def resolve_locale(lang=None):
+    """Map a requested language onto a supported one, or the active one."""
+    if lang:
+        try:
+            return translation.get_supported_language_variant(lang)
+        except LookupError:
+            pass
+    return translation.get_language() or 'en-us'
+
+
+def _render(locale):
+    with translation.override(locale):
+        data = {
+            "locale": locale,
+            "countries": [[code, str(name)] for code, name in countries],
+        }
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return ReferencePayload(locale, body, etag)
+
+
+def get_reference_payload(lang=None):
+    locale = resolve_locale(lang)
+    payload = _payloads.get(locale)
+    if payload is None:
+        with _lock:
+            payload = _payloads.get(locale)
+            if payload is None:
+                payload = _payloads[locale] = _render(locale)
+    return payload
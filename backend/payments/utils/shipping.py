@@ -0,0 +1,102 @@
+"""
+Shipping rates compiled into per-country lookup tables.
+
+Zones and their rate tiers are read once per process and version, then
+pricing a cart is a dict lookup plus a bisect over the zone's tiers.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from decimal import Decimal
+from core.utils.versioning import CompiledTable
+from ..models import ShippingZone
+
+
+class ShippingUnavailable(Exception):
+    """Raised when no shipping rate covers the destination and cart."""
+
+
+@dataclass(frozen=True)
+class CompiledZone:
+    id: int
+    name: str
+    basis: str
+    free_over: Decimal | None
+    # Parallel tuples sorted by the lower bound of each tier
+    mins: tuple
+    maxes: tuple
+    prices: tuple
+
+    def rate(self, subtotal, weight):
+        """Shipping price for a cart, or None if no tier covers it."""
+        if self.free_over is not None and subtotal >= self.free_over:
+            return Decimal(0)
+        value = weight if self.basis == ShippingZone.Basis.WEIGHT else subtotal
+        index = bisect_right(self.mins, value) - 1
+        if index < 0:
+            return None
+        upper = self.maxes[index]
+        if upper is not None and value >= upper:
+            return None
+        return self.prices[index]
+
+
+@dataclass(frozen=True)
+class ShippingTable:
+    by_country: dict = field(default_factory=dict)
+    fallback: CompiledZone | None = None
+
+    @property
+    def configured(self):
+        return bool(self.by_country) or self.fallback is not None
+
+    def zone_for(self, country):
+        return self.by_country.get(str(country).upper(), self.fallback)
+
+
+def _compile_zone(zone):
+    rates = sorted(zone.rates.all(), key=lambda rate: rate.min_value)
+    return CompiledZone(
+        id=zone.pk,
+        name=zone.name,
+        basis=zone.basis,
+        free_over=zone.free_over,
+        mins=tuple(rate.min_value for rate in rates),
+        maxes=tuple(rate.max_value for rate in rates),
+        prices=tuple(rate.price for rate in rates),
+    )
+
+
+def _compile_shipping():
+    by_country = {}
+    fallback = None
+    zones = (
+        ShippingZone.objects.filter(is_active=True)
+        .prefetch_related('rates')
+        .order_by('pk')
+    )
+    for zone in zones:
+        compiled = _compile_zone(zone)
+        if not zone.countries:
+            fallback = fallback or compiled
+        for country in zone.countries:
+            by_country.setdefault(country.code, compiled)
+    return ShippingTable(by_country, fallback)
+
+
+shipping_table = CompiledTable('shipping', _compile_shipping)
+
+
+def shipping_cost(country, subtotal, weight):
+    """
+    Price of shipping a cart to `country`. Costs no queries once compiled.
+
+    Shipping is free until any zone is set up, and before the shopper has
+    picked a country. Returns None when the country cannot be shipped to.
+    """
+    table = shipping_table.get()
+    if not table.configured or not country:
+        return Decimal(0)
+    zone = table.zone_for(country)
+    if zone is None:
+        return None
+    return zone.rate(subtotal, weight)
@@ -0,0 +1,81 @@
+"""
+Sales tax and VAT rates compiled into an in-process index.
+
+A rate applies to a country, optionally narrowed to a region and to a
+product category. The index maps (country, region) to a small dict of
+category -> rate, so taxing a cart is a handful of dict lookups and
+Decimal arithmetic per line, with no queries.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from core.utils.versioning import CompiledTable
+from ..models import TaxRate
+
+CENT = Decimal('0.01')
+ZERO = Decimal(0)
+
+
+def normalise_region(region):
+    return (region or '').strip().casefold()
+
+
+class TaxIndex:
+    """Most specific rate wins: region before country, category before all."""
+
+    def __init__(self, rows=()):
+        self._index = {}
+        for country, region, category_id, rate in rows:
+            scope = self._index.setdefault(
+                (str(country).upper(), normalise_region(region)), {}
+            )
+            scope[category_id] = Decimal(rate) / 100
+
+    def __len__(self):
+        return sum(len(scope) for scope in self._index.values())
+
+    def rate(self, country, region=None, category_id=None):
+        """Fractional rate for a line, 0 when nothing matches."""
+        country = str(country).upper()
+        region = normalise_region(region)
+        for scope_region in ((region, '') if region else ('',)):
+            scope = self._index.get((country, scope_region))
+            if scope is None:
+                continue
+            if category_id is not None and category_id in scope:
+                return scope[category_id]
+            if None in scope:
+                return scope[None]
+        return ZERO
+
+    def tax_lines(self, lines, country, region=None):
+        """
+        Tax on each line's `net` amount, rounded per line to cents.
+        Returns (per-line taxes, total).
+        """
+        if not country:
+            return [ZERO] * len(lines), ZERO
+        rates = {}
+        taxes = []
+        total = ZERO
+        for line in lines:
+            category_id = line.get('category')
+            rate = rates.get(category_id)
+            if rate is None:
+                rate = rates[category_id] = self.rate(country, region, category_id)
+            tax = (line['net'] * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+            taxes.append(tax)
+            total += tax
+        return taxes, total
+
+
+def _compile_tax():
+    return TaxIndex(
+        TaxRate.objects.filter(is_active=True)
+        .values_list('country', 'region', 'category_id', 'rate')
+    )
+
+
+tax_index = CompiledTable('tax', _compile_tax)
+
+
+def tax_for_lines(lines, country, region=None):
+    return tax_index.get().tax_lines(lines, country, region)
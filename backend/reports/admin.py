@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import DailySales, DailyProductSales
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'orders', 'units', 'revenue')
+    ordering = ('-day',)
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'product_id', 'category_id', 'units', 'revenue')
+    list_filter = ('day',)
+    ordering = ('-day', '-revenue')
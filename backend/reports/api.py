@@ -0,0 +1,145 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Literal, Optional
+from ninja import Router
+from ninja.security import django_auth
+from django.http import StreamingHttpResponse
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from core.schemas import MessageSchema
+from core.utils.auth import is_admin
+from core.utils.pagination import page_size
+from store.models import Product, Category
+from .models import DailySales, DailyProductSales
+from .utils.export import FORMATS, export_orders, export_filename
+from .schemas import (
+    SalesReportSchema, ProductSalesSchema, CategorySalesSchema
+)
+
+router = Router(tags=["Reports"], auth=django_auth)
+
+
+def _aov(revenue, orders):
+    return revenue / orders if orders else Decimal(0)
+
+
+def _in_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+    return queryset
+
+
+@router.get("/sales", response={200: SalesReportSchema, 403: MessageSchema})
+def sales_report(
+    request,
+    period: Literal["day", "week", "month"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Revenue, units and average order value, bucketed by period."""
+    if not is_admin(request.user):
+        return 403, {"detail": "Request not permitted"}
+    rows = (
+        _in_range(DailySales.objects.all(), start, end)
+        .annotate(bucket=Trunc('day', period))
+        .values('bucket')
+        .annotate(
+            orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue')
+        )
+        .order_by('bucket')
+    )
+    buckets = [
+        {
+            "period": row['bucket'],
+            "orders": row['orders'],
+            "units": row['units'],
+            "revenue": row['revenue'],
+            "average_order_value": _aov(row['revenue'], row['orders']),
+        }
+        for row in rows
+    ]
+    orders = sum(b['orders'] for b in buckets)
+    revenue = sum((b['revenue'] for b in buckets), Decimal(0))
+    return 200, {
+        "period": period,
+        "buckets": buckets,
+        "orders": orders,
+        "units": sum(b['units'] for b in buckets),
+        "revenue": revenue,
+        "average_order_value": _aov(revenue, orders),
+    }
+
+
+@router.get(
+    "/products", response={200: List[ProductSalesSchema], 403: MessageSchema}
+)
+def product_report(
+    request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 20,
+):
+    """Best selling products by revenue."""
+    if not is_admin(request.user):
+        return 403, {"detail": "Request not permitted"}
+    rows = list(
+        _in_range(DailyProductSales.objects.all(), start, end)
+        .values('product_id')
+        .annotate(units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('-revenue')[:page_size(limit)]
+    )
+    names = dict(
+        # Deleted products still name their past sales until purged
+        Product.all_objects.filter(id__in=[r['product_id'] for r in rows])
+        .values_list('id', 'name')
+    )
+    return 200, [{**row, "name": names.get(row['product_id'])} for row in rows]
+
+
+@router.get(
+    "/categories", response={200: List[CategorySalesSchema], 403: MessageSchema}
+)
+def category_report(
+    request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Units and revenue per category."""
+    if not is_admin(request.user):
+        return 403, {"detail": "Request not permitted"}
+    rows = list(
+        _in_range(DailyProductSales.objects.all(), start, end)
+        .values('category_id')
+        .annotate(units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('-revenue')
+    )
+    names = dict(
+        Category.all_objects.filter(id__in=[r['category_id'] for r in rows])
+        .values_list('id', 'name')
+    )
+    return 200, [{**row, "name": names.get(row['category_id'])} for row in rows]
+
+
+@router.get("/orders/export", response={400: MessageSchema, 403: MessageSchema})
+def order_export(
+    request,
+    start: date,
+    end: date,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+):
+    """Stream every order line between two dates, inclusive."""
+    if not is_admin(request.user):
+        return 403, {"detail": "Request not permitted"}
+    if end < start:
+        return 400, {"detail": "End date is before start date"}
+    response = StreamingHttpResponse(
+        export_orders(start, end, format, compress=gzip),
+        content_type='application/gzip' if gzip else FORMATS[format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export_filename(start, end, format, gzip)}"'
+    )
+    return response
@@ -0,0 +1,8 @@
+from core.utils.jobs import job
+from .utils.rollups import update_rollups as run_rollups
+
+
+@job('reports.update_rollups')
+def update_rollups(**payload):
+    while run_rollups():
+        pass
@@ -0,0 +1,50 @@
+"""
+Django command to export orders and their line items for a date range.
+"""
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from reports.utils.export import FORMATS, CHUNK_SIZE, export_orders
+
+
+class Command(BaseCommand):
+    """Django export_orders command class."""
+
+    help = 'Stream order lines between two dates as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start', type=date.fromisoformat, help='YYYY-MM-DD')
+        parser.add_argument('end', type=date.fromisoformat, help='YYYY-MM-DD')
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), default='csv',
+            help='Output format.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress the output.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Rows fetched from the database per round trip.'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='File to write to, standard output by default.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['end'] < options['start']:
+            raise CommandError('End date is before start date.')
+        chunks = export_orders(
+            options['start'], options['end'], options['format'],
+            compress=options['gzip'], chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as out:
+                for chunk in chunks:
+                    out.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,30 @@
+"""
+Django command to bring the sales rollups up to date.
+"""
+from django.core.management.base import BaseCommand
+from reports.utils.rollups import update_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    """Django update_rollups command class."""
+
+    help = 'Fold new orders into the daily sales rollups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Discard the rollups and rebuild them from every order.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['rebuild']:
+            processed = rebuild_rollups()
+        else:
+            processed = 0
+            while batch := update_rollups():
+                processed += batch
+                self.stdout.write(f'{processed} orders processed...')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rollups up to date ({processed} orders processed).'
+        ))
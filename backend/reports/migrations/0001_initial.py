@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_id', models.BigIntegerField()),
+                ('category_id', models.BigIntegerField(null=True)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Product Sales',
+                'constraints': [models.UniqueConstraint(fields=('day', 'product_id'), name='reports_day_product_uniq')],
+                'indexes': [models.Index(fields=['day', 'category_id'], name='reports_day_category_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_order_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
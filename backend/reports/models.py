@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class DailySales(models.Model):
+    """Order totals for one day, maintained by the rollup job."""
+    day = models.DateField(unique=True)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = 'Daily Sales'
+
+    def __str__(self):
+        return f"Sales - {self.day}"
+
+
+class DailyProductSales(models.Model):
+    """Units and revenue per product per day, tagged with its category."""
+    day = models.DateField()
+    product_id = models.BigIntegerField()
+    category_id = models.BigIntegerField(null=True)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = 'Daily Product Sales'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'product_id'], name='reports_day_product_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'category_id'], name='reports_day_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"Product Sales - {self.day} #{self.product_id}"
+
+
+class RollupState(models.Model):
+    """High-water mark: the last order id folded into the rollups."""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_order_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_order_id}"
@@ -0,0 +1,31 @@
+from datetime import date
+from typing import List, Optional
+from ninja import Schema
+
+
+class SalesBucketSchema(Schema):
+    period: date
+    orders: int
+    units: int
+    revenue: float
+    average_order_value: float
+
+class SalesReportSchema(Schema):
+    period: str
+    buckets: List[SalesBucketSchema]
+    orders: int
+    units: int
+    revenue: float
+    average_order_value: float
+
+class ProductSalesSchema(Schema):
+    product_id: int
+    name: Optional[str] = None
+    units: int
+    revenue: float
+
+class CategorySalesSchema(Schema):
+    category_id: Optional[int] = None
+    name: Optional[str] = None
+    units: int
+    revenue: float
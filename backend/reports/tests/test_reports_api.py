@@ -0,0 +1,198 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.utils import timezone
+from core.utils.tests import get_user, get_product
+from payments.models import Order, OrderItem
+from reports.models import DailySales, DailyProductSales, RollupState
+from reports.utils.rollups import update_rollups, rebuild_rollups, rebuild_day
+from store.models import Product
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.staff_user = get_user("staff")
+        self.int, self.product = get_product(self.staff_user)
+        self.yesterday = timezone.now() - timedelta(days=1)
+
+    def _order(self, qty, price=10, when=None):
+        order = Order.objects.create(
+            full_name="Jane Smith", email="jane@example.com",
+            shipping_address="456 Road", amount_paid=qty * price,
+            item_count=qty, subtotal=qty * price
+        )
+        OrderItem.objects.create(
+            order=order, product=self.product, quantity=qty, price=price
+        )
+        when = when or self.yesterday
+        Order.objects.filter(pk=order.pk).update(date_ordered=when)
+        OrderItem.objects.filter(order=order).update(date_ordered=when)
+        return order
+
+    def test_rollup_totals(self):
+        self._order(2)
+        self._order(3)
+        self.assertEqual(update_rollups(), 2)
+        day = DailySales.objects.get()
+        self.assertEqual((day.orders, day.units), (2, 5))
+        self.assertEqual(day.revenue, Decimal('50.00'))
+        product = DailyProductSales.objects.get()
+        self.assertEqual(product.product_id, self.product.pk)
+        self.assertEqual(product.category_id, self.product.category_id)
+        self.assertEqual(product.units, 5)
+
+    def test_incremental_and_idempotent(self):
+        self._order(2)
+        update_rollups()
+        self.assertEqual(update_rollups(), 0)
+        last = self._order(1)
+        self.assertEqual(update_rollups(), 1)
+        self.assertEqual(RollupState.objects.get().last_order_id, last.pk)
+        self.assertEqual(DailySales.objects.get().units, 3)
+        self.assertEqual(rebuild_rollups(), 2)
+        self.assertEqual(DailySales.objects.get().units, 3)
+
+    def test_purged_product_keeps_its_sales(self):
+        self._order(2)
+        update_rollups()
+        # The purge detaches the product's order lines, then deletes it
+        OrderItem.objects.filter(product=self.product).update(product=None)
+        Product.all_objects.filter(pk=self.product.pk).delete()
+
+        rebuild_day(timezone.localdate(self.yesterday))
+        product = DailyProductSales.objects.get()
+        self.assertEqual((product.product_id, product.units), (self.product.pk, 2))
+        self.assertEqual(product.revenue, Decimal('20.00'))
+        rebuild_rollups()
+        self.assertEqual(DailyProductSales.objects.get().units, 2)
+        self.assertEqual(DailySales.objects.get().revenue, Decimal('20.00'))
+
+    def test_recent_orders_wait_for_next_run(self):
+        self._order(2, when=timezone.now())
+        self.assertEqual(update_rollups(), 0)
+
+
+class ReportsApiTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.staff_user = get_user("staff")
+        self.staff_user.is_active = True
+        self.staff_user.save()
+        self.int, self.product = get_product(self.staff_user)
+        today = timezone.localdate()
+        DailySales.objects.create(day=today, orders=2, units=3, revenue=30)
+        DailySales.objects.create(
+            day=today - timedelta(days=1), orders=1, units=1, revenue=10
+        )
+        DailyProductSales.objects.create(
+            day=today, product_id=self.product.pk,
+            category_id=self.product.category_id, units=3, revenue=30
+        )
+
+    def test_requires_staff(self):
+        self.session_client.force_login(get_user())
+        res = self.session_client.get("/api/reports/sales")
+        self.assertEqual(res.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_sales_by_day(self):
+        self.session_client.force_login(self.staff_user)
+        data = self.session_client.get("/api/reports/sales").json()
+        self.assertEqual(len(data["buckets"]), 2)
+        self.assertEqual(data["orders"], 3)
+        self.assertEqual(data["revenue"], 40.0)
+        self.assertAlmostEqual(data["average_order_value"], 40 / 3)
+
+    def test_sales_by_month(self):
+        self.session_client.force_login(self.staff_user)
+        data = self.session_client.get("/api/reports/sales?period=month").json()
+        self.assertEqual(sum(b["orders"] for b in data["buckets"]), 3)
+        self.assertLessEqual(len(data["buckets"]), 2)
+
+    def test_products_and_categories(self):
+        self.session_client.force_login(self.staff_user)
+        products = self.session_client.get("/api/reports/products").json()
+        self.assertEqual(products[0]["name"], self.product.name)
+        self.assertEqual(products[0]["units"], 3)
+        categories = self.session_client.get("/api/reports/categories").json()
+        self.assertEqual(categories[0]["category_id"], self.product.category_id)
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.session_client = Client()
+        self.staff_user = get_user("staff")
+        self.staff_user.is_active = True
+        self.staff_user.save()
+        self.int, self.product = get_product(self.staff_user)
+        self.today = timezone.localdate()
+        for qty in (1, 2):
+            order = Order.objects.create(
+                full_name="Jane Smith", email="jane@example.com",
+                shipping_address="456 Road", amount_paid=qty * 10,
+                item_count=qty, subtotal=qty * 10
+            )
+            OrderItem.objects.create(
+                order=order, product=self.product, quantity=qty, price=10
+            )
+        self.url = (
+            f"/api/reports/orders/export?start={self.today - timedelta(days=1)}"
+            f"&end={self.today}"
+        )
+
+    def _content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_requires_staff(self):
+        self.session_client.force_login(get_user())
+        res = self.session_client.get(self.url)
+        self.assertEqual(res.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_csv_export(self):
+        self.session_client.force_login(self.staff_user)
+        res = self.session_client.get(self.url)
+        self.assertEqual(res.status_code, HTTPStatus.OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(self._content(res).decode())))
+        self.assertEqual([r["quantity"] for r in rows], ["1", "2"])
+        self.assertEqual(rows[0]["product"], self.product.name)
+
+    def test_gzipped_ndjson_export(self):
+        self.session_client.force_login(self.staff_user)
+        res = self.session_client.get(self.url + "&format=ndjson&gzip=true")
+        self.assertIn(".ndjson.gz", res["Content-Disposition"])
+        lines = gzip.decompress(self._content(res)).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["price"], "10.00")
+
+    def test_range_outside_orders_is_empty(self):
+        self.session_client.force_login(self.staff_user)
+        last_year = self.today - timedelta(days=365)
+        res = self.session_client.get(
+            f"/api/reports/orders/export?start={last_year}&end={last_year}"
+        )
+        self.assertEqual(self._content(res).decode().count("\n"), 1)
+
+    def test_invalid_range(self):
+        self.session_client.force_login(self.staff_user)
+        res = self.session_client.get(
+            f"/api/reports/orders/export?start={self.today}"
+            f"&end={self.today - timedelta(days=1)}"
+        )
+        self.assertEqual(res.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_command_matches_endpoint(self):
+        self.session_client.force_login(self.staff_user)
+        expected = self._content(self.session_client.get(self.url))
+        with tempfile.NamedTemporaryFile() as out:
+            call_command(
+                "export_orders", str(self.today - timedelta(days=1)),
+                str(self.today), "--chunk-size", "1", "--output", out.name
+            )
+            self.assertEqual(out.read(), expected)
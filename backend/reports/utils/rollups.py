@@ -0,0 +1,127 @@
+"""
+Incremental maintenance of the daily sales rollups.
+
+Each run folds in orders above the high-water mark. The days those orders
+fall on are recomputed from source and upserted, so running twice, or
+overlapping with another run, never double counts.
+"""
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from payments.models import Order, OrderItem
+from store.models import Product
+from ..models import DailySales, DailyProductSales, RollupState
+
+ROLLUP_NAME = 'sales'
+# Orders newer than this may belong to transactions that have not
+# committed yet, so they wait for the next run
+SAFETY_LAG = timedelta(minutes=2)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _rebuildable():
+    """
+    Product rollup rows that can be recomputed from order lines. Once a
+    product is purged its lines no longer name it, so its rows are kept.
+    """
+    return DailyProductSales.objects.filter(
+        product_id__in=Product._base_manager.values('pk')
+    )
+
+
+def rebuild_day(day):
+    """Recompute and upsert every rollup row for one day."""
+    start, end = day_bounds(day)
+    totals = Order.objects.filter(
+        date_ordered__gte=start, date_ordered__lt=end
+    ).aggregate(
+        orders=Count('id'),
+        units=Coalesce(Sum('item_count'), 0),
+        revenue=Coalesce(Sum('amount_paid'), 0, output_field=DecimalField()),
+    )
+    DailySales.objects.bulk_create(
+        [DailySales(day=day, **totals)],
+        update_conflicts=True,
+        unique_fields=['day'],
+        update_fields=['orders', 'units', 'revenue'],
+    )
+
+    product_rows = (
+        OrderItem.objects
+        .filter(
+            # The item's own copy of the date, so only one partition is read
+            date_ordered__gte=start,
+            date_ordered__lt=end,
+            product__isnull=False,
+        )
+        .values('product_id', 'product__category_id')
+        .annotate(
+            units=Sum('quantity'),
+            revenue=Sum(F('price') * F('quantity'), output_field=DecimalField()),
+        )
+    )
+    rows = [
+        DailyProductSales(
+            day=day,
+            product_id=row['product_id'],
+            category_id=row['product__category_id'],
+            units=row['units'],
+            revenue=row['revenue'],
+        )
+        for row in product_rows
+    ]
+    _rebuildable().filter(day=day).exclude(
+        product_id__in=[row.product_id for row in rows]
+    ).delete()
+    DailyProductSales.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['day', 'product_id'],
+        update_fields=['category_id', 'units', 'revenue'],
+    )
+
+
+def update_rollups(batch_size=5000):
+    """
+    Fold orders above the high-water mark into the rollups. Returns how
+    many orders were processed; call again until it returns 0.
+    """
+    cutoff = timezone.now() - SAFETY_LAG
+    with transaction.atomic():
+        # The row lock serialises concurrent runs
+        state, _ = RollupState.objects.select_for_update().get_or_create(
+            name=ROLLUP_NAME
+        )
+        new_orders = list(
+            Order.objects
+            .filter(pk__gt=state.last_order_id, date_ordered__lt=cutoff)
+            .order_by('pk')
+            .values_list('pk', 'date_ordered')[:batch_size]
+        )
+        if not new_orders:
+            return 0
+        for day in sorted({timezone.localdate(ordered) for _, ordered in new_orders}):
+            rebuild_day(day)
+        state.last_order_id = new_orders[-1][0]
+        state.save(update_fields=['last_order_id', 'updated_at'])
+    return len(new_orders)
+
+
+def rebuild_rollups():
+    """Throw the rollups away and rebuild them from every order."""
+    with transaction.atomic():
+        DailySales.objects.all().delete()
+        _rebuildable().delete()
+        RollupState.objects.filter(name=ROLLUP_NAME).delete()
+    processed = 0
+    while True:
+        batch = update_rollups()
+        if not batch:
+            return processed
+        processed += batch
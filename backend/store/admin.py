@@ -1,5 +1,7 @@
 from django.contrib import admin
+from core.utils.softdelete import SoftDeleteAdminMixin
 from .models import Category, Product, Tag
+from .utils.catalog import delete_category, delete_products
 
 # # Register your models here.
 @admin.register(Tag)
@@ -9,13 +11,20 @@ class TagAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     prepopulated_fields = {'slug':('name',)}
     list_display = ('name',)
     search_fields = ('name',)
 
+    def delete_model(self, request, obj):
+        delete_category(obj)
+
+    def delete_queryset(self, request, queryset):
+        for category in queryset:
+            delete_category(category)
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'price', 'created_by', 'created_at')
     prepopulated_fields = {'slug':('name',)}
     readonly_fields = ['created_by', 'created_at', 'updated_by']
@@ -26,4 +35,7 @@ class ProductAdmin(admin.ModelAdmin):
             if not change or not obj.created_by:
                 obj.created_by = request.user
             obj.updated_by = request.user
-            super().save_model(request, obj, form, change)
\ No newline at end of file
+            super().save_model(request, obj, form, change)
+
+    def delete_queryset(self, request, queryset):
+        delete_products(queryset)
\ No newline at end of file
@@ -4,6 +4,7 @@ from typing import List
 from .models import Product, Category
 from .schemas import ProductSchema, ProductCreateSchema, ProductPatchSchema, CategorySchema
 from core.schemas import MessageSchema
+from core.utils.softdelete import soft_delete
 from ninja.errors import ValidationError
 from ninja.security import django_auth
 from django.shortcuts import get_object_or_404
@@ -85,5 +86,6 @@ def delete_product(request, product_id: int):
         if not request.user.is_staff:
             return 403, {"detail": "Request not permitted"}
         product = get_object_or_404(Product, id=product_id)
-        product.delete()
+        # Hidden now; the purge job detaches its order lines and removes it
+        soft_delete(product)
         return 200, {"detail": "Item successfully deleted"}
\ No newline at end of file
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_rename_title_product_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_product_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='weight',
+            field=models.DecimalField(decimal_places=3, default=0, max_digits=7, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 from accounts.models import User
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
+from core.utils.softdelete import LiveManager
 
 
 class Tag(models.Model):
@@ -16,6 +17,11 @@ class Tag(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=128, db_index=True)
     slug = models.SlugField(max_length=130, unique=True)
+    # Set when deleted; the row is purged by a background job
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['name']
@@ -34,6 +40,13 @@ class Product(models.Model):
     image = models.ImageField(upload_to='images/products')
     discount = models.SmallIntegerField(default=0,
         validators=[MinValueValidator(0), MaxValueValidator(33)])
+    # Units on hand, untracked when unset
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    # Shipping weight in kg
+    weight = models.DecimalField(
+        max_digits=7, decimal_places=3, default=0,
+        validators=[MinValueValidator(0)]
+    )
     category = models.ForeignKey(
         Category, related_name='product', 
         on_delete=models.CASCADE, null=True
@@ -50,6 +63,11 @@ class Product(models.Model):
         null=True
     )
     tags = models.ManyToManyField(Tag, related_name='products', blank=True)
+    # Set when deleted; the row is purged by a background job
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name_plural = 'products'
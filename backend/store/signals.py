@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from .models import Product
+from .utils.catalog import invalidate_catalog
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_catalog_version(sender, **kwargs):
+    invalidate_catalog()
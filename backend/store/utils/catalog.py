@@ -0,0 +1,27 @@
+from core.utils.softdelete import soft_delete, soft_delete_queryset
+from core.utils.versioning import get_version, bump_version
+
+CATALOG_NAMESPACE = 'catalog'
+
+
+def catalog_version():
+    """Stamp that changes whenever a product's price or discount may have."""
+    return get_version(CATALOG_NAMESPACE)
+
+
+def invalidate_catalog():
+    return bump_version(CATALOG_NAMESPACE)
+
+
+def delete_products(queryset):
+    """Hide products at once; the rows are purged in the background."""
+    pks = soft_delete_queryset(queryset)
+    if pks:
+        invalidate_catalog()
+    return pks
+
+
+def delete_category(category):
+    """Hide a category and, as its cascade would, its products."""
+    delete_products(category.product.all())
+    soft_delete(category)
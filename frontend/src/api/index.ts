@@ -12,6 +12,8 @@ export {
   registerUser,
   verifyEmail,
   loginUser,
+  requestPasswordReset,
+  confirmPasswordReset,
   logoutUser,
   getUserProfile,
   updateProfile,
@@ -21,17 +23,24 @@ export {
   getUserDetail,
   updateUser,
   deleteUser,
+  listUsers,
+  bulkSetUsersActive,
+  bulkDeleteUsers,
 } from './useAccounts'
 
 export type {
   MessageResponse,
   UserRegisterPayload,
   UserLoginPayload,
+  PasswordResetConfirmPayload,
   UserProfile,
   ProfileUpdatePayload,
   UploadImageResponse,
   AdminCreateUserPayload,
   AdminUserUpdatePayload,
+  UserListFilters,
+  UserPage,
+  BulkResult,
 } from './useAccounts'
 
 // ========================================
@@ -101,6 +110,7 @@ export type {
 // ========================================
 export {
   getCheckout,
+  getReferenceData,
   completeOrder,
 } from './usePayments'
 
@@ -108,5 +118,6 @@ export type {
   ShippingAddress,
   CartItemCheckout,
   CheckoutResponse,
+  ReferenceData,
   CompleteOrderPayload,
 } from './usePayments'
\ No newline at end of file
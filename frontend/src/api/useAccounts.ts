@@ -26,6 +26,12 @@ export interface UserLoginPayload {
   password: string
 }
 
+export interface PasswordResetConfirmPayload {
+  uidb64: string
+  token: string
+  password: string
+}
+
 export interface UserProfile {
   id: number
   username: string
@@ -43,7 +49,8 @@ export interface ProfileUpdatePayload {
 
 export interface UploadImageResponse {
   detail: string
-  image: string
+  // null while a first image is still being processed (HTTP 202)
+  image: string | null
 }
 
 export interface AdminCreateUserPayload {
@@ -98,6 +105,20 @@ export async function loginUser(payload: UserLoginPayload): Promise<MessageRespo
   return apiPost<UserLoginPayload, MessageResponse>('/accounts/login', payload)
 }
 
+/**
+ * Request a password reset link. Answers the same whether or not the email is registered
+ */
+export async function requestPasswordReset(email: string): Promise<MessageResponse> {
+  return apiPost<{ email: string }, MessageResponse>('/accounts/password-reset', { email })
+}
+
+/**
+ * Set a new password with the uid and token from a reset link
+ */
+export async function confirmPasswordReset(payload: PasswordResetConfirmPayload): Promise<MessageResponse> {
+  return apiPost<PasswordResetConfirmPayload, MessageResponse>('/accounts/password-reset/confirm', payload)
+}
+
 /**
  * Logout current user
  */
@@ -205,6 +226,49 @@ export async function deleteAccount(): Promise<MessageResponse> {
 // Admin User Management
 // ========================================
 
+export interface UserListFilters {
+  q?: string
+  is_active?: boolean
+  is_staff?: boolean
+}
+
+export interface UserPage {
+  items: UserProfile[]
+  next_cursor: string | null
+}
+
+export interface BulkResult {
+  detail: string
+  count: number
+}
+
+/**
+ * Staff: Get a page of users, newest first; `q` matches a username or email prefix
+ */
+export async function listUsers(filters: UserListFilters = {}, cursor?: string, limit = 50): Promise<UserPage> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (cursor) params.set('cursor', cursor)
+  if (filters.q) params.set('q', filters.q)
+  if (filters.is_active !== undefined) params.set('is_active', String(filters.is_active))
+  if (filters.is_staff !== undefined) params.set('is_staff', String(filters.is_staff))
+  return apiCall<UserPage>(`/accounts/users?${params}`)
+}
+
+/**
+ * Staff: Activate or deactivate several users at once
+ */
+export async function bulkSetUsersActive(ids: number[], active: boolean): Promise<BulkResult> {
+  const action = active ? 'bulk-activate' : 'bulk-deactivate'
+  return apiPost<{ ids: number[] }, BulkResult>(`/accounts/users/${action}`, { ids })
+}
+
+/**
+ * Admin: Delete several users at once
+ */
+export async function bulkDeleteUsers(ids: number[]): Promise<BulkResult> {
+  return apiPost<{ ids: number[] }, BulkResult>('/accounts/users/bulk-delete', { ids })
+}
+
 /**
  * Admin: Create a new user
  */
@@ -40,10 +40,20 @@ export interface CartItem {
   slug: string
 }
 
+export interface CartChange {
+  product_id: number
+  old_price: number
+  new_price: number | null
+  old_discount: number
+  new_discount: number | null
+  removed: boolean
+}
+
 export interface CartListResponse {
   items: CartItem[]
   cart_qty: number
   total: number
+  changes: CartChange[] // Lines repriced or removed since the cart was last seen
 }
 
 // ========================================
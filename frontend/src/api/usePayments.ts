@@ -32,11 +32,15 @@ export interface CartItemCheckout {
 }
 
 export interface CheckoutResponse {
-  countries: [string, string][] // Array of [code, name] tuples
   cart: CartItemCheckout[]
   shipping: ShippingAddress | null
 }
 
+export interface ReferenceData {
+  locale: string
+  countries: [string, string][] // Array of [code, name] tuples
+}
+
 export interface CompleteOrderPayload {
   fn: string // First name
   sn: string // Surname/Last name
@@ -49,20 +53,74 @@ export interface CompleteOrderPayload {
   zip: string // Zipcode
 }
 
+export interface OrderSummary {
+  id: number
+  date_ordered: string
+  amount_paid: number
+  subtotal: number
+  item_count: number
+}
+
+export interface OrderPage {
+  items: OrderSummary[]
+  next_cursor: string | null // Pass back to fetch the next page
+}
+
+export interface OrderItemDetail {
+  product_id: number | null
+  name: string | null
+  slug: string | null
+  quantity: number
+  price: number
+}
+
+export interface OrderDetail extends OrderSummary {
+  full_name: string
+  email: string
+  shipping_address: string
+  items: OrderItemDetail[]
+}
+
 // ========================================
 // Payment Endpoints
 // ========================================
 
 /**
- * Get checkout information including countries, cart items, and shipping address
+ * Get checkout information: cart items and saved shipping address
  */
 export async function getCheckout(): Promise<CheckoutResponse> {
   return apiCall<CheckoutResponse>('/payments/checkout')
 }
 
+/**
+ * Get checkout reference data such as the country list.
+ * Served with a long Cache-Control and an ETag, so the browser cache
+ * answers repeat calls.
+ */
+export async function getReferenceData(lang?: string): Promise<ReferenceData> {
+  const query = lang ? `?lang=${encodeURIComponent(lang)}` : ''
+  return apiCall<ReferenceData>(`/payments/reference${query}`)
+}
+
 /**
  * Complete order with shipping and payment information
  */
 export async function completeOrder(payload: CompleteOrderPayload): Promise<MessageResponse> {
   return apiPost<CompleteOrderPayload, MessageResponse>('/payments/complete-order', payload)
 }
+
+/**
+ * Get a page of the current user's order history
+ */
+export async function getOrders(cursor?: string, limit = 20): Promise<OrderPage> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (cursor) params.set('cursor', cursor)
+  return apiCall<OrderPage>(`/payments/orders?${params}`)
+}
+
+/**
+ * Get a single order with its items
+ */
+export async function getOrder(orderId: number): Promise<OrderDetail> {
+  return apiCall<OrderDetail>(`/payments/orders/${orderId}`)
+}